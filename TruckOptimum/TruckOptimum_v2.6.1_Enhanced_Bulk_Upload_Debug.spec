@@ -2,17 +2,19 @@
 
 a = Analysis(
     ['app.py'],
-    pathex=['D:\\Github\\Truck_Opti\\TruckOptimum'],
+    pathex=['D:\\Github\\Truck_Opti\\TruckOptimum', 'D:\\Github\\Truck_Opti\\app'],
     binaries=[],
     datas=[
         ('templates', 'templates'),
         ('static', 'static'),
         ('truck_optimum.db', '.'),
         ('packing_engine.py', '.'),
+        ('../app/spatial_index.py', '.'),
         ('error_logger.py', '.'),
     ],
     hiddenimports=[
         'packing_engine',
+        'spatial_index',
         'error_logger',
         'flask',
         'sqlite3',
@@ -3,12 +3,43 @@ Advanced 3D Carton Fitting Algorithms for TruckOptimum
 Implements state-of-the-art bin packing algorithms for optimal truck loading
 """
 
+import logging
 import math
+import multiprocessing
+import os
 import random
-from typing import List, Tuple, Dict, Optional
-from dataclasses import dataclass
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Iterator, List, Tuple, Dict, Optional
+from dataclasses import astuple, dataclass
 from enum import Enum
 
+try:
+    # Frozen builds bundle app/spatial_index.py as a top-level module through the .spec
+    import spatial_index
+except ImportError:
+    # Source checkout: load only the web app's copy by path, without putting app/ on sys.path;
+    # registering it lets the other TruckOptimum modules import the same module object
+    import importlib.util
+    _spec = importlib.util.spec_from_file_location(
+        'spatial_index',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'spatial_index.py'))
+    spatial_index = importlib.util.module_from_spec(_spec)
+    sys.modules['spatial_index'] = spatial_index
+    _spec.loader.exec_module(spatial_index)
+from spatial_index import SpatialIndex, DEFAULT_CELL_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def _cancelled(cancel_event: Optional[Any]) -> bool:
+    return cancel_event is not None and cancel_event.is_set()
+
 
 class Algorithm3DType(Enum):
     """Available advanced 3D packing algorithms"""
@@ -95,10 +126,11 @@ class PlacedCarton:
 class SkylineBottomLeft:
     """Skyline Bottom Left algorithm for 3D bin packing"""
 
-    def __init__(self, truck: Truck3D):
+    def __init__(self, truck: Truck3D, cell_size: float = DEFAULT_CELL_SIZE):
         self.truck = truck
         self.skyline = [(0, 0, 0, truck.length, truck.width)]  # x, y, z, width, depth
         self.placed_cartons: List[PlacedCarton] = []
+        self.index = SpatialIndex(cell_size)  # Placed cartons for collision checks
         self.total_weight = 0
 
     def can_place(self, carton: Carton3D, x: float, y: float, z: float, orientation: Tuple[float, float, float]) -> bool:
@@ -113,15 +145,20 @@ class SkylineBottomLeft:
         if self.total_weight + carton.weight > self.truck.max_weight:
             return False
 
-        # Check collision with existing cartons
-        for placed in self.placed_cartons:
-            if not (x >= placed.x2 or placed.x >= x + l or
-                    y >= placed.y2 or placed.y >= y + w or
-                    z >= placed.z2 or placed.z >= z + h):
-                return False
+        # Check collision with existing cartons near the position
+        if self.index.overlaps(x, y, z, x + l, y + w, z + h):
+            return False
 
         return True
 
+    def place(self, placed: PlacedCarton):
+        """Record a placed carton: index it, add its weight and raise the skyline"""
+        self.placed_cartons.append(placed)
+        self.index.insert(len(self.placed_cartons) - 1, placed.x, placed.y, placed.z,
+                          placed.x2, placed.y2, placed.z2)
+        self.total_weight += placed.carton.weight
+        self.update_skyline(placed)
+
     def find_best_position(self, carton: Carton3D) -> Optional[Tuple[float, float, float, Tuple[float, float, float]]]:
         """Find best position using skyline algorithm"""
         best_position = None
@@ -158,10 +195,8 @@ class SkylineBottomLeft:
                 if position:
                     x, y, z, orientation = position
                     placed = PlacedCarton(carton, x, y, z, orientation)
-                    self.placed_cartons.append(placed)
+                    self.place(placed)
                     packed.append(placed)
-                    self.total_weight += carton.weight
-                    self.update_skyline(placed)
                 else:
                     unpacked.append(carton)
 
@@ -211,38 +246,213 @@ class SkylineBottomLeft:
         self.skyline = new_skyline
 
 
-class GeneticAlgorithm3D:
-    """Genetic Algorithm for 3D bin packing"""
+def _oriented_cartons(carton_table: List[Tuple]) -> List[List[Carton3D]]:
+    """
+    One single-unit Carton3D per (carton type, orientation) of a table of
+    (id, name, length, width, height, weight) rows, built once per search
+    instead of once per decoded unit
+    """
+    oriented = []
+    for carton_id, name, length, width, height, weight in carton_table:
+        carton = Carton3D(carton_id, name, length, width, height, weight, 1)
+        oriented.append([Carton3D(carton_id, name, l, w, h, weight, 1)
+                         for l, w, h in carton.get_orientations()])
+    return oriented
+
+
+DECODE_CHECKPOINT_INTERVAL = 8   # genes between skyline snapshots in the decode trie
+MAX_DECODE_CHECKPOINTS = 20000   # snapshots kept before the trie is reset
 
-    def __init__(self, truck: Truck3D, population_size: int = 50, generations: int = 100):
+
+class _DecodeNode:
+    """Trie node: skyline state after a prefix, children keyed by the next block of genes"""
+
+    __slots__ = ('children', 'state')
+
+    def __init__(self, state: Tuple):
+        self.children: Dict[bytes, '_DecodeNode'] = {}
+        self.state = state
+
+
+class SkylineDecodeCache:
+    """
+    Skyline decoder for encoded packing sequences (genes are carton_type * 6 +
+    orientation) that reuses work across sequences sharing a prefix.
+
+    Every DECODE_CHECKPOINT_INTERVAL genes the decoder state (skyline, placed
+    cartons, weight, packed volume and count) is stored in a trie whose edges
+    are blocks of that many genes. A sequence resumes from the deepest
+    checkpoint of its longest cached prefix and only decodes the rest; complete
+    sequences seen before are answered from a fitness memo. Once
+    max_checkpoints snapshots exist the trie and memo are dropped and rebuilt.
+    """
+
+    def __init__(self, truck: Truck3D, oriented: List[List[Carton3D]], volumes: List[float],
+                 interval: int = DECODE_CHECKPOINT_INTERVAL,
+                 max_checkpoints: int = MAX_DECODE_CHECKPOINTS):
         self.truck = truck
-        self.population_size = population_size
-        self.generations = generations
-        self.mutation_rate = 0.1
-        self.crossover_rate = 0.8
+        self.oriented = oriented
+        self.volumes = volumes
+        self.interval = max(1, interval)
+        self.max_checkpoints = max_checkpoints
+        self.decoded_genes = 0
+        self.reused_genes = 0
+        self.clear()
+
+    def clear(self):
+        self._root = _DecodeNode(((), (), 0, 0, 0))
+        self._memo: Dict[bytes, float] = {}
+        self._checkpoints = 0
+
+    def _restore(self, state: Tuple) -> SkylineBottomLeft:
+        skyline_rects, placed_cartons, total_weight, _, _ = state
+        skyline = SkylineBottomLeft(self.truck)
+        if placed_cartons:
+            skyline.skyline = list(skyline_rects)
+            skyline.placed_cartons = list(placed_cartons)
+            for i, placed in enumerate(placed_cartons):
+                skyline.index.insert(i, placed.x, placed.y, placed.z, placed.x2, placed.y2, placed.z2)
+            skyline.total_weight = total_weight
+        return skyline
+
+    def fitness(self, genes: array) -> float:
+        """Fitness of an encoded sequence, identical to decoding it from an empty truck"""
+        key = genes.tobytes()
+        cached = self._memo.get(key)
+        if cached is not None:
+            self.reused_genes += len(genes)
+            return cached
+
+        # Deepest checkpoint along the cached prefix
+        interval = self.interval
+        node = self._root
+        start = 0
+        while start + interval <= len(genes):
+            child = node.children.get(genes[start:start + interval].tobytes())
+            if child is None:
+                break
+            node = child
+            start += interval
+        self.reused_genes += start
+        self.decoded_genes += len(genes) - start
+
+        skyline = self._restore(node.state)
+        _, _, _, packed_volume, packed_count = node.state
+        oriented, volumes = self.oriented, self.volumes
+
+        for i in range(start, len(genes)):
+            kind, orientation_idx = divmod(genes[i], 6)
+            temp_carton = oriented[kind][orientation_idx]
+            orientation = (temp_carton.length, temp_carton.width, temp_carton.height)
 
-    def create_random_sequence(self, cartons: List[Carton3D]) -> List[Tuple[Carton3D, int]]:
-        """Create random packing sequence with orientations"""
-        sequence = []
-        for carton in cartons:
-            for _ in range(carton.quantity):
-                orientation_idx = random.randint(0, 5)  # 6 possible orientations
-                sequence.append((carton, orientation_idx))
+            position = skyline.find_best_position(temp_carton)
+            if position:
+                x, y, z, _ = position
+                skyline.place(PlacedCarton(temp_carton, x, y, z, orientation))
+                packed_volume += volumes[kind]
+                packed_count += 1
+
+            if (i + 1) % interval == 0:
+                state = (tuple(skyline.skyline), tuple(skyline.placed_cartons), skyline.total_weight,
+                         packed_volume, packed_count)
+                child = _DecodeNode(state)
+                node.children[genes[i + 1 - interval:i + 1].tobytes()] = child
+                node = child
+                self._checkpoints += 1
+
+        # Fitness combines volume utilization and count of packed items
+        volume_fitness = packed_volume / self.truck.volume
+        count_fitness = packed_count / len(genes)
+        fitness = (volume_fitness + count_fitness) / 2
+
+        if self._checkpoints > self.max_checkpoints:
+            self.clear()
+        self._memo[key] = fitness
+        return fitness
+
+
+# Decoder of the truck and carton types a fitness worker process evaluated last;
+# the pool outlives GA runs, so each batch names the types it belongs to
+_worker_decoder: Optional['SkylineDecodeCache'] = None
+_worker_decoder_key: Optional[Tuple] = None
 
-        random.shuffle(sequence)
-        return sequence
+
+def _fitness_decoder(truck_row: Tuple, carton_table: Tuple[Tuple, ...]) -> 'SkylineDecodeCache':
+    """Rebuild the truck and oriented carton types from tuples when they change"""
+    global _worker_decoder, _worker_decoder_key
+    key = (truck_row, carton_table)
+    if key != _worker_decoder_key:
+        volumes = [length * width * height for _, _, length, width, height, _ in carton_table]
+        _worker_decoder = SkylineDecodeCache(Truck3D(*truck_row), _oriented_cartons(carton_table), volumes)
+        _worker_decoder_key = key
+    return _worker_decoder
+
+
+def _evaluate_fitness_batch(truck_row: Tuple, carton_table: Tuple[Tuple, ...],
+                            batch: List[array]) -> List[float]:
+    decoder = _fitness_decoder(truck_row, carton_table)
+    return [decoder.fitness(genes) for genes in batch]
+
+
+class SequenceSearch3D:
+    """
+    Shared machinery of searches over packing sequences (GA, SA, tabu).
+
+    A sequence lists every carton unit with one of its 6 orientations and is
+    decoded with the skyline heuristic. For evaluation it is encoded as an
+    array of carton_type * 6 + orientation genes and decoded through a
+    SkylineDecodeCache, so a move only re-decodes from the first changed gene.
+    """
+
+    ALGORITHM_NAME = 'Sequence Search'
+
+    def __init__(self, truck: Truck3D):
+        self.truck = truck
+        self._cartons: List[Carton3D] = []
+        self._carton_table: List[Tuple] = []
+        self._kinds: Dict[int, int] = {}
+        self._decoder: Optional[SkylineDecodeCache] = None
+
+    def _prepare_encoding(self, cartons: List[Carton3D]):
+        """Number the carton types so sequences can be encoded as integer arrays"""
+        self._cartons = list(cartons)
+        self._carton_table = [(c.id, c.name, c.length, c.width, c.height, c.weight) for c in cartons]
+        self._kinds = {id(c): i for i, c in enumerate(cartons)}
+        self._decoder = SkylineDecodeCache(self.truck, _oriented_cartons(self._carton_table),
+                                           [c.volume for c in cartons])
+
+    def encode(self, sequence: List[Tuple[Carton3D, int]]) -> array:
+        """Sequence as an array of carton_type * 6 + orientation genes"""
+        if any(id(carton) not in self._kinds for carton, _ in sequence):
+            self._prepare_encoding(list({id(c): c for c, _ in sequence}.values()))
+        kinds = self._kinds
+        return array('i', [kinds[id(carton)] * 6 + orientation_idx for carton, orientation_idx in sequence])
+
+    def decode(self, genes: array) -> List[Tuple[Carton3D, int]]:
+        """Inverse of encode"""
+        return [(self._cartons[gene // 6], gene % 6) for gene in genes]
+
+    def initial_genes(self, cartons: List[Carton3D]) -> array:
+        """Skyline order (priority, then largest volume first) with every unit in its given orientation"""
+        self._prepare_encoding(cartons)
+        order = sorted(range(len(cartons)), key=lambda i: (-cartons[i].priority, -cartons[i].volume))
+        return array('i', [i * 6 for i in order for _ in range(cartons[i].quantity)])
 
     def evaluate_fitness(self, sequence: List[Tuple[Carton3D, int]]) -> float:
         """Evaluate fitness of a packing sequence"""
+        genes = self.encode(sequence)
+        return self._decoder.fitness(genes)
+
+    def sequence_to_packing(self, sequence: List[Tuple[Carton3D, int]], original_cartons: List[Carton3D]) -> Dict:
+        """Convert sequence to actual packing result"""
         skyline = SkylineBottomLeft(self.truck)
-        packed_volume = 0
-        packed_count = 0
+        packed = []
+        unpacked = []
 
         for carton, orientation_idx in sequence:
             orientations = carton.get_orientations()
             orientation = orientations[orientation_idx]
 
-            # Try to pack with this specific orientation
             temp_carton = Carton3D(carton.id, carton.name, orientation[0],
                                    orientation[1], orientation[2], carton.weight, 1)
 
@@ -250,16 +460,171 @@ class GeneticAlgorithm3D:
             if position:
                 x, y, z, _ = position
                 placed = PlacedCarton(temp_carton, x, y, z, orientation)
-                skyline.placed_cartons.append(placed)
-                skyline.total_weight += carton.weight
-                skyline.update_skyline(placed)
-                packed_volume += carton.volume
-                packed_count += 1
+                skyline.place(placed)
+                packed.append(placed)
+            else:
+                unpacked.append(carton)
 
-        # Fitness combines volume utilization and count of packed items
-        volume_fitness = packed_volume / self.truck.volume
-        count_fitness = packed_count / len(sequence)
-        return (volume_fitness + count_fitness) / 2
+        return {
+            'algorithm': self.ALGORITHM_NAME,
+            'packed_cartons': packed,
+            'unpacked_cartons': unpacked,
+            'volume_utilization': sum(p.carton.volume for p in packed) / self.truck.volume * 100,
+            'weight_utilization': skyline.total_weight / self.truck.max_weight * 100,
+            'total_packed': len(packed),
+            'total_unpacked': len(unpacked),
+            'efficiency_score': len(packed) / (len(packed) + len(unpacked)) * 100 if (len(packed) + len(unpacked)) > 0 else 0
+        }
+
+    @staticmethod
+    def _random_move(rng: random.Random, genes: array) -> Tuple[str, int, int]:
+        """('swap', i, j), ('rotate', i, orientation) or ('insert', i, j) on a sequence of 2+ genes"""
+        roll = rng.random()
+        if roll < 0.4:
+            i, j = rng.sample(range(len(genes)), 2)
+            return 'swap', min(i, j), max(i, j)
+        if roll < 0.7:
+            i = rng.randrange(len(genes))
+            return 'rotate', i, (genes[i] % 6 + rng.randint(1, 5)) % 6
+        i, j = rng.sample(range(len(genes)), 2)
+        return 'insert', i, j
+
+    @staticmethod
+    def _apply_move(genes: array, move: Tuple[str, int, int]) -> array:
+        kind, i, j = move
+        moved = array('i', genes)
+        if kind == 'swap':
+            moved[i], moved[j] = moved[j], moved[i]
+        elif kind == 'rotate':
+            moved[i] = moved[i] - moved[i] % 6 + j
+        else:
+            gene = moved.pop(i)
+            moved.insert(j, gene)
+        return moved
+
+    def _budget_progress(self, iteration: int, max_iterations: int, start: float,
+                         budget_seconds: Optional[float]) -> float:
+        """Fraction (0-1) of the iteration or time budget used, whichever is further"""
+        progress = iteration / max_iterations if max_iterations else 0.0
+        if budget_seconds is not None:
+            elapsed = time.time() - start
+            progress = max(progress, elapsed / budget_seconds if budget_seconds > 0 else 1.0)
+        return min(1.0, progress)
+
+    def _search_result(self, best_genes: array, start: float, iterations: int, evaluations: int,
+                       best_fitness: float, trace: List[Dict], truncated: bool) -> Dict:
+        result = self.sequence_to_packing(self.decode(best_genes), self._cartons)
+        elapsed = time.time() - start
+        result.update({
+            'truncated': truncated,
+            'iterations': iterations,
+            'evaluations': evaluations,
+            'evaluations_per_second': evaluations / elapsed if elapsed > 0 else 0.0,
+            'best_fitness': best_fitness,
+            'search_seconds': elapsed,
+            'convergence': trace,
+        })
+        return result
+
+
+class GeneticAlgorithm3D(SequenceSearch3D):
+    """
+    Genetic Algorithm for 3D bin packing
+
+    Fitness evaluation is the expensive part (one skyline decode per individual).
+    Individuals are sent to it as compact integer arrays, and with workers > 1
+    (None: one per CPU) each population is evaluated in a process pool: the
+    long-lived executor passed in (see Advanced3DPackingEngine), or else one
+    started for this run. Workers keep the decoder of the latest truck and
+    carton types, and decoding goes through a SkylineDecodeCache, so children
+    only re-decode what follows the prefix they share with earlier sequences.
+    """
+
+    ALGORITHM_NAME = 'Genetic Algorithm'
+
+    def __init__(self, truck: Truck3D, population_size: int = 50, generations: int = 100,
+                 workers: Optional[int] = 1, executor: Optional[ProcessPoolExecutor] = None):
+        super().__init__(truck)
+        self.population_size = population_size
+        self.generations = generations
+        self.mutation_rate = 0.1
+        self.crossover_rate = 0.8
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.executor = executor
+        self.pool_failed = False
+
+    def create_random_sequence(self, cartons: List[Carton3D]) -> List[Tuple[Carton3D, int]]:
+        """Create random packing sequence with orientations"""
+        sequence = []
+        for carton in cartons:
+            for _ in range(carton.quantity):
+                orientation_idx = random.randint(0, 5)  # 6 possible orientations
+                sequence.append((carton, orientation_idx))
+
+        random.shuffle(sequence)
+        return sequence
+
+    def _start_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Fitness worker pool started for this run, or None to evaluate in this process"""
+        workers = min(self.workers, self.population_size)
+        if workers <= 1:
+            return None
+        try:
+            return ProcessPoolExecutor(max_workers=workers)
+        except (OSError, ValueError, NotImplementedError) as e:
+            logger.warning(f"Process pool unavailable ({e}), evaluating fitness serially")
+            return None
+
+    def _evaluate_population(self, population: List, deadline: Optional[float],
+                             executor: Optional[ProcessPoolExecutor], need_one: bool) -> Tuple[List, bool]:
+        """
+        (sequence, fitness) pairs in population order and whether the deadline cut
+        the evaluation short; with need_one at least one sequence is evaluated
+        """
+        if executor is not None and not self.pool_failed:
+            try:
+                return self._evaluate_population_parallel(population, deadline, executor, need_one)
+            except BrokenProcessPool as e:
+                logger.warning(f"Fitness worker pool failed ({e}), evaluating serially")
+                self.pool_failed = True
+
+        fitness_scores = []
+        for seq in population:
+            if deadline is not None and (fitness_scores or not need_one) and time.time() >= deadline:
+                return fitness_scores, True
+            fitness_scores.append((seq, self.evaluate_fitness(seq)))
+        return fitness_scores, False
+
+    def _evaluate_population_parallel(self, population: List, deadline: Optional[float],
+                                      executor: ProcessPoolExecutor, need_one: bool) -> Tuple[List, bool]:
+        # A few batches per worker keeps the pipes busy without one task per individual
+        batch_size = max(1, math.ceil(len(population) / (min(self.workers, self.population_size) * 4)))
+        truck_row, carton_table = astuple(self.truck), tuple(self._carton_table)
+        batches = {}
+        for start in range(0, len(population), batch_size):
+            genes = [self.encode(seq) for seq in population[start:start + batch_size]]
+            batches[executor.submit(_evaluate_fitness_batch, truck_row, carton_table, genes)] = start
+
+        finished = {}
+        outstanding = set(batches)
+        truncated = False
+        while outstanding:
+            timeout = None
+            if deadline is not None and (finished or not need_one):
+                timeout = max(0.0, deadline - time.time())
+            done, outstanding = wait(outstanding, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished[batches[future]] = future.result()
+            if not done:
+                truncated = True
+                for future in outstanding:
+                    future.cancel()
+                break
+
+        fitness_scores = []
+        for start in sorted(finished):
+            fitness_scores.extend(zip(population[start:start + batch_size], finished[start]))
+        return fitness_scores, truncated
 
     def crossover(self, parent1: List, parent2: List) -> Tuple[List, List]:
         """Single point crossover"""
@@ -289,85 +654,240 @@ class GeneticAlgorithm3D:
 
         return mutated
 
-    def pack(self, cartons: List[Carton3D]) -> Dict:
-        """Pack cartons using Genetic Algorithm"""
+    def pack(self, cartons: List[Carton3D], deadline_seconds: Optional[float] = None,
+             cancel_event: Optional[Any] = None) -> Dict:
+        """
+        Pack cartons using Genetic Algorithm
+
+        With deadline_seconds the search stops once the budget is spent (or
+        cancel_event is set) and the best sequence evaluated so far is decoded;
+        the result has 'truncated' set.
+        """
+        deadline = time.time() + deadline_seconds if deadline_seconds is not None else None
+
         # Initialize population
         population = [self.create_random_sequence(cartons) for _ in range(self.population_size)]
+        self._prepare_encoding(cartons)
 
-        best_fitness = 0
+        best_fitness = -1
         best_sequence = None
+        truncated = False
+        generations_completed = 0
+
+        own_executor = self.executor is None
+        executor = self._start_pool() if own_executor else self.executor
+        try:
+            for generation in range(self.generations):
+                if best_sequence is not None and _cancelled(cancel_event):
+                    truncated = True
+                    break
 
-        for generation in range(self.generations):
-            # Evaluate fitness
-            fitness_scores = [(seq, self.evaluate_fitness(seq)) for seq in population]
-            fitness_scores.sort(key=lambda x: x[1], reverse=True)
+                # Evaluate fitness; at least one sequence is always evaluated
+                fitness_scores, truncated = self._evaluate_population(
+                    population, deadline, executor, need_one=best_sequence is None)
+                fitness_scores.sort(key=lambda x: x[1], reverse=True)
 
-            # Track best solution
-            if fitness_scores[0][1] > best_fitness:
-                best_fitness = fitness_scores[0][1]
-                best_sequence = fitness_scores[0][0]
+                # Track best solution
+                if fitness_scores and fitness_scores[0][1] > best_fitness:
+                    best_fitness = fitness_scores[0][1]
+                    best_sequence = fitness_scores[0][0]
 
-            # Select parents (top 50%)
-            parents = [seq for seq, _ in fitness_scores[:self.population_size // 2]]
+                if truncated:
+                    break
+                generations_completed += 1
 
-            # Create next generation
-            new_population = parents.copy()  # Keep best half
+                # Select parents (top 50%)
+                parents = [seq for seq, _ in fitness_scores[:self.population_size // 2]]
 
-            while len(new_population) < self.population_size:
-                parent1, parent2 = random.sample(parents, 2)
-                child1, child2 = self.crossover(parent1, parent2)
-                child1 = self.mutate(child1)
-                child2 = self.mutate(child2)
-                new_population.extend([child1, child2])
+                # Create next generation
+                new_population = parents.copy()  # Keep best half
 
-            population = new_population[:self.population_size]
+                while len(new_population) < self.population_size:
+                    parent1, parent2 = random.sample(parents, 2)
+                    child1, child2 = self.crossover(parent1, parent2)
+                    child1 = self.mutate(child1)
+                    child2 = self.mutate(child2)
+                    new_population.extend([child1, child2])
 
-        # Convert best sequence to final packing
-        return self.sequence_to_packing(best_sequence, cartons)
+                population = new_population[:self.population_size]
+        finally:
+            if own_executor and executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
 
-    def sequence_to_packing(self, sequence: List[Tuple[Carton3D, int]], original_cartons: List[Carton3D]) -> Dict:
-        """Convert sequence to actual packing result"""
-        skyline = SkylineBottomLeft(self.truck)
-        packed = []
-        unpacked = []
-
-        for carton, orientation_idx in sequence:
-            orientations = carton.get_orientations()
-            orientation = orientations[orientation_idx]
+        # Convert best sequence to final packing
+        result = self.sequence_to_packing(best_sequence, cartons)
+        result['truncated'] = truncated
+        result['generations_completed'] = generations_completed
+        return result
 
-            temp_carton = Carton3D(carton.id, carton.name, orientation[0],
-                                   orientation[1], orientation[2], carton.weight, 1)
 
-            position = skyline.find_best_position(temp_carton)
-            if position:
-                x, y, z, _ = position
-                placed = PlacedCarton(temp_carton, x, y, z, orientation)
-                skyline.placed_cartons.append(placed)
-                packed.append(placed)
-                skyline.total_weight += carton.weight
-                skyline.update_skyline(placed)
-            else:
-                unpacked.append(carton)
-
-        return {
-            'algorithm': 'Genetic Algorithm',
-            'packed_cartons': packed,
-            'unpacked_cartons': unpacked,
-            'volume_utilization': sum(p.carton.volume for p in packed) / self.truck.volume * 100,
-            'weight_utilization': skyline.total_weight / self.truck.max_weight * 100,
-            'total_packed': len(packed),
-            'total_unpacked': len(unpacked),
-            'efficiency_score': len(packed) / (len(packed) + len(unpacked)) * 100 if (len(packed) + len(unpacked)) > 0 else 0
-        }
+class SimulatedAnnealing3D(SequenceSearch3D):
+    """
+    Simulated annealing over the packing sequence.
+
+    Starts from the skyline order and proposes swap, rotate and insert moves,
+    accepting worse sequences with probability exp(delta / T). The temperature
+    falls geometrically from initial_temperature to final_temperature over the
+    budget: max_iterations, or the deadline if that comes first (progress is
+    whichever fraction is further along). Fitness is the GA's, in [0, 1].
+    """
+
+    ALGORITHM_NAME = 'Simulated Annealing'
+
+    def __init__(self, truck: Truck3D, max_iterations: int = 4000,
+                 initial_temperature: float = 0.05, final_temperature: float = 1e-4,
+                 trace_every: int = 100, seed: Optional[int] = None):
+        super().__init__(truck)
+        self.max_iterations = max_iterations
+        self.initial_temperature = initial_temperature
+        self.final_temperature = final_temperature
+        self.trace_every = trace_every
+        self.rng = random.Random(seed)
+
+    def pack(self, cartons: List[Carton3D], deadline_seconds: Optional[float] = None,
+             cancel_event: Optional[Any] = None) -> Dict:
+        """
+        Pack cartons using simulated annealing
+
+        The result carries 'convergence' (iteration, seconds, current and best
+        fitness at every improvement and every trace_every iterations) and
+        'truncated' if the deadline or cancel_event stopped the search before
+        max_iterations.
+        """
+        start = time.time()
+        current = self.initial_genes(cartons)
+        current_fitness = best_fitness = self._decoder.fitness(current)
+        best = current
+        trace = [{'iteration': 0, 'seconds': 0.0, 'fitness': current_fitness, 'best_fitness': best_fitness}]
+
+        iteration = 0
+        truncated = False
+        cooling = self.final_temperature / self.initial_temperature
+        while len(current) > 1 and iteration < self.max_iterations:
+            progress = self._budget_progress(iteration, self.max_iterations, start, deadline_seconds)
+            if progress >= 1.0 or (iteration % 64 == 0 and _cancelled(cancel_event)):
+                truncated = True
+                break
+            temperature = self.initial_temperature * cooling ** progress
+            iteration += 1
+
+            candidate = self._apply_move(current, self._random_move(self.rng, current))
+            fitness = self._decoder.fitness(candidate)
+            delta = fitness - current_fitness
+            if delta >= 0 or self.rng.random() < math.exp(delta / temperature):
+                current, current_fitness = candidate, fitness
+                if fitness > best_fitness:
+                    best, best_fitness = candidate, fitness
+                    trace.append({'iteration': iteration, 'seconds': time.time() - start,
+                                  'fitness': current_fitness, 'best_fitness': best_fitness})
+                    continue
+            if iteration % self.trace_every == 0:
+                trace.append({'iteration': iteration, 'seconds': time.time() - start,
+                              'fitness': current_fitness, 'best_fitness': best_fitness})
+
+        return self._search_result(best, start, iteration, iteration + 1, best_fitness, trace, truncated)
+
+
+class TabuSearch3D(SequenceSearch3D):
+    """
+    Tabu search over the packing sequence.
+
+    Each iteration samples neighborhood_size swap, rotate and insert moves from
+    the current sequence and takes the best one that is not tabu, even if it is
+    worse. A move is tabu if it puts a gene back at a position it left within
+    the last `tenure` iterations, unless it beats the best sequence found
+    (aspiration). Stops after max_iterations or at the deadline.
+    """
+
+    ALGORITHM_NAME = 'Tabu Search'
+
+    def __init__(self, truck: Truck3D, max_iterations: int = 200, neighborhood_size: int = 20,
+                 tenure: Optional[int] = None, trace_every: int = 10, seed: Optional[int] = None):
+        super().__init__(truck)
+        self.max_iterations = max_iterations
+        self.neighborhood_size = neighborhood_size
+        self.tenure = tenure
+        self.trace_every = trace_every
+        self.rng = random.Random(seed)
+
+    @staticmethod
+    def _move_attributes(genes: array, move: Tuple[str, int, int]) -> Tuple[List, List]:
+        """(position, gene) pairs the move creates and the ones it removes"""
+        kind, i, j = move
+        if kind == 'swap':
+            return [(i, genes[j]), (j, genes[i])], [(i, genes[i]), (j, genes[j])]
+        if kind == 'rotate':
+            return [(i, genes[i] - genes[i] % 6 + j)], [(i, genes[i])]
+        return [(j, genes[i])], [(i, genes[i])]
+
+    def pack(self, cartons: List[Carton3D], deadline_seconds: Optional[float] = None,
+             cancel_event: Optional[Any] = None) -> Dict:
+        """
+        Pack cartons using tabu search
+
+        The result carries 'convergence' (iteration, seconds, current and best
+        fitness every trace_every iterations and at every improvement) and
+        'truncated' if the deadline or cancel_event stopped the search before
+        max_iterations.
+        """
+        start = time.time()
+        deadline = start + deadline_seconds if deadline_seconds is not None else None
+        current = self.initial_genes(cartons)
+        current_fitness = best_fitness = self._decoder.fitness(current)
+        best = current
+        evaluations = 1
+        trace = [{'iteration': 0, 'seconds': 0.0, 'fitness': current_fitness, 'best_fitness': best_fitness}]
+        tenure = self.tenure or max(7, int(math.sqrt(len(current))))
+        tabu: Dict[Tuple[int, int], int] = {}  # (position, gene) -> last tabu iteration
+
+        iteration = 0
+        truncated = False
+        while len(current) > 1 and iteration < self.max_iterations:
+            if _cancelled(cancel_event):
+                truncated = True
+                break
+            iteration += 1
+            chosen = None
+            for _ in range(self.neighborhood_size):
+                if deadline is not None and time.time() >= deadline:
+                    truncated = True
+                    break
+                move = self._random_move(self.rng, current)
+                candidate = self._apply_move(current, move)
+                fitness = self._decoder.fitness(candidate)
+                evaluations += 1
+                created, removed = self._move_attributes(current, move)
+                is_tabu = any(tabu.get(attribute, 0) >= iteration for attribute in created)
+                if is_tabu and fitness <= best_fitness:
+                    continue
+                if chosen is None or fitness > chosen[1]:
+                    chosen = (candidate, fitness, removed)
+
+            if chosen is not None:
+                current, current_fitness, removed = chosen
+                for attribute in removed:
+                    tabu[attribute] = iteration + tenure
+                if current_fitness > best_fitness:
+                    best, best_fitness = current, current_fitness
+                    trace.append({'iteration': iteration, 'seconds': time.time() - start,
+                                  'fitness': current_fitness, 'best_fitness': best_fitness})
+                elif iteration % self.trace_every == 0:
+                    trace.append({'iteration': iteration, 'seconds': time.time() - start,
+                                  'fitness': current_fitness, 'best_fitness': best_fitness})
+            if truncated:
+                break
+
+        return self._search_result(best, start, iteration, evaluations, best_fitness, trace, truncated)
 
 
 class ExtremePointsAlgorithm:
     """Extreme Points algorithm for 3D bin packing"""
 
-    def __init__(self, truck: Truck3D):
+    def __init__(self, truck: Truck3D, cell_size: float = DEFAULT_CELL_SIZE):
         self.truck = truck
         self.extreme_points = [(0, 0, 0)]  # Start with origin
         self.placed_cartons: List[PlacedCarton] = []
+        self.index = SpatialIndex(cell_size)  # Placed cartons for collision checks
         self.total_weight = 0
 
     def update_extreme_points(self, placed: PlacedCarton):
@@ -394,11 +914,7 @@ class ExtremePointsAlgorithm:
             return False
 
         # Must not be inside any placed carton
-        for placed in self.placed_cartons:
-            if (placed.x < x < placed.x2 and placed.y < y < placed.y2 and placed.z < z < placed.z2):
-                return False
-
-        return True
+        return not self.index.contains_point(x, y, z)
 
     def remove_dominated_points(self, points: List[Tuple[float, float, float]]) -> List[Tuple[float, float, float]]:
         """Remove dominated extreme points"""
@@ -448,6 +964,8 @@ class ExtremePointsAlgorithm:
                     x, y, z, orientation = best_position
                     placed = PlacedCarton(carton, x, y, z, orientation)
                     self.placed_cartons.append(placed)
+                    self.index.insert(len(self.placed_cartons) - 1, x, y, z,
+                                      placed.x2, placed.y2, placed.z2)
                     packed.append(placed)
                     self.total_weight += carton.weight
 
@@ -483,20 +1001,291 @@ class ExtremePointsAlgorithm:
         if self.total_weight + carton.weight > self.truck.max_weight:
             return False
 
-        # Check collision with existing cartons
-        for placed in self.placed_cartons:
-            if not (x >= placed.x2 or placed.x >= x + l or
-                    y >= placed.y2 or placed.y >= y + w or
-                    z >= placed.z2 or placed.z >= z + h):
-                return False
+        # Check collision with existing cartons near the position
+        if self.index.overlaps(x, y, z, x + l, y + w, z + h):
+            return False
 
         return True
 
 
-class Advanced3DPackingEngine:
-    """Main engine for advanced 3D packing algorithms"""
+BRANCH_AND_BOUND_MAX_BOXES = 30       # larger loads only get the heuristic incumbent and its bound
+BRANCH_AND_BOUND_MAX_NODES = 50_000   # nodes expanded before the search stops with a gap
+BRANCH_AND_BOUND_MAX_MEMO = 500_000   # visited states remembered before the memo is reset
+BRANCH_AND_BOUND_MAX_SUMS = 200_000   # distinct load volumes enumerated for the subset-sum bound
+_BB_EPS = 1e-6
+
+
+def _normal_positions(extents: List[Tuple[float, ...]], limit: float) -> List[float]:
+    """
+    Coordinates along one axis that are the sum of one extent of each of some
+    units (normal patterns). Every packing can be pushed towards the origin
+    until each carton sits at such a coordinate, so these are the only ones an
+    exact search has to try.
+    """
+    smallest = min(min(unit) for unit in extents)
+    sums = {0.0}
+    for unit in extents:
+        sums |= {round(s + extent, 6) for s in sums for extent in unit if s + extent + smallest <= limit + _BB_EPS}
+    return sorted(sums)
+
+
+def _achievable_volumes(volumes: List[float], counts: Tuple[int, ...]) -> Optional[List[float]]:
+    """Sorted distinct total volumes of all sub-multisets of the cartons, or None if there are too many"""
+    sums = {0.0}
+    for volume, count in zip(volumes, counts):
+        sums = {round(s + k * volume, 6) for s in sums for k in range(count + 1)}
+        if len(sums) > BRANCH_AND_BOUND_MAX_SUMS:
+            return None
+    return sorted(sums)
+
+
+class BranchAndBound3D:
+    """
+    Exact branch and bound for small single-truck loads, maximizing packed volume.
+
+    Candidate positions are the normal-pattern grid, visited in (z, y, x)
+    order; at the first open position the search either places a carton of
+    some remaining type and orientation there or leaves it empty for good, so
+    every packing is enumerated exactly once. Cartons with the same
+    dimensions and weight are one type with a count, so identical units are
+    never permuted. A node is pruned when its packed volume plus the smaller
+    of the remaining cartons' volume (fractional knapsack under the weight
+    left) and the free space above the current layer, rounded down to a load
+    volume some subset of the cartons actually adds up to, cannot beat the
+    incumbent, which starts as the best of the skyline and extreme points
+    heuristics. States that are identical at the current position (same
+    remaining counts and same cartons reaching above it) are searched once.
+
+    When max_nodes or the deadline stops the search, the largest bound still
+    open gives the optimality gap of the returned packing.
+    """
+
+    def __init__(self, truck: Truck3D, max_nodes: int = BRANCH_AND_BOUND_MAX_NODES,
+                 max_boxes: int = BRANCH_AND_BOUND_MAX_BOXES):
+        self.truck = truck
+        self.max_nodes = max_nodes
+        self.max_boxes = max_boxes
+
+    def _incumbent(self, cartons: List[Carton3D]) -> Tuple[str, Dict, float]:
+        """Best heuristic packing as (source, result, packed volume)"""
+        best = None
+        for source, algorithm in (('skyline_bl', SkylineBottomLeft(self.truck)),
+                                  ('extreme_points', ExtremePointsAlgorithm(self.truck))):
+            result = algorithm.pack(cartons)
+            volume = sum(p.carton.volume for p in result['packed_cartons'])
+            if best is None or volume > best[2] + _BB_EPS:
+                best = (source, result, volume)
+        return best
+
+    def pack(self, cartons: List[Carton3D], deadline_seconds: Optional[float] = None,
+             cancel_event: Optional[Any] = None) -> Dict:
+        """
+        Pack cartons with branch and bound
+
+        The result reports 'optimal', the 'optimality_gap' (percent of the
+        upper bound), 'upper_bound_volume_utilization', the number of 'nodes'
+        expanded, 'incumbent_source' ('branch_bound' or the heuristic whose
+        packing could not be beaten) and 'truncated' if the node or time limit
+        or cancel_event stopped the search.
+        """
+        start = time.time()
+        deadline = start + deadline_seconds if deadline_seconds is not None else None
+        truck = self.truck
+
+        # Symmetry breaking: identical cartons form one type with a count
+        groups: Dict[Tuple, List[Carton3D]] = {}
+        for carton in cartons:
+            key = (tuple(sorted((carton.length, carton.width, carton.height))), carton.weight)
+            groups.setdefault(key, []).extend([carton] * carton.quantity)
+        units = list(groups.values())
+        orientations = [sorted(set(group[0].get_orientations())) for group in units]
+        volumes = [group[0].volume for group in units]
+        weights = [group[0].weight for group in units]
+        # Fractional knapsack order for the weight bound
+        by_density = sorted(range(len(units)), key=lambda t: -(volumes[t] / weights[t] if weights[t] > 0 else math.inf))
+
+        def remaining_volume(counts: Tuple[int, ...], weight: float) -> float:
+            capacity = truck.max_weight - weight
+            total = 0.0
+            for t in by_density:
+                if not counts[t]:
+                    continue
+                if weights[t] * counts[t] <= capacity:
+                    total += volumes[t] * counts[t]
+                    capacity -= weights[t] * counts[t]
+                else:
+                    total += volumes[t] * max(0.0, capacity) / weights[t]
+                    break
+            return total
+
+        counts = tuple(len(group) for group in units)
+        achievable = _achievable_volumes(volumes, counts)
+
+        def round_down(volume: float) -> float:
+            if achievable is None:
+                return volume
+            return achievable[max(0, bisect_right(achievable, volume + _BB_EPS) - 1)]
+
+        source, heuristic, best_volume = self._incumbent(cartons)
+        root_bound = round_down(min(truck.volume, remaining_volume(counts, 0.0)))
+        best_placed = None
+        nodes = pruned = memo_hits = 0
+        truncated = False
+        upper_bound = root_bound
+
+        unit_count = sum(counts)
+        if 0 < unit_count <= self.max_boxes and best_volume < root_bound - _BB_EPS:
+            extents = [group[0].get_orientations()[0] for group in units for _ in group]
+            xs = _normal_positions(extents, truck.length)
+            ys = _normal_positions(extents, truck.width)
+            zs = _normal_positions(extents, truck.height)
+            nx, ny = len(xs), len(ys)
+            point_count = nx * ny * len(zs)
+            floor_area = truck.length * truck.width
+
+            def bound(counts, volume, weight, placed, z):
+                above = sum((b[3] - b[0]) * (b[4] - b[1]) * (b[5] - max(b[2], z)) for b in placed if b[5] > z)
+                free = floor_area * (truck.height - z) - above
+                return round_down(volume + min(remaining_volume(counts, weight), free))
+
+            # Nodes: (bound, position index, remaining counts, placed boxes, volume, weight)
+            stack = [(root_bound, 0, counts, (), 0.0, 0.0)]
+            seen = set()
+            while stack:
+                if nodes >= self.max_nodes or (nodes % 256 == 0 and (
+                        (deadline is not None and time.time() >= deadline) or _cancelled(cancel_event))):
+                    truncated = True
+                    break
+                node_bound, i, counts, placed, volume, weight = stack.pop()
+                if node_bound <= best_volume + _BB_EPS:
+                    pruned += 1
+                    continue
+                nodes += 1
+
+                # Advance to the first position where some remaining carton fits
+                fits = []
+                while i < point_count:
+                    zi, rest = divmod(i, nx * ny)
+                    yi, xi = divmod(rest, nx)
+                    x, y, z = xs[xi], ys[yi], zs[zi]
+                    if any(b[0] <= x < b[3] and b[1] <= y < b[4] and b[2] <= z < b[5] for b in placed):
+                        i += 1
+                        continue
+                    for t, dims_list in enumerate(orientations):
+                        if not counts[t] or weight + weights[t] > truck.max_weight:
+                            continue
+                        for l, w, h in dims_list:
+                            x2, y2, z2 = x + l, y + w, z + h
+                            if x2 > truck.length + _BB_EPS or y2 > truck.width + _BB_EPS or z2 > truck.height + _BB_EPS:
+                                continue
+                            if any(x < b[3] - _BB_EPS and b[0] < x2 - _BB_EPS and y < b[4] - _BB_EPS and
+                                   b[1] < y2 - _BB_EPS and z < b[5] - _BB_EPS and b[2] < z2 - _BB_EPS
+                                   for b in placed):
+                                continue
+                            fits.append((volumes[t], t, (x, y, z, x2, y2, z2, t)))
+                    if fits:
+                        break
+                    i += 1
+                if not fits:
+                    continue
+
+                state = (i, counts, frozenset((b[0], b[1], max(b[2], z), b[3], b[4], b[5]) for b in placed if b[5] > z))
+                if state in seen:
+                    memo_hits += 1
+                    continue
+                if len(seen) >= BRANCH_AND_BOUND_MAX_MEMO:
+                    seen.clear()
+                seen.add(state)
+
+                node_bound = bound(counts, volume, weight, placed, z)
+                if node_bound <= best_volume + _BB_EPS:
+                    pruned += 1
+                    continue
+
+                # Leave the position empty, then place cartons; the largest is explored first
+                stack.append((node_bound, i + 1, counts, placed, volume, weight))
+                fits.sort(key=lambda fit: fit[0])
+                for _, t, box in fits:
+                    child_counts = counts[:t] + (counts[t] - 1,) + counts[t + 1:]
+                    child_placed = placed + (box,)
+                    child_volume = volume + volumes[t]
+                    child_weight = weight + weights[t]
+                    if child_volume > best_volume + _BB_EPS:
+                        best_volume, best_placed = child_volume, child_placed
+                    stack.append((bound(child_counts, child_volume, child_weight, child_placed, z),
+                                  i + 1, child_counts, child_placed, child_volume, child_weight))
+
+            upper_bound = max([best_volume] + [node[0] for node in stack]) if truncated else best_volume
+        elif unit_count <= self.max_boxes:
+            upper_bound = best_volume
+
+        if best_placed is not None:
+            source = 'branch_bound'
+            remaining = [list(group) for group in units]
+            packed = []
+            for x, y, z, x2, y2, z2, t in best_placed:
+                packed.append(PlacedCarton(remaining[t].pop(), x, y, z, (x2 - x, y2 - y, z2 - z)))
+            unpacked = [carton for group in remaining for carton in group]
+            packed_weight = sum(p.carton.weight for p in packed)
+        else:
+            packed = heuristic['packed_cartons']
+            unpacked = heuristic['unpacked_cartons']
+            packed_weight = sum(p.carton.weight for p in packed)
+
+        upper_bound = max(min(upper_bound, root_bound), best_volume)
+        gap = (upper_bound - best_volume) / upper_bound * 100 if upper_bound > 0 else 0.0
+        total = len(packed) + len(unpacked)
+        return {
+            'algorithm': 'Branch and Bound',
+            'packed_cartons': packed,
+            'unpacked_cartons': unpacked,
+            'volume_utilization': best_volume / truck.volume * 100,
+            'weight_utilization': packed_weight / truck.max_weight * 100,
+            'total_packed': len(packed),
+            'total_unpacked': len(unpacked),
+            'efficiency_score': len(packed) / total * 100 if total > 0 else 0,
+            'optimal': gap <= _BB_EPS,
+            'optimality_gap': gap,
+            'upper_bound_volume_utilization': upper_bound / truck.volume * 100,
+            'incumbent_source': source,
+            'nodes': nodes,
+            'pruned_nodes': pruned,
+            'memo_hits': memo_hits,
+            'truncated': truncated,
+            'search_seconds': time.time() - start,
+        }
+
+
+DEFAULT_COMPARED_ALGORITHMS = (Algorithm3DType.SKYLINE_BL, Algorithm3DType.GENETIC_ALGORITHM,
+                               Algorithm3DType.EXTREME_POINTS, Algorithm3DType.HYBRID_GENETIC)
+RACE_RESULT_MARGIN_SECONDS = 0.5  # part of the deadline kept for worker results to come back
+
 
-    def __init__(self):
+class Advanced3DPackingEngine:
+    """
+    Main engine for advanced 3D packing algorithms
+
+    deadline_seconds is the default wall-clock budget of one packing call;
+    search-based algorithms return their best packing when it expires and set
+    'truncated' in the result. ga_workers is the size of the process pool that
+    evaluates genetic algorithm populations (1, the default: in-process; None:
+    one per CPU).
+    race_workers is the number of processes compare_algorithms and
+    get_best_algorithm run algorithms in at the same time (None: one per CPU,
+    1: one after another in this process). Both pools are started on first use
+    and kept for later runs; close() stops them.
+    """
+
+    def __init__(self, deadline_seconds: Optional[float] = None, ga_workers: Optional[int] = 1,
+                 race_workers: Optional[int] = None):
+        self.deadline_seconds = deadline_seconds
+        self.ga_workers = ga_workers
+        self.race_workers = race_workers
+        self._race_lock = threading.Lock()
+        self._race_executor: Optional[ProcessPoolExecutor] = None
+        self._race_manager = None
+        self._fitness_lock = threading.Lock()
+        self._fitness_executor: Optional[ProcessPoolExecutor] = None
         self.algorithms = {
             Algorithm3DType.SKYLINE_BL: self.run_skyline,
             Algorithm3DType.GENETIC_ALGORITHM: self.run_genetic,
@@ -543,9 +1332,9 @@ class Advanced3DPackingEngine:
             },
             'branch_bound': {
                 'name': 'Branch and Bound',
-                'description': 'Systematic tree search with pruning',
+                'description': 'Exact tree search with volume and weight bounds, reports an optimality gap',
                 'complexity': 'Exponential (pruned)',
-                'best_for': 'Optimal solutions, smaller instances',
+                'best_for': 'Optimal solutions, loads of up to 30 cartons',
                 'accuracy': 'Optimal'
             },
             'tabu_search': {
@@ -585,109 +1374,289 @@ class Advanced3DPackingEngine:
             }
         }
 
-    def run_skyline(self, truck: Truck3D, cartons: List[Carton3D]) -> Dict:
+    def run_skyline(self, truck: Truck3D, cartons: List[Carton3D],
+                    deadline_seconds: Optional[float] = None,
+                    cancel_event: Optional[Any] = None) -> Dict:
         """Run Skyline Bottom Left algorithm"""
         algorithm = SkylineBottomLeft(truck)
         return algorithm.pack(cartons)
 
-    def run_genetic(self, truck: Truck3D, cartons: List[Carton3D]) -> Dict:
+    def run_genetic(self, truck: Truck3D, cartons: List[Carton3D],
+                    deadline_seconds: Optional[float] = None,
+                    cancel_event: Optional[Any] = None) -> Dict:
         """Run Genetic Algorithm"""
-        algorithm = GeneticAlgorithm3D(truck)
-        return algorithm.pack(cartons)
+        workers = self.ga_workers if self.ga_workers is not None else (os.cpu_count() or 1)
+        executor = self._fitness_pool(workers) if workers > 1 else None
+        algorithm = GeneticAlgorithm3D(truck, workers=workers if executor is not None else 1,
+                                       executor=executor)
+        result = algorithm.pack(cartons, deadline_seconds, cancel_event)
+        if algorithm.pool_failed:
+            with self._fitness_lock:
+                if self._fitness_executor is executor:
+                    self._close_fitness_pool()
+        return result
 
-    def run_extreme_points(self, truck: Truck3D, cartons: List[Carton3D]) -> Dict:
+    def run_extreme_points(self, truck: Truck3D, cartons: List[Carton3D],
+                           deadline_seconds: Optional[float] = None,
+                           cancel_event: Optional[Any] = None) -> Dict:
         """Run Extreme Points algorithm"""
         algorithm = ExtremePointsAlgorithm(truck)
         return algorithm.pack(cartons)
 
-    def run_simulated_annealing(self, truck: Truck3D, cartons: List[Carton3D]) -> Dict:
+    def run_simulated_annealing(self, truck: Truck3D, cartons: List[Carton3D],
+                                deadline_seconds: Optional[float] = None,
+                                cancel_event: Optional[Any] = None) -> Dict:
         """Run Simulated Annealing algorithm"""
-        # Simplified implementation - would need full SA logic
-        result = self.run_skyline(truck, cartons)
-        result['algorithm'] = 'Simulated Annealing'
-        result['efficiency_score'] *= 1.1  # SA typically improves results
-        return result
+        algorithm = SimulatedAnnealing3D(truck)
+        return algorithm.pack(cartons, deadline_seconds, cancel_event)
 
-    def run_branch_bound(self, truck: Truck3D, cartons: List[Carton3D]) -> Dict:
+    def run_branch_bound(self, truck: Truck3D, cartons: List[Carton3D],
+                         deadline_seconds: Optional[float] = None,
+                         cancel_event: Optional[Any] = None) -> Dict:
         """Run Branch and Bound algorithm"""
-        # Simplified implementation - would need full B&B logic
-        result = self.run_skyline(truck, cartons)
-        result['algorithm'] = 'Branch and Bound'
-        result['efficiency_score'] *= 1.15  # B&B finds optimal solutions
-        return result
+        algorithm = BranchAndBound3D(truck)
+        return algorithm.pack(cartons, deadline_seconds, cancel_event)
 
-    def run_tabu_search(self, truck: Truck3D, cartons: List[Carton3D]) -> Dict:
+    def run_tabu_search(self, truck: Truck3D, cartons: List[Carton3D],
+                        deadline_seconds: Optional[float] = None,
+                        cancel_event: Optional[Any] = None) -> Dict:
         """Run Tabu Search algorithm"""
-        result = self.run_genetic(truck, cartons)
-        result['algorithm'] = 'Tabu Search'
-        return result
+        algorithm = TabuSearch3D(truck)
+        return algorithm.pack(cartons, deadline_seconds, cancel_event)
 
-    def run_ant_colony(self, truck: Truck3D, cartons: List[Carton3D]) -> Dict:
-        """Run Ant Colony Optimization"""
+    def run_ant_colony(self, truck: Truck3D, cartons: List[Carton3D],
+                       deadline_seconds: Optional[float] = None,
+                       cancel_event: Optional[Any] = None) -> Dict:
+        """Ant Colony Optimization is not implemented yet: the skyline packing, labelled as such"""
         result = self.run_skyline(truck, cartons)
         result['algorithm'] = 'Ant Colony Optimization'
-        result['efficiency_score'] *= 1.08
+        result['base_algorithm'] = 'Skyline Bottom Left'
         return result
 
-    def run_particle_swarm(self, truck: Truck3D, cartons: List[Carton3D]) -> Dict:
-        """Run Particle Swarm Optimization"""
-        result = self.run_genetic(truck, cartons)
+    def run_particle_swarm(self, truck: Truck3D, cartons: List[Carton3D],
+                           deadline_seconds: Optional[float] = None,
+                           cancel_event: Optional[Any] = None) -> Dict:
+        """Particle Swarm Optimization is not implemented yet: the GA packing, labelled as such"""
+        result = self.run_genetic(truck, cartons, deadline_seconds, cancel_event)
         result['algorithm'] = 'Particle Swarm Optimization'
-        result['efficiency_score'] *= 1.05
+        result['base_algorithm'] = 'Genetic Algorithm'
         return result
 
-    def run_hybrid_genetic(self, truck: Truck3D, cartons: List[Carton3D]) -> Dict:
-        """Run Hybrid Genetic + Local Search"""
-        result = self.run_genetic(truck, cartons)
+    def run_hybrid_genetic(self, truck: Truck3D, cartons: List[Carton3D],
+                           deadline_seconds: Optional[float] = None,
+                           cancel_event: Optional[Any] = None) -> Dict:
+        """Hybrid Genetic + Local Search is not implemented yet: the GA packing, labelled as such"""
+        result = self.run_genetic(truck, cartons, deadline_seconds, cancel_event)
         result['algorithm'] = 'Hybrid Genetic + Local Search'
-        result['efficiency_score'] *= 1.2  # Hybrid typically best
+        result['base_algorithm'] = 'Genetic Algorithm'
         return result
 
-    def run_deep_rl(self, truck: Truck3D, cartons: List[Carton3D]) -> Dict:
-        """Run Deep Reinforcement Learning"""
-        result = self.run_genetic(truck, cartons)
+    def run_deep_rl(self, truck: Truck3D, cartons: List[Carton3D],
+                    deadline_seconds: Optional[float] = None,
+                    cancel_event: Optional[Any] = None) -> Dict:
+        """Deep Reinforcement Learning is not implemented yet: the GA packing, labelled as such"""
+        result = self.run_genetic(truck, cartons, deadline_seconds, cancel_event)
         result['algorithm'] = 'Deep Reinforcement Learning'
-        result['efficiency_score'] *= 1.12
+        result['base_algorithm'] = 'Genetic Algorithm'
         return result
 
     def pack_with_algorithm(self, truck: Truck3D, cartons: List[Carton3D],
-                            algorithm_type: Algorithm3DType) -> Dict:
-        """Pack cartons using specified algorithm"""
+                            algorithm_type: Algorithm3DType,
+                            deadline_seconds: Optional[float] = None,
+                            cancel_event: Optional[Any] = None) -> Dict:
+        """
+        Pack cartons using specified algorithm within deadline_seconds (engine
+        default if None); search-based algorithms also stop once cancel_event
+        (a threading or multiprocessing Event) is set
+        """
+        if deadline_seconds is None:
+            deadline_seconds = self.deadline_seconds
         if algorithm_type in self.algorithms:
-            return self.algorithms[algorithm_type](truck, cartons)
+            result = self.algorithms[algorithm_type](truck, cartons, deadline_seconds, cancel_event)
+            result.setdefault('truncated', False)
+            return result
         else:
             raise ValueError(f"Unknown algorithm type: {algorithm_type}")
 
-    def compare_algorithms(self, truck: Truck3D, cartons: List[Carton3D],
-                           algorithms: List[Algorithm3DType] = None) -> Dict[str, Dict]:
-        """Compare multiple algorithms and return results"""
+    def _race_pool(self, workers: int) -> Tuple[Optional[ProcessPoolExecutor], Any]:
+        """The long-lived race pool and the manager handing out per-race cancel events"""
+        with self._race_lock:
+            if self._race_executor is None:
+                try:
+                    self._race_manager = multiprocessing.Manager()
+                    self._race_executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_race_worker)
+                except (OSError, ValueError, NotImplementedError, EOFError) as e:
+                    logger.warning(f"Process pool unavailable ({e}), running algorithms one after another")
+                    self._close_race_pool()
+            return self._race_executor, self._race_manager
+
+    def _close_race_pool(self):
+        if self._race_executor is not None:
+            self._race_executor.shutdown(wait=False, cancel_futures=True)
+        if self._race_manager is not None:
+            self._race_manager.shutdown()
+        self._race_executor = None
+        self._race_manager = None
+
+    def _fitness_pool(self, workers: int) -> Optional[ProcessPoolExecutor]:
+        """The long-lived pool GA runs evaluate their populations in"""
+        with self._fitness_lock:
+            if self._fitness_executor is None:
+                try:
+                    self._fitness_executor = ProcessPoolExecutor(max_workers=workers)
+                except (OSError, ValueError, NotImplementedError) as e:
+                    logger.warning(f"Process pool unavailable ({e}), evaluating fitness serially")
+            return self._fitness_executor
+
+    def _close_fitness_pool(self):
+        if self._fitness_executor is not None:
+            self._fitness_executor.shutdown(wait=False, cancel_futures=True)
+        self._fitness_executor = None
+
+    def close(self):
+        """Stop the race and fitness worker processes (later runs start new ones)"""
+        with self._race_lock:
+            self._close_race_pool()
+        with self._fitness_lock:
+            self._close_fitness_pool()
+
+    def race_algorithms(self, truck: Truck3D, cartons: List[Carton3D],
+                        algorithms: List[Algorithm3DType] = None,
+                        deadline_seconds: Optional[float] = None,
+                        stop_score: Optional[float] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Run algorithms at the same time and yield (algorithm, result) as each finishes
+
+        The algorithms race in a pool of race_workers processes (capped at the
+        CPU count) within one shared deadline. Workers get the deadline minus
+        RACE_RESULT_MARGIN_SECONDS, and algorithms still out at the deadline are
+        reported as errors, so the race never runs past it. Once a result
+        reaches an efficiency_score of stop_score, the algorithms still running
+        are cancelled and yielded as errors with 'cancelled' set. Errors of an
+        algorithm are yielded as {'error': ...}.
+        """
         if algorithms is None:
-            algorithms = [Algorithm3DType.SKYLINE_BL, Algorithm3DType.GENETIC_ALGORITHM,
-                          Algorithm3DType.EXTREME_POINTS, Algorithm3DType.HYBRID_GENETIC]
-
-        results = {}
-        for algorithm in algorithms:
+            algorithms = list(DEFAULT_COMPARED_ALGORITHMS)
+        if deadline_seconds is None:
+            deadline_seconds = self.deadline_seconds
+        deadline = time.time() + deadline_seconds if deadline_seconds is not None else None
+
+        def unbeatable(result: Dict) -> bool:
+            return stop_score is not None and 'error' not in result and \
+                result.get('efficiency_score', 0) >= stop_score - 1e-9
+
+        cpus = os.cpu_count() or 1
+        executor = manager = None
+        if min(self.race_workers or cpus, cpus, len(algorithms)) > 1:
+            executor, manager = self._race_pool(min(self.race_workers or cpus, cpus))
+
+        if executor is None:
+            for position, algorithm in enumerate(algorithms):
+                result = _race_algorithm(self, algorithm, truck, cartons, deadline, None, first=position == 0)
+                yield algorithm.value, result
+                if unbeatable(result):
+                    for cancelled in algorithms[position + 1:]:
+                        yield cancelled.value, _race_error(cancelled, 'Cancelled: an earlier result cannot be beaten',
+                                                           cancelled=True)
+                    return
+            return
+
+        worker_deadline = deadline - min(RACE_RESULT_MARGIN_SECONDS, deadline_seconds / 4) \
+            if deadline is not None else None
+        cancel_event = manager.Event()
+        futures = {}
+        try:
+            futures = {executor.submit(_race_algorithm_in_worker, algorithm.value, truck, cartons,
+                                       worker_deadline, cancel_event): algorithm
+                       for algorithm in algorithms}
+            outstanding = set(futures)
+            while outstanding:
+                timeout = None if deadline is None else max(0.0, deadline - time.time())
+                done, outstanding = wait(outstanding, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    for future in outstanding:
+                        yield futures[future].value, _race_error(
+                            futures[future], 'Deadline reached before the algorithm finished')
+                    return
+                stop = False
+                for future in done:
+                    algorithm = futures[future]
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool as e:
+                        with self._race_lock:
+                            if self._race_executor is executor:
+                                self._close_race_pool()
+                        result = _race_error(algorithm, f'Worker process failed: {e}', truncated=False)
+                    except Exception as e:
+                        result = _race_error(algorithm, str(e), truncated=False)
+                    yield algorithm.value, result
+                    stop = stop or unbeatable(result)
+                if stop and outstanding:
+                    logger.info(f"Unbeatable result found; cancelling {len(outstanding)} algorithm runs")
+                    for future in outstanding:
+                        yield futures[future].value, _race_error(
+                            futures[future], 'Cancelled: an earlier result cannot be beaten', cancelled=True)
+                    return
+        finally:
+            # Also reached when the consumer stops listening: queued runs never start,
+            # running searches stop at their next check and free their worker
             try:
-                result = self.pack_with_algorithm(truck, cartons, algorithm)
-                results[algorithm.value] = result
-            except Exception as e:
-                results[algorithm.value] = {
-                    'error': str(e),
-                    'algorithm': algorithm.value
-                }
+                cancel_event.set()
+            except (OSError, EOFError):
+                pass
+            for future in futures:
+                future.cancel()
 
+    def compare_algorithms(self, truck: Truck3D, cartons: List[Carton3D],
+                           algorithms: List[Algorithm3DType] = None,
+                           deadline_seconds: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Compare multiple algorithms within one shared deadline and return results
+        in the order of algorithms; they race in parallel (see race_algorithms)
+        """
+        if algorithms is None:
+            algorithms = list(DEFAULT_COMPARED_ALGORITHMS)
+        results = dict.fromkeys(algorithm.value for algorithm in algorithms)
+        for algorithm, result in self.race_algorithms(truck, cartons, algorithms, deadline_seconds):
+            results[algorithm] = result
         return results
 
-    def get_best_algorithm(self, truck: Truck3D, cartons: List[Carton3D]) -> Tuple[str, Dict]:
-        """Find the best algorithm for given truck and cartons"""
-        results = self.compare_algorithms(truck, cartons)
+    @staticmethod
+    def efficiency_upper_bound(truck: Truck3D, cartons: List[Carton3D]) -> float:
+        """
+        Highest efficiency_score any algorithm can reach: the share of units left
+        after dropping those that fit in no orientation, then the largest (by
+        volume) and heaviest ones the truck's volume and weight cannot hold
+        """
+        units = [carton for carton in cartons for _ in range(carton.quantity)]
+        if not units:
+            return 0.0
+        dims = sorted((truck.length, truck.width, truck.height))
+        fitting = [c for c in units if all(d <= t for d, t in zip(sorted((c.length, c.width, c.height)), dims))]
+
+        def most_units(sizes: List[float], capacity: float) -> int:
+            count = 0
+            for size in sorted(sizes):
+                capacity -= size
+                if capacity < -1e-9:
+                    break
+                count += 1
+            return count
 
+        packable = min(most_units([c.volume for c in fitting], truck.volume),
+                       most_units([c.weight for c in fitting], truck.max_weight))
+        return packable / len(units) * 100
+
+    @staticmethod
+    def select_best(results: Dict[str, Dict]) -> Tuple[Optional[str], Optional[Dict]]:
+        """Highest efficiency_score among results without errors; ties go to the earlier entry"""
         best_algorithm = None
         best_score = -1
         best_result = None
 
         for algorithm, result in results.items():
-            if 'error' not in result:
+            if result is not None and 'error' not in result:
                 score = result.get('efficiency_score', 0)
                 if score > best_score:
                     best_score = score
@@ -695,3 +1664,59 @@ class Advanced3DPackingEngine:
                     best_result = result
 
         return best_algorithm, best_result
+
+    def get_best_algorithm(self, truck: Truck3D, cartons: List[Carton3D],
+                           deadline_seconds: Optional[float] = None) -> Tuple[str, Dict]:
+        """
+        Find the best algorithm for given truck and cartons
+
+        The default algorithms race in parallel; once one reaches the
+        efficiency_upper_bound, the slower ones are cancelled.
+        """
+        algorithms = list(DEFAULT_COMPARED_ALGORITHMS)
+        results = dict.fromkeys(algorithm.value for algorithm in algorithms)
+        for algorithm, result in self.race_algorithms(truck, cartons, algorithms, deadline_seconds,
+                                                      stop_score=self.efficiency_upper_bound(truck, cartons)):
+            results[algorithm] = result
+        return self.select_best(results)
+
+
+def _race_error(algorithm: Algorithm3DType, message: str, truncated: bool = True, cancelled: bool = False) -> Dict:
+    error = {'error': message, 'algorithm': algorithm.value, 'truncated': truncated}
+    if cancelled:
+        error['cancelled'] = True
+    return error
+
+
+def _race_algorithm(engine: Advanced3DPackingEngine, algorithm: Algorithm3DType, truck: Truck3D,
+                    cartons: List[Carton3D], deadline: Optional[float], cancel_event: Optional[Any],
+                    first: bool = False) -> Dict:
+    """One racing algorithm's result, or an error entry (the first one always runs)"""
+    remaining = None
+    if deadline is not None:
+        remaining = deadline - time.time()
+        if remaining <= 0 and not first:
+            return _race_error(algorithm, 'Deadline reached before the algorithm could run')
+        remaining = max(0.0, remaining)
+    if _cancelled(cancel_event):
+        return _race_error(algorithm, 'Cancelled: an earlier result cannot be beaten', cancelled=True)
+    try:
+        return engine.pack_with_algorithm(truck, cartons, algorithm, remaining, cancel_event)
+    except Exception as e:
+        return _race_error(algorithm, str(e), truncated=False)
+
+
+_race_engine: Optional[Advanced3DPackingEngine] = None
+
+
+def _init_race_worker():
+    """Process pool initializer: one engine per worker"""
+    global _race_engine
+    # The race already uses every CPU, so the GA evaluates in-process
+    _race_engine = Advanced3DPackingEngine(ga_workers=1)
+
+
+def _race_algorithm_in_worker(algorithm_value: str, truck: Truck3D, cartons: List[Carton3D],
+                              deadline: Optional[float], cancel_event: Any) -> Dict:
+    return _race_algorithm(_race_engine, Algorithm3DType(algorithm_value), truck, cartons, deadline,
+                           cancel_event, first=True)
@@ -44,6 +44,9 @@ except Exception as e:
 # Global timing for performance monitoring
 APP_START_TIME = time.time()
 
+# Budget of one packing call; requests must answer before the 10 s front end timeout
+ALGORITHM_DEADLINE_SECONDS = 8.0
+
 
 class TruckOptimum:
     def __init__(self):
@@ -66,7 +69,10 @@ class TruckOptimum:
         # Initialize advanced 3D algorithms engine
         try:
             if ADVANCED_ALGORITHMS_AVAILABLE:
-                self.advanced_engine = Advanced3DPackingEngine()
+                # One GA fitness worker per CPU; the fitness and race pools are reused across requests
+                self.advanced_engine = Advanced3DPackingEngine(deadline_seconds=ALGORITHM_DEADLINE_SECONDS,
+                                                               ga_workers=None)
+                atexit.register(self.advanced_engine.close)
                 if ERROR_LOGGING_ENABLED:
                     error_logger.log_debug("Advanced 3D algorithms engine initialized", "STARTUP")
                 print("DEBUG: Advanced 3D algorithms engine initialized")
@@ -1406,6 +1412,8 @@ Carton Details:
                         'total_packed': result['total_packed'],
                         'total_unpacked': result['total_unpacked'],
                         'efficiency_score': result['efficiency_score'],
+                        'truncated': result['truncated'],
+                        'convergence': result.get('convergence', []),
                         'truck_info': {
                             'name': truck.name,
                             'volume': truck.volume,
@@ -1424,6 +1432,10 @@ Carton Details:
                             'weight': uc.weight
                         } for uc in result['unpacked_cartons']]
                     }
+                    if 'optimality_gap' in result:
+                        json_result['optimal'] = result['optimal']
+                        json_result['optimality_gap'] = result['optimality_gap']
+                        json_result['upper_bound_volume_utilization'] = result['upper_bound_volume_utilization']
 
                     return jsonify(json_result)
 
@@ -1433,9 +1445,37 @@ Carton Details:
                 print(traceback.format_exc())
                 return jsonify({'error': str(e)}), 500
 
+        def algorithm_result_summary(result):
+            """JSON-safe summary of one algorithm result (errors are passed through)"""
+            if 'error' in result:
+                return result
+            return {
+                'algorithm': result['algorithm'],
+                'volume_utilization': result['volume_utilization'],
+                'weight_utilization': result['weight_utilization'],
+                'total_packed': result['total_packed'],
+                'total_unpacked': result['total_unpacked'],
+                'efficiency_score': result['efficiency_score'],
+                'truncated': result.get('truncated', False)
+            }
+
+        def stream_json_lines(lines):
+            """Newline-delimited JSON response sending each object as soon as it is produced"""
+            import json
+            from flask import Response, stream_with_context
+            return Response(stream_with_context(json.dumps(line) + '\n' for line in lines),
+                            mimetype='application/x-ndjson')
+
         @self.app.route('/api/algorithms/compare', methods=['POST'])
         def api_algorithms_compare_route():
-            """Compare multiple algorithms for the same packing problem"""
+            """
+            Compare multiple algorithms for the same packing problem
+
+            The algorithms race in parallel within the engine deadline. With
+            "stream": true the response is newline-delimited JSON: one
+            {"algorithm_type", "result"} line as each algorithm finishes, then
+            a {"done": true} line.
+            """
             if not ADVANCED_ALGORITHMS_AVAILABLE:
                 return jsonify({'error': 'Advanced algorithms not available'}), 503
 
@@ -1493,32 +1533,32 @@ Carton Details:
                         except ValueError:
                             return jsonify({'error': f'Unknown algorithm: {alg}'}), 400
 
+                    truck_info = {
+                        'name': truck.name,
+                        'volume': truck.volume,
+                        'max_weight': truck.max_weight
+                    }
+
+                    if data.get('stream'):
+                        def compare_lines():
+                            for alg_name, result in self.advanced_engine.race_algorithms(
+                                    truck, cartons, algorithm_enums):
+                                yield {'algorithm_type': alg_name, 'result': algorithm_result_summary(result)}
+                            yield {'done': True, 'success': True, 'truck_info': truck_info}
+
+                        return stream_json_lines(compare_lines())
+
                     # Compare algorithms
                     results = self.advanced_engine.compare_algorithms(truck, cartons, algorithm_enums)
 
                     # Convert results for JSON
-                    json_results = {}
-                    for alg_name, result in results.items():
-                        if 'error' not in result:
-                            json_results[alg_name] = {
-                                'algorithm': result['algorithm'],
-                                'volume_utilization': result['volume_utilization'],
-                                'weight_utilization': result['weight_utilization'],
-                                'total_packed': result['total_packed'],
-                                'total_unpacked': result['total_unpacked'],
-                                'efficiency_score': result['efficiency_score']
-                            }
-                        else:
-                            json_results[alg_name] = result
+                    json_results = {alg_name: algorithm_result_summary(result)
+                                    for alg_name, result in results.items()}
 
                     return jsonify({
                         'success': True,
                         'results': json_results,
-                        'truck_info': {
-                            'name': truck.name,
-                            'volume': truck.volume,
-                            'max_weight': truck.max_weight
-                        }
+                        'truck_info': truck_info
                     })
 
             except Exception as e:
@@ -1529,7 +1569,15 @@ Carton Details:
 
         @self.app.route('/api/algorithms/best', methods=['POST'])
         def api_algorithms_best_route():
-            """Find the best algorithm for given truck and cartons"""
+            """
+            Find the best algorithm for given truck and cartons
+
+            The default algorithms race in parallel and the slower ones are
+            cancelled once a result cannot be beaten. With "stream": true the
+            response is newline-delimited JSON: one {"algorithm_type", "result",
+            "leader"} line per finished algorithm, then a final
+            {"done": true, "best_algorithm", "result"} line.
+            """
             if not ADVANCED_ALGORITHMS_AVAILABLE:
                 return jsonify({'error': 'Advanced algorithms not available'}), 503
 
@@ -1578,6 +1626,25 @@ Carton Details:
                             )
                             cartons.append(carton)
 
+                    if data.get('stream'):
+                        engine = self.advanced_engine
+
+                        def best_lines():
+                            results = {}
+                            for alg_name, result in engine.race_algorithms(
+                                    truck, cartons, stop_score=engine.efficiency_upper_bound(truck, cartons)):
+                                results[alg_name] = result
+                                yield {'algorithm_type': alg_name, 'result': algorithm_result_summary(result),
+                                       'leader': engine.select_best(results)[0]}
+                            best_algorithm, best_result = engine.select_best(results)
+                            yield {'done': True, 'success': best_result is not None,
+                                   'best_algorithm': best_algorithm,
+                                   'result': algorithm_result_summary(best_result) if best_result else None,
+                                   'truck_info': {'name': truck.name, 'volume': truck.volume,
+                                                  'max_weight': truck.max_weight}}
+
+                        return stream_json_lines(best_lines())
+
                     # Find best algorithm
                     best_algorithm, best_result = self.advanced_engine.get_best_algorithm(truck, cartons)
 
@@ -2550,9 +2617,13 @@ def create_app():
 
 
 if __name__ == '__main__':
+    import multiprocessing
     import webbrowser
     import threading
 
+    # Algorithm worker processes re-run this module in the frozen executable
+    multiprocessing.freeze_support()
+
     print("TruckOptimum starting...")
 
     app = create_app()
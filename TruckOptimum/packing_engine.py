@@ -3,9 +3,31 @@ Advanced 3D Packing Engine - Lazy Loaded
 Smart truck recommendation with real 3D bin packing algorithms
 """
 
+import math
+import os
+import sys
 import time
 from typing import List, Dict, Tuple, Optional
 
+try:
+    # Frozen builds bundle app/spatial_index.py as a top-level module through the .spec
+    import spatial_index
+except ImportError:
+    # Source checkout: load only the web app's copy by path, without putting app/ on sys.path;
+    # registering it lets the other TruckOptimum modules import the same module object
+    import importlib.util
+    _spec = importlib.util.spec_from_file_location(
+        'spatial_index',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'spatial_index.py'))
+    spatial_index = importlib.util.module_from_spec(_spec)
+    sys.modules['spatial_index'] = spatial_index
+    _spec.loader.exec_module(spatial_index)
+from spatial_index import (NUMPY_AVAILABLE, HeightMap, SpatialIndex, exact_height_map_resolution,
+                           height_map_resolution, suggested_cell_size)
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
 class Carton3D:
     """3D Carton with rotation capabilities"""
     def __init__(self, id: int, name: str, length: float, width: float, height: float, weight: float):
@@ -127,6 +149,8 @@ class Advanced3DPacker:
         packed_positions = []
         current_weight = 0
         occupied_spaces = []
+        occupied_index = SpatialIndex(suggested_cell_size(
+            min(c.length, c.width, c.height) for c in sorted_cartons))
         
         for carton in sorted_cartons:
             if current_weight + carton.weight > truck.max_weight:
@@ -141,7 +165,7 @@ class Advanced3DPacker:
                 l, w, h = rotation
                 
                 # Try to find position using bottom-left strategy
-                position = self._find_bottom_left_position(l, w, h, truck, occupied_spaces)
+                position = self._find_bottom_left_position(l, w, h, truck, occupied_spaces, occupied_index)
                 
                 if position:
                     best_position = position
@@ -162,6 +186,7 @@ class Advanced3DPacker:
                 
                 # Mark space as occupied
                 occupied_spaces.append((x, y, z, x + l, y + w, z + h))
+                occupied_index.insert(len(occupied_spaces) - 1, x, y, z, x + l, y + w, z + h)
                 current_weight += carton.weight
                 result.packed_cartons.append(carton)
             else:
@@ -178,13 +203,20 @@ class Advanced3DPacker:
         return result
     
     def _find_bottom_left_position(self, length: float, width: float, height: float, 
-                                   truck: Truck3D, occupied_spaces: List[Tuple]) -> Optional[Tuple[float, float, float]]:
+                                   truck: Truck3D, occupied_spaces: List[Tuple],
+                                   occupied_index: Optional[SpatialIndex] = None) -> Optional[Tuple[float, float, float]]:
         """Find bottom-left position for carton with given dimensions"""
         
+        # Candidate coordinates in first-seen order; repeats would only re-test the same spot
+        z_candidates = list(dict.fromkeys([0] + [space[5] for space in occupied_spaces]))  # Floor and tops of existing boxes
+        y_candidates = list(dict.fromkeys([0] + [space[4] for space in occupied_spaces]))  # Back and fronts
+        x_candidates = list(dict.fromkeys([0] + [space[3] for space in occupied_spaces]))  # Left and rights
+        overlap_source = occupied_index if occupied_index is not None else occupied_spaces
+        
         # Start from bottom-left corner
-        for z in [0] + [space[5] for space in occupied_spaces]:  # Try floor and tops of existing boxes
-            for y in [0] + [space[4] for space in occupied_spaces]:  # Try back and fronts
-                for x in [0] + [space[3] for space in occupied_spaces]:  # Try left and rights
+        for z in z_candidates:
+            for y in y_candidates:
+                for x in x_candidates:
                     
                     # Check if carton fits in truck at this position
                     if (x + length <= truck.length and 
@@ -193,15 +225,18 @@ class Advanced3DPacker:
                         
                         # Check if position conflicts with existing cartons
                         new_space = (x, y, z, x + length, y + width, z + height)
-                        if not self._spaces_overlap(new_space, occupied_spaces):
+                        if not self._spaces_overlap(new_space, overlap_source):
                             return (x, y, z)
         
         return None
     
-    def _spaces_overlap(self, space1: Tuple, occupied_spaces: List[Tuple]) -> bool:
-        """Check if space overlaps with any occupied space"""
+    def _spaces_overlap(self, space1: Tuple, occupied_spaces) -> bool:
+        """Check if space overlaps with any occupied space (list of tuples or SpatialIndex)"""
         x1, y1, z1, x2, y2, z2 = space1
         
+        if isinstance(occupied_spaces, SpatialIndex):
+            return occupied_spaces.overlaps(x1, y1, z1, x2, y2, z2)
+        
         for occupied in occupied_spaces:
             ox1, oy1, oz1, ox2, oy2, oz2 = occupied
             
@@ -251,22 +286,26 @@ class Advanced3DPacker:
         
         stability_score = 0.0
         total_cartons = len(packed_positions)
+        support_ratios = self._support_ratios(packed_positions, truck)
         
-        for item in packed_positions:
+        for item, support_ratio in zip(packed_positions, support_ratios):
             x, y, z = item['position']
             
             # Ground support gets full points
             if z == 0:
                 stability_score += 100
             else:
-                # Calculate support from boxes below
-                support_ratio = self._calculate_support_ratio(item, packed_positions)
+                # Support from boxes below
                 stability_score += support_ratio * 100
         
         return stability_score / total_cartons if total_cartons > 0 else 0.0
     
-    def _calculate_support_ratio(self, item: Dict, all_items: List[Dict]) -> float:
-        """Calculate how much of the carton is supported by boxes below"""
+    def _calculate_support_ratio(self, item: Dict, all_items: List[Dict],
+                                 height_map: Optional[HeightMap] = None) -> float:
+        """
+        Calculate how much of the carton is supported by boxes below
+        (from the height map of the cartons placed before it, when given)
+        """
         x, y, z = item['position']
         l, w, h = item['dimensions']
         
@@ -276,6 +315,12 @@ class Advanced3DPacker:
         supported_area = 0.0
         total_area = l * w
         
+        if height_map is not None:
+            # None when a top face hidden under an overhang may be involved
+            visible_area = height_map.supported_area(x, y, x + l, y + w, z, tolerance=1e-6)
+            if visible_area is not None:
+                return min(visible_area / total_area, 1.0) if total_area > 0 else 0.0
+        
         # Check overlap with boxes directly below
         for other in all_items:
             if other == item:
@@ -294,6 +339,27 @@ class Advanced3DPacker:
         
         return min(supported_area / total_area, 1.0) if total_area > 0 else 0.0
     
+    def _support_ratios(self, packed_positions: List[Dict], truck: Truck3D) -> List[float]:
+        """
+        Support ratio of every packed item, replaying the placements on a height map
+        (pairwise scan without NumPy or when the dimensions share no usable grid)
+        """
+        resolution = None
+        if NUMPY_AVAILABLE and packed_positions:
+            resolution = exact_height_map_resolution(
+                truck.length, truck.width, [side for item in packed_positions for side in item['dimensions']])
+        if resolution is None:
+            return [self._calculate_support_ratio(item, packed_positions) for item in packed_positions]
+        
+        height_map = HeightMap(truck.length, truck.width, resolution)
+        ratios = []
+        for index, item in enumerate(packed_positions):
+            x, y, z = item['position']
+            l, w, h = item['dimensions']
+            ratios.append(self._calculate_support_ratio(item, packed_positions, height_map))
+            height_map.place(index, x, y, x + l, y + w, z + h, bottom=z, tolerance=1e-6)
+        return ratios
+    
     def _skyline_extreme_points(self, truck: Truck3D, cartons: List[Carton3D]) -> PackingResult:
         """Enhanced Skyline Algorithm with Extreme Points optimization"""
         result = PackingResult()
@@ -360,7 +426,7 @@ class Advanced3DPacker:
         
         packed_positions = []
         current_weight = 0
-        center_of_gravity_tracker = CenterOfGravityTracker()
+        center_of_gravity_tracker = CenterOfGravityTracker(truck, sorted_cartons)
         
         for carton in sorted_cartons:
             if current_weight + carton.weight > truck.max_weight:
@@ -450,6 +516,14 @@ class Advanced3DPacker:
             if l > truck.length or w > truck.width or h > truck.height:
                 continue
             
+            if cog_tracker.height_map is not None:
+                # Every floor position at once, with the carton resting on the load below
+                placement = cog_tracker.best_resting_placement(carton, rotation, truck)
+                if placement is not None and placement[1] > best_stability:
+                    best_stability = placement[1]
+                    best_placement = (placement[0], rotation, placement[1])
+                continue
+            
             # Try positions that minimize center of gravity displacement
             for x in range(0, int(truck.length - l) + 1):
                 for y in range(0, int(truck.width - w) + 1):
@@ -502,11 +576,9 @@ class Advanced3DPacker:
         
         total_stability = 0.0
         total_weight = sum(item['carton'].weight for item in packed_positions)
+        support_ratios = self._support_ratios(packed_positions, truck)
         
-        for item in packed_positions:
-            # Base support calculation
-            support_ratio = self._calculate_support_ratio(item, packed_positions)
-            
+        for item, support_ratio in zip(packed_positions, support_ratios):
             # Weight distribution factor
             weight_factor = item['carton'].weight / total_weight if total_weight > 0 else 0
             
@@ -596,7 +668,8 @@ class Advanced3DPacker:
         extreme_points = [(0, 0, 0)]  # Start with origin
         packed_positions = []
         current_weight = 0
-        occupied_spaces = []
+        occupied_spaces = SpatialIndex(suggested_cell_size(
+            min(c.length, c.width, c.height) for c in sorted_cartons))
         
         for carton in sorted_cartons:
             if current_weight + carton.weight > truck.max_weight:
@@ -630,7 +703,7 @@ class Advanced3DPacker:
                 # Remove dominated extreme points
                 extreme_points = self._filter_dominated_extreme_points(extreme_points, truck)
                 
-                occupied_spaces.append((x, y, z, x + l, y + w, z + h))
+                occupied_spaces.insert(len(packed_positions) - 1, x, y, z, x + l, y + w, z + h)
                 current_weight += carton.weight
                 result.packed_cartons.append(carton)
             else:
@@ -861,19 +934,33 @@ class ExtremePointsManager:
 
 
 class CenterOfGravityTracker:
-    """Tracks and optimizes center of gravity for load stability"""
+    """
+    Tracks and optimizes center of gravity for load stability.
+    Given the truck (and NumPy), it also keeps a height map of the load so the
+    resting height at every floor position is one array operation.
+    """
     
-    def __init__(self):
+    def __init__(self, truck: Optional[Truck3D] = None, cartons: Optional[List[Carton3D]] = None):
         self.total_weight = 0.0
         self.weighted_x = 0.0
         self.weighted_y = 0.0
         self.weighted_z = 0.0
+        self.carton_count = 0
+        self.height_map = None
+        if truck is not None and NUMPY_AVAILABLE:
+            sides = [side for carton in cartons or [] for side in (carton.length, carton.width, carton.height)]
+            self.height_map = HeightMap(truck.length, truck.width,
+                                        height_map_resolution(truck.length, truck.width, sides))
     
     def add_carton(self, carton: Carton3D, position: Tuple, rotation: Tuple):
         """Add carton to center of gravity calculation"""
         x, y, z = position
         l, w, h = rotation
         
+        if self.height_map is not None:
+            self.height_map.place(self.carton_count, x, y, x + l, y + w, z + h, bottom=z)
+        self.carton_count += 1
+        
         # Calculate carton center
         center_x = x + l / 2
         center_y = y + w / 2
@@ -922,6 +1009,45 @@ class CenterOfGravityTracker:
         
         return max(0.0, stability - height_penalty)
     
+    def best_resting_placement(self, carton: Carton3D, rotation: Tuple,
+                               truck: Truck3D) -> Optional[Tuple[Tuple, float]]:
+        """
+        Grid position with the best stability impact for a carton lowered onto
+        the load, as ((x, y, z), stability), or None if it fits nowhere.
+        Same score as calculate_stability_impact, evaluated for every position at once.
+        """
+        l, w, h = rotation
+        height_map = self.height_map
+        resolution = height_map.resolution
+        cells_l = max(1, math.ceil(l / resolution - 1e-9))
+        cells_w = max(1, math.ceil(w / resolution - 1e-9))
+        if cells_l > height_map.shape[0] or cells_w > height_map.shape[1]:
+            return None
+        
+        z = height_map.resting_heights(cells_l, cells_w)
+        xs = np.arange(z.shape[0])[:, None] * resolution
+        ys = np.arange(z.shape[1])[None, :] * resolution
+        valid = (xs + l <= truck.length) & (ys + w <= truck.width) & (z + h <= truck.height)
+        if not valid.any():
+            return None
+        
+        if self.total_weight == 0:
+            stability = np.full(z.shape, 100.0)  # First carton always has good stability
+        else:
+            new_total_weight = self.total_weight + carton.weight
+            new_cog_x = (self.weighted_x + carton.weight * (xs + l / 2)) / new_total_weight
+            new_cog_y = (self.weighted_y + carton.weight * (ys + w / 2)) / new_total_weight
+            new_cog_z = (self.weighted_z + carton.weight * (z + h / 2)) / new_total_weight
+            distance_from_ideal = np.sqrt((new_cog_x - truck.length / 2) ** 2 +
+                                          (new_cog_y - truck.width / 2) ** 2)
+            max_distance = ((truck.length / 2) ** 2 + (truck.width / 2) ** 2) ** 0.5
+            stability = 100.0 * (1.0 - distance_from_ideal / max_distance)
+            stability = np.maximum(0.0, stability - (new_cog_z / truck.height) * 20.0)
+        
+        stability = np.where(valid, stability, -np.inf)
+        i, j = np.unravel_index(np.argmax(stability), stability.shape)
+        return (float(i * resolution), float(j * resolution), float(z[i, j])), float(stability[i, j])
+    
     def calculate_overall_stability(self, truck: Truck3D) -> float:
         """Calculate overall load stability"""
         if self.total_weight == 0:
@@ -1122,6 +1248,11 @@ class CenterOfGravityTracker:
         
         # Check for support from below
         support_area = 0
+        if isinstance(occupied_spaces, SpatialIndex):
+            for _, overlap_area in occupied_spaces.below(x, y, x + 1, y + 1, z):  # Simplified calculation
+                support_area += overlap_area
+            return min(100, support_area * 50)
+        
         for space in occupied_spaces:
             sx, sy, sz, ex, ey, ez = space
             if ez == z:  # Space directly below
@@ -1154,9 +1285,10 @@ class CenterOfGravityTracker:
             return 0.0
         
         stability_scores = []
-        for item in packed_positions:
+        support_ratios = self._support_ratios(packed_positions, truck)
+        for item, support_ratio in zip(packed_positions, support_ratios):
             corner_fitness = item.get('corner_fitness', 0)
-            base_stability = self._calculate_support_ratio(item, packed_positions) * 100
+            base_stability = support_ratio * 100
             
             # Bonus for corner fitness
             enhanced_stability = base_stability + corner_fitness * 0.1
@@ -1170,9 +1302,10 @@ class CenterOfGravityTracker:
             return 0.0
         
         stability_scores = []
-        for item in packed_positions:
+        support_ratios = self._support_ratios(packed_positions, truck)
+        for item, support_ratio in zip(packed_positions, support_ratios):
             domain_score = item.get('domain_score', 0)
-            base_stability = self._calculate_support_ratio(item, packed_positions) * 100
+            base_stability = support_ratio * 100
             
             # Domain optimization bonus
             enhanced_stability = base_stability + domain_score * 0.05
@@ -1186,9 +1319,10 @@ class CenterOfGravityTracker:
             return 0.0
         
         stability_scores = []
-        for item in packed_positions:
+        support_ratios = self._support_ratios(packed_positions, truck)
+        for item, support_ratio in zip(packed_positions, support_ratios):
             waste_reduction = item.get('waste_reduction', 0)
-            base_stability = self._calculate_support_ratio(item, packed_positions) * 100
+            base_stability = support_ratio * 100
             
             # Waste optimization contributes to stability
             enhanced_stability = base_stability + waste_reduction * 0.02
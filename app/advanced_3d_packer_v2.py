@@ -15,10 +15,21 @@ from typing import List, Dict, Tuple, Optional, Any, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from copy import deepcopy
 
+import numpy as np
+
+from .spatial_index import SpatialIndex, suggested_cell_size
+
 logger = logging.getLogger(__name__)
 
+# Largest candidates x packed boxes comparison done in one array operation
+BATCH_ELEMENTS = 250_000
+
 
 class PackingStrategy(Enum):
     """Advanced packing strategies based on 2024-2025 research"""
@@ -72,12 +83,141 @@ class PackingResult:
     algorithm_used: str
     processing_time: float
     warnings: List[str] = None
+    truncated: bool = False  # deadline or cancellation before every carton was tried
 
     def __post_init__(self):
         if self.warnings is None:
             self.warnings = []
 
 
+class ExtremePointSet:
+    """
+    Extreme points of a partly packed container, updated after every placement.
+
+    Coordinates follow the V2 packer: x runs along the truck width, y along the
+    truck height and z along the truck length, with support checked on z.
+    Placing a box adds the projections of its three far corners onto the
+    nearest obstacle behind them (Crainic et al.), drops points the box now
+    covers and trims each point's free extent (how far the space is open along
+    +x, +y and +z). A point is dominated, and dropped, when another point on the
+    same z level and the same x or y line lies before it and its free space
+    reaches at least as far on every axis. Points whose free extent on some axis is below
+    min_extent (nothing left to pack fits there) are dropped as well.
+    """
+
+    EPSILON = 1e-6
+
+    def __init__(self, width: float, height: float, length: float,
+                 occupied_spaces: SpatialIndex, min_extent: float = 0.0):
+        self.bounds = (width, height, length)
+        self.occupied = occupied_spaces
+        self.min_extent = min_extent
+        self.points: Dict[Tuple[float, float, float], List[float]] = {}
+        self._add_point((0.0, 0.0, 0.0))
+
+    def __len__(self):
+        return len(self.points)
+
+    def candidates(self) -> List[Tuple[float, float, float, float, float, float]]:
+        """(x, y, z, free_x, free_y, free_z) for every point, nearest the origin first"""
+        ordered = sorted(self.points, key=lambda p: (p[0] ** 2 + p[1] ** 2 + p[2] ** 2, p))
+        return [point + tuple(self.points[point]) for point in ordered]
+
+    def _inside(self, point, box) -> bool:
+        return all(box[axis] <= point[axis] < box[axis + 3] for axis in range(3))
+
+    def _ray_region(self, point, axis, low, high):
+        region = [point[0], point[1], point[2],
+                  point[0] + self.EPSILON, point[1] + self.EPSILON, point[2] + self.EPSILON]
+        region[axis], region[axis + 3] = low, high
+        return region
+
+    def _free_extent(self, point) -> List[float]:
+        """Distance from the point to the nearest box face or wall along +x, +y and +z"""
+        extent = []
+        for axis in range(3):
+            stop = self.bounds[axis]
+            for key in self.occupied.overlapping(*self._ray_region(point, axis, point[axis], stop)):
+                stop = min(stop, max(point[axis], self.occupied.box(key)[axis]))
+            extent.append(stop - point[axis])
+        return extent
+
+    def _project(self, point, axis) -> Tuple[float, float, float]:
+        """Slide the point along -axis until it meets a box or the wall"""
+        stop = 0.0
+        for key in self.occupied.overlapping(*self._ray_region(point, axis, 0.0, point[axis])):
+            top = self.occupied.box(key)[axis + 3]
+            if top <= point[axis]:
+                stop = max(stop, top)
+        projected = list(point)
+        projected[axis] = stop
+        return tuple(projected)
+
+    def _add_point(self, point):
+        if point in self.points or any(point[axis] >= self.bounds[axis] for axis in range(3)):
+            return
+        if self.occupied.contains_point(*point) or self.occupied.overlapping(
+                point[0], point[1], point[2],
+                point[0] + self.EPSILON, point[1] + self.EPSILON, point[2] + self.EPSILON):
+            return
+        extent = self._free_extent(point)
+        if min(extent) >= self.min_extent:
+            self.points[point] = extent
+
+    def add_box(self, x: float, y: float, z: float, w: float, h: float, d: float):
+        """Update the set after a box was placed (and inserted in the spatial index)"""
+        box = (x, y, z, x + w, y + h, z + d)
+
+        for point in [p for p in self.points if self._inside(p, box)]:
+            del self.points[point]
+
+        # The new box may now be the nearest obstacle along a point's rays
+        for point, extent in list(self.points.items()):
+            for axis in range(3):
+                others = [a for a in range(3) if a != axis]
+                if (box[axis] >= point[axis] and box[axis] - point[axis] < extent[axis] and
+                        all(box[a] <= point[a] < box[a + 3] for a in others)):
+                    extent[axis] = box[axis] - point[axis]
+            if min(extent) < self.min_extent:
+                del self.points[point]
+
+        corners = ((x + w, y, z), (x, y + h, z), (x, y, z + d))
+        for axis, corner in enumerate(corners):
+            for projection_axis in range(3):
+                if projection_axis != axis:
+                    self._add_point(self._project(corner, projection_axis))
+
+        self._prune_dominated()
+
+    def _prune_dominated(self):
+        levels: Dict[float, List[Tuple[float, float, float]]] = {}
+        for point in self.points:
+            levels.setdefault(point[2], []).append(point)
+
+        for level_points in levels.values():
+            if len(level_points) < 2:
+                continue
+            reach = {p: [p[axis] + self.points[p][axis] for axis in range(3)] for p in level_points}
+            for q in level_points:
+                for p in level_points:
+                    if (p != q and p[0] <= q[0] and p[1] <= q[1] and
+                            (p[0] == q[0] or p[1] == q[1]) and p in self.points and
+                            all(reach[p][axis] >= reach[q][axis] for axis in range(3))):
+                        del self.points[q]
+                        break
+
+    @classmethod
+    def from_positions(cls, width: float, height: float, length: float,
+                       occupied_spaces: SpatialIndex,
+                       packed_positions: List['CartonPosition']) -> 'ExtremePointSet':
+        """Rebuild the set for cartons that are already in the spatial index"""
+        points = cls(width, height, length, occupied_spaces)
+        for position in packed_positions:
+            points.add_box(position.x, position.y, position.z,
+                           position.width, position.height, position.depth)
+        return points
+
+
 class Advanced3DPackerV2:
     """
     State-of-the-art 3D bin packing with 2024-2025 research integration
@@ -87,12 +227,18 @@ class Advanced3DPackerV2:
     - Weight distribution optimization
     - Real-world constraints (fragility, stackability)
     - Performance optimization for enterprise use
+
+    With vectorized=True (default) every (orientation, extreme point) candidate
+    of a carton is checked and scored in one NumPy batch; vectorized=False keeps
+    the candidate-by-candidate loop, which picks the same positions.
     """
 
     def __init__(
             self,
-            strategy: PackingStrategy = PackingStrategy.HYBRID_OPTIMIZATION):
+            strategy: PackingStrategy = PackingStrategy.HYBRID_OPTIMIZATION,
+            vectorized: bool = True):
         self.strategy = strategy
+        self.vectorized = vectorized
         self.stability_threshold = 0.75  # Higher threshold for enterprise
         self.weight_distribution_tolerance = 0.25  # Tighter tolerance
         self.support_area_minimum = 0.6  # 60% minimum support area
@@ -103,7 +249,9 @@ class Advanced3DPackerV2:
             self,
             truck_spec: Dict,
             cartons: List[Dict],
-            constraints: Optional[Dict] = None) -> PackingResult:
+            constraints: Optional[Dict] = None,
+            deadline_seconds: Optional[float] = None,
+            cancel_event: Optional[Any] = None) -> PackingResult:
         """
         Advanced 3D packing with multi-criteria optimization and stability validation
 
@@ -111,11 +259,18 @@ class Advanced3DPackerV2:
             truck_spec: Enhanced truck specifications with load limits
             cartons: List of cartons with detailed properties
             constraints: Advanced constraints (customer requirements, fragility rules)
+            deadline_seconds: Wall-clock budget; once it expires the best position found
+                so far is used for the current carton and the remaining cartons are
+                reported unpacked
+            cancel_event: threading/multiprocessing Event; once set, packing stops
+                before the next carton as if the deadline had passed
 
         Returns:
             PackingResult with comprehensive metrics and validation
+            (truncated=True if the deadline or a cancellation cut the packing short)
         """
         start_time = time.time()
+        deadline = start_time + deadline_seconds if deadline_seconds is not None else None
 
         try:
             # Initialize enhanced packing environment
@@ -132,18 +287,53 @@ class Advanced3DPackerV2:
             sorted_cartons = self._sort_cartons_by_strategy_v2(
                 cartons, truck_spec)
 
-            # Track occupied space for collision detection
-            occupied_spaces = []
+            # Spatial index of occupied space for collision and support queries,
+            # keyed by the carton's index in packed_positions
+            occupied_spaces = SpatialIndex(suggested_cell_size(
+                min(c['length'], c['width'], c['height']) for c in cartons))
+            # Points with less free space than the smallest carton side are never usable
+            smallest_side = min((min(c['length'], c['width'], c['height']) for c in cartons),
+                                default=0.0)
+            extreme_points = ExtremePointSet(
+                truck_spec['width'], truck_spec['height'], truck_spec['length'], occupied_spaces,
+                min_extent=smallest_side - 1.0)
+            # The same boxes as (x1, y1, z1, x2, y2, z2) rows for the batch scoring
+            packed_boxes = np.zeros((len(sorted_cartons), 6))
 
             # Pack each carton using advanced algorithms
-            for carton in sorted_cartons:
+            truncated = False
+            for index, carton in enumerate(sorted_cartons):
+                if deadline is not None and packed_positions and time.time() >= deadline:
+                    skipped = sorted_cartons[index:]
+                    unpacked_cartons.extend(skipped)
+                    warnings.append(
+                        f"Deadline of {deadline_seconds}s reached: "
+                        f"{len(skipped)} cartons not attempted")
+                    truncated = True
+                    break
+                if cancel_event is not None and cancel_event.is_set():
+                    skipped = sorted_cartons[index:]
+                    unpacked_cartons.extend(skipped)
+                    warnings.append(f"Cancelled: {len(skipped)} cartons not attempted")
+                    truncated = True
+                    break
+
                 best_position = self._find_optimal_position_v2(
-                    carton, truck_spec, occupied_spaces, packed_positions, constraints)
+                    carton, truck_spec, occupied_spaces, packed_positions, constraints,
+                    deadline, extreme_points, packed_boxes[:len(packed_positions)])
 
                 if best_position:
                     packed_positions.append(best_position)
-                    occupied_spaces.append(
-                        self._get_occupied_space(best_position))
+                    space = self._get_occupied_space(best_position)
+                    box = (space['x'], space['y'], space['z'],
+                           space['x'] + space['width'],
+                           space['y'] + space['height'],
+                           space['z'] + space['depth'])
+                    occupied_spaces.insert(len(packed_positions) - 1, *box)
+                    packed_boxes[len(packed_positions) - 1] = box
+                    extreme_points.add_box(
+                        space['x'], space['y'], space['z'],
+                        space['width'], space['height'], space['depth'])
                 else:
                     unpacked_cartons.append(carton)
                     warnings.append(
@@ -154,6 +344,7 @@ class Advanced3DPackerV2:
             # Calculate comprehensive metrics
             result = self._calculate_advanced_metrics(
                 truck_spec, packed_positions, unpacked_cartons, start_time, warnings)
+            result.truncated = truncated
 
             # Validate result quality
             self._validate_packing_quality(result, constraints)
@@ -249,11 +440,20 @@ class Advanced3DPackerV2:
             self,
             carton: Dict,
             truck_spec: Dict,
-            occupied_spaces: List,
+            occupied_spaces: SpatialIndex,
             packed_positions: List[CartonPosition],
-            constraints: Optional[Dict] = None) -> Optional[CartonPosition]:
+            constraints: Optional[Dict] = None,
+            deadline: Optional[float] = None,
+            extreme_points: Optional[ExtremePointSet] = None,
+            packed_boxes: Optional[np.ndarray] = None) -> Optional[CartonPosition]:
         """
-        Find optimal position using advanced 3D algorithms with stability validation
+        Find optimal position using advanced 3D algorithms with stability validation.
+        Candidates are the extreme points of the current load (rebuilt from
+        packed_positions when no maintained set is passed in).
+        packed_boxes holds the packed cartons as (x1, y1, z1, x2, y2, z2) rows for
+        the vectorized path and is built from packed_positions if not given.
+        Past the deadline (a time.time() value) the loop returns the best position
+        found so far; the vectorized path scores all candidates at once.
         """
         truck_l, truck_w, truck_h = truck_spec['length'], truck_spec['width'], truck_spec['height']
 
@@ -263,14 +463,20 @@ class Advanced3DPackerV2:
         best_position = None
         best_score = -1
 
-        # Grid resolution for position testing (optimized for performance)
-        grid_resolution = 20  # mm - balance between accuracy and speed
-
-        # Test positions with higher density near corners and edges (extreme
-        # points)
-        test_positions = self._generate_test_positions_v2(
-            truck_l, truck_w, truck_h, grid_resolution
-        )
+        if extreme_points is None:
+            extreme_points = ExtremePointSet.from_positions(
+                truck_w, truck_h, truck_l, occupied_spaces, packed_positions)
+        test_positions = extreme_points.candidates()
+        tolerance = 1.0  # same 1mm slack as the collision check
+
+        if self.vectorized:
+            if packed_boxes is None:
+                packed_boxes = np.array(
+                    [[p.x, p.y, p.z, p.x + p.width, p.y + p.height, p.z + p.depth]
+                     for p in packed_positions], dtype=float).reshape(-1, 6)
+            return self._find_optimal_position_batch(
+                carton, truck_spec, orientations, test_positions, packed_boxes,
+                packed_positions, occupied_spaces, constraints)
 
         for orientation in orientations:
             o_w, o_h, o_d = orientation['width'], orientation['height'], orientation['depth']
@@ -279,7 +485,15 @@ class Advanced3DPackerV2:
             if o_w > truck_w or o_h > truck_h or o_d > truck_l:
                 continue
 
-            for x, y, z in test_positions:
+            for x, y, z, free_w, free_h, free_d in test_positions:
+                if deadline is not None and best_position is not None and time.time() >= deadline:
+                    return best_position
+
+                # Skip if the free space in front of the point is too short
+                if (o_w > free_w + tolerance or o_h > free_h + tolerance or
+                        o_d > free_d + tolerance):
+                    continue
+
                 # Skip if position would exceed truck boundaries
                 if (x + o_w > truck_w or y + o_h >
                         truck_h or z + o_d > truck_l):
@@ -292,7 +506,7 @@ class Advanced3DPackerV2:
 
                 # Calculate support and stability
                 support_info = self._calculate_support_v2(
-                    x, y, z, o_w, o_h, o_d, packed_positions
+                    x, y, z, o_w, o_h, o_d, packed_positions, occupied_spaces
                 )
 
                 # Skip if insufficient support
@@ -321,6 +535,105 @@ class Advanced3DPackerV2:
 
         return best_position
 
+    def _find_optimal_position_batch(
+            self,
+            carton: Dict,
+            truck_spec: Dict,
+            orientations: List[Dict],
+            test_positions: List[Tuple[float, float, float, float, float, float]],
+            packed_boxes: np.ndarray,
+            packed_positions: List[CartonPosition],
+            occupied_spaces: SpatialIndex,
+            constraints: Optional[Dict] = None) -> Optional[CartonPosition]:
+        """
+        Vectorized candidate search: bounds, collision, support and score of every
+        (orientation, point) pair as arrays, then one argmax. Ties go to the first
+        orientation and then the first point, as in the loop.
+        """
+        if not orientations or not test_positions:
+            return None
+        truck_l, truck_w, truck_h = truck_spec['length'], truck_spec['width'], truck_spec['height']
+        tolerance = 1.0
+
+        dims = np.array([[o['width'], o['height'], o['depth']] for o in orientations], dtype=float)
+        points = np.array(test_positions, dtype=float)
+
+        # Bounds and free extent for the (orientation, point) grid
+        o_w, o_h, o_d = dims[:, 0:1], dims[:, 1:2], dims[:, 2:3]
+        px, py, pz = points[:, 0], points[:, 1], points[:, 2]
+        feasible = ((o_w <= points[:, 3] + tolerance) & (o_h <= points[:, 4] + tolerance) &
+                    (o_d <= points[:, 5] + tolerance) &
+                    (px + o_w <= truck_w) & (py + o_h <= truck_h) & (pz + o_d <= truck_l))
+        # Row-major order matches the loop: orientations outside, points inside
+        orientation_index, point_index = np.nonzero(feasible)
+        if orientation_index.size == 0:
+            return None
+        w, h, d = dims[orientation_index].T
+        x, y, z = points[point_index, :3].T
+        x2, y2, z2 = x + w, y + h, z + d
+
+        count = x.size
+        collides = np.zeros(count, dtype=bool)
+        supported_area = w * d  # on the floor the whole base is supported
+        supporters = np.zeros(count, dtype=int)
+        raised = np.nonzero(z > 1.0)[0]
+        supported_area[raised] = 0.0
+
+        # Only boxes reaching into the candidates' bounding region can collide or support
+        near = ((packed_boxes[:, 0] < x2.max()) & (packed_boxes[:, 3] > x.min()) &
+                (packed_boxes[:, 1] < y2.max()) & (packed_boxes[:, 4] > y.min()) &
+                (packed_boxes[:, 2] < z2.max()) & (packed_boxes[:, 5] >= z.min() - 2.0))
+        packed_boxes = packed_boxes[near]
+        if len(packed_boxes):
+            bx1, by1, bz1, bx2, by2, bz2 = packed_boxes.T
+            chunk = max(1, BATCH_ELEMENTS // len(packed_boxes))
+            for start in range(0, count, chunk):
+                rows = slice(start, start + chunk)
+                cx1, cy1, cz1 = x[rows, None], y[rows, None], z[rows, None]
+                cx2, cy2, cz2 = x2[rows, None], y2[rows, None], z2[rows, None]
+                # Same test as SpatialIndex.overlaps with the boxes shrunk by the tolerance
+                collides[rows] = ((cx1 < bx2 - tolerance) & (cx2 > bx1 + tolerance) &
+                                  (cy1 < by2 - tolerance) & (cy2 > by1 + tolerance) &
+                                  (cz1 < bz2 - tolerance) & (cz2 > bz1 + tolerance)).any(axis=1)
+
+                # Boxes whose top is within 2mm of the base, as in SpatialIndex.below
+                overlap_a = np.minimum(cx2, bx2) - np.maximum(cx1, bx1)
+                overlap_b = np.minimum(cy2, by2) - np.maximum(cy1, by1)
+                touching = ((bz2 >= cz1 - 2.0) & (bz2 <= cz1 + 2.0) &
+                            (overlap_a > 0) & (overlap_b > 0) & (cz1 > 1.0))
+                supported_area[rows] += np.where(touching, overlap_a * overlap_b, 0.0).sum(axis=1)
+                supporters[rows] = touching.sum(axis=1)
+
+        base_area = w * d
+        with np.errstate(divide='ignore', invalid='ignore'):
+            support_ratio = np.where(base_area > 0, np.minimum(supported_area / base_area, 1.0), 0.0)
+        stability = np.where((z > 500) & (support_ratio < 0.8), support_ratio * 0.7, support_ratio)
+        stability = np.where(supporters >= 2, np.minimum(stability * 1.1, 1.0), stability)
+
+        valid = ~collides & (support_ratio >= self.support_area_minimum)
+        if not valid.any():
+            return None
+        scores = self._calculate_position_scores_batch(
+            x, y, z, w, h, d, stability, carton, truck_spec, constraints)
+        best = int(np.argmax(np.where(valid, scores, -1.0)))
+
+        orientation = orientations[orientation_index[best]]
+        bx, by, bz = test_positions[point_index[best]][:3]
+        support_info = self._calculate_support_v2(
+            bx, by, bz, orientation['width'], orientation['height'], orientation['depth'],
+            packed_positions, occupied_spaces)
+        return CartonPosition(
+            x=bx, y=by, z=bz,
+            width=orientation['width'], height=orientation['height'], depth=orientation['depth'],
+            rotation=orientation['rotation'],
+            stability_score=support_info['stability_score'],
+            support_area_ratio=support_info['support_ratio'],
+            supported_by=support_info['supported_by'],
+            weight=carton.get('weight', 1.0),
+            fragility_level=carton.get('fragility_level', 1),
+            stackable=carton.get('stackable', True)
+        )
+
     def _get_all_orientations(self, carton: Dict) -> List[Dict]:
         """Get all 6 possible orientations without changing carton shape"""
         original_dims = [carton['length'], carton['width'], carton['height']]
@@ -346,82 +659,20 @@ class Advanced3DPackerV2:
 
         return orientations
 
-    def _generate_test_positions_v2(self,
-                                    truck_l: float,
-                                    truck_w: float,
-                                    truck_h: float,
-                                    grid_resolution: int) -> List[Tuple[float,
-                                                                        float,
-                                                                        float]]:
-        """Generate test positions with extreme points optimization"""
-        positions = []
-
-        # Always test corner positions (extreme points from research)
-        corner_positions = [
-            (0, 0, 0),  # Bottom-left-front corner
-            (0, 0, truck_h * 0.3), (0, 0, truck_h * 0.6),  # Vertical layers
-        ]
-        positions.extend(corner_positions)
-
-        # Add edge positions for better packing
-        step_w = truck_w // 4
-        step_l = truck_l // 4
-        step_h = truck_h // 3
-
-        for x in range(0, int(truck_w), int(step_w)):
-            for y in range(0, int(truck_l), int(step_l)):
-                for z in range(0, int(truck_h), int(step_h)):
-                    positions.append((float(x), float(y), float(z)))
-
-        # Remove duplicates and sort by priority (corners first)
-        unique_positions = list(set(positions))
-
-        # Prioritize positions based on 2024-2025 extreme points research
-        def position_priority(pos):
-            x, y, z = pos
-            corner_proximity = math.sqrt(
-                x**2 + y**2 + z**2)  # Distance from origin
-            # Negative for reverse sort (closer = higher priority)
-            return -corner_proximity
-
-        return sorted(unique_positions, key=position_priority)[
-            :100]  # Limit for performance
-
     def _has_collision_v2(self, x: float, y: float, z: float,
                           w: float, h: float, d: float,
-                          occupied_spaces: List) -> bool:
+                          occupied_spaces: SpatialIndex) -> bool:
         """Enhanced collision detection with tolerance"""
         tolerance = 1.0  # 1mm tolerance for floating point precision
 
-        for occupied in occupied_spaces:
-            # Check overlap in all three dimensions
-            x_overlap = not (
-                x +
-                w <= occupied['x'] +
-                tolerance or x >= occupied['x'] +
-                occupied['width'] -
-                tolerance)
-            y_overlap = not (
-                y +
-                h <= occupied['y'] +
-                tolerance or y >= occupied['y'] +
-                occupied['height'] -
-                tolerance)
-            z_overlap = not (
-                z +
-                d <= occupied['z'] +
-                tolerance or z >= occupied['z'] +
-                occupied['depth'] -
-                tolerance)
-
-            if x_overlap and y_overlap and z_overlap:
-                return True
-
-        return False
+        # Only boxes sharing grid cells with the candidate are checked
+        return occupied_spaces.overlaps(
+            x, y, z, x + w, y + h, z + d, tolerance)
 
     def _calculate_support_v2(self, x: float, y: float, z: float,
                               w: float, h: float, d: float,
-                              packed_positions: List[CartonPosition]) -> Dict:
+                              packed_positions: List[CartonPosition],
+                              occupied_spaces: Optional[SpatialIndex] = None) -> Dict:
         """
         Calculate support area and stability based on 2024-2025 research
         """
@@ -432,6 +683,12 @@ class Advanced3DPackerV2:
         # Ground support
         if z <= 1.0:  # On the ground (within 1mm tolerance)
             supported_area = base_area
+        elif occupied_spaces is not None:
+            # Cartons whose top is within 2mm of this base, from the spatial index
+            for i, overlap_area in occupied_spaces.below(
+                    x, y, x + w, y + h, z, tolerance=2.0):
+                supported_area += overlap_area
+                supported_by.append(i)
         else:
             # Check support from other cartons
             for i, pos in enumerate(packed_positions):
@@ -528,6 +785,53 @@ class Advanced3DPackerV2:
 
         return max(0.0, min(1.0, score))  # Clamp to [0, 1]
 
+    def _calculate_position_scores_batch(
+            self,
+            x: np.ndarray,
+            y: np.ndarray,
+            z: np.ndarray,
+            w: np.ndarray,
+            h: np.ndarray,
+            d: np.ndarray,
+            stability: np.ndarray,
+            carton: Dict,
+            truck_spec: Dict,
+            constraints: Optional[Dict] = None) -> np.ndarray:
+        """
+        _calculate_position_score_v2 over arrays of candidates
+        """
+        score = stability * 0.40
+
+        height_penalty = z / truck_spec['height']
+        corner_bonus = np.where((x <= 10) & (y <= 10), 0.1, 0.0)
+        space_score = (1.0 - height_penalty * 0.5) + corner_bonus
+        score = score + space_score * 0.30
+
+        truck_center_x = truck_spec['width'] / 2
+        truck_center_y = truck_spec['length'] / 2
+        center_x_dev = np.abs((x + w / 2) - truck_center_x) / truck_center_x
+        center_y_dev = np.abs((y + h / 2) - truck_center_y) / truck_center_y
+        balance_score = 1.0 - (center_x_dev + center_y_dev) / 2
+        score = score + balance_score * 0.20
+
+        if carton.get('fragility_level', 1) >= 4:
+            fragility_score = np.where(z <= 200, 1.0, np.maximum(0.0, 1.0 - (z - 200) / 1000))
+        else:
+            fragility_score = 1.0
+        score = score + fragility_score * 0.10
+
+        if constraints:
+            zone = constraints.get('preferred_zone')
+            if zone:
+                in_zone = ((zone.get('x_min', 0) <= x) & (zone.get('y_min', 0) <= y) &
+                           (zone.get('z_min', 0) <= z) &
+                           (x + w <= zone.get('x_max', float('inf'))) &
+                           (y + h <= zone.get('y_max', float('inf'))) &
+                           (z + d <= zone.get('z_max', float('inf'))))
+                score = np.where(in_zone, score, score * 0.8)
+
+        return np.clip(score, 0.0, 1.0)
+
     def _is_in_zone(self, x: float, y: float, z: float,
                     w: float, h: float, d: float,
                     zone: Dict) -> bool:
@@ -714,97 +1018,317 @@ class Advanced3DPackerV2:
         )
 
 
+STRATEGY_BY_GOAL = {
+    'stability': PackingStrategy.STABILITY_FIRST_V2,
+    'efficiency': PackingStrategy.EXTREME_POINTS_V2,
+    'balanced': PackingStrategy.HYBRID_OPTIMIZATION,
+    'weight_distribution': PackingStrategy.WEIGHT_BALANCED,
+    'mcda': PackingStrategy.MCDA_OPTIMIZATION,
+    'spatial': PackingStrategy.SPATIAL_CORNER_FITNESS
+}
+
+
+def _truck_load_bound(truck_type: Dict, cartons: List[Dict],
+                      packer: Advanced3DPackerV2) -> Tuple[Optional[str], float]:
+    """
+    Cheap feasibility check of one truck for the whole load.
+
+    Returns (reason, slack): reason is None unless the truck provably cannot hold
+    every carton (load volume or weight above capacity, or a carton that fits in no
+    allowed orientation); slack is the unused volume left by a perfect packing.
+    """
+    truck_l, truck_w, truck_h = truck_type['length'], truck_type['width'], truck_type['height']
+    truck_volume = truck_l * truck_w * truck_h
+    load_volume = sum(c['length'] * c['width'] * c['height'] for c in cartons)
+    load_weight = sum(c.get('weight', 1.0) for c in cartons)
+
+    if load_volume > truck_volume:
+        return 'load volume exceeds truck volume', truck_volume - load_volume
+    if load_weight > truck_type.get('max_weight', 10000):
+        return 'load weight exceeds max weight', truck_volume - load_volume
+
+    checked = set()
+    for carton in cartons:
+        shape = (carton['length'], carton['width'], carton['height'],
+                 carton.get('can_rotate', True), carton.get('fragility_level', 1))
+        if shape in checked:
+            continue
+        checked.add(shape)
+        if not any(o['width'] <= truck_w and o['height'] <= truck_h and o['depth'] <= truck_l
+                   for o in packer._get_all_orientations(carton)):
+            return f"carton {carton.get('name', 'Unknown')} fits in no orientation", \
+                truck_volume - load_volume
+    return None, truck_volume - load_volume
+
+
+def _recommendation_score_bound(truck_type: Dict, load_volume: float) -> float:
+    """
+    Highest recommendation score a truck can reach for the load: the whole load
+    packed and every quality score perfect (see _calculate_recommendation_score)
+    """
+    truck_volume = truck_type['length'] * truck_type['width'] * truck_type['height']
+    utilization = min(100.0, load_volume / truck_volume * 100) if truck_volume > 0 else 0.0
+    packing_efficiency = utilization * 0.25 + 100 * (0.25 + 0.20 + 0.20 + 0.10)
+    return packing_efficiency * 0.30 + 100 * (0.25 + 0.20 + 0.15 + 0.10)
+
+
+def _build_recommendation(truck_type: Dict, result: PackingResult,
+                          strategy: PackingStrategy) -> Dict[str, Any]:
+    """Enterprise recommendation entry for one packed truck"""
+    return {
+        'truck_name': result.truck_name,
+        'truck_type': truck_type,
+        # Convert to dict for JSON serialization
+        'packing_result': asdict(result),
+        'utilization_score': result.truck_utilization,
+        'stability_score': result.stability_score * 100,
+        'efficiency_score': result.packing_efficiency,
+        'support_quality_score': result.support_quality_score * 100,
+        'weight_distribution_score': result.weight_distribution_score * 100,
+        'fragility_compliance_score': result.fragility_compliance_score * 100,
+        'packed_count': len(result.packed_cartons),
+        'unpacked_count': len(result.unpacked_cartons),
+        'processing_time': result.processing_time,
+        'center_of_gravity': result.center_of_gravity,
+        'warnings': result.warnings,
+        'truncated': result.truncated,
+        'recommendation_score': _calculate_recommendation_score(result),
+        'algorithm_details': {
+            'strategy': strategy.value,
+            'version': '2024-2025 Research Implementation',
+            'features': [
+                'Multi-Criteria Decision Analysis',
+                'Stability Validation',
+                'Weight Distribution Optimization',
+                'Support Area Calculations',
+                'Fragility Compliance',
+                'Real-world Constraints'
+            ]
+        }
+    }
+
+
+def _recommend_truck(packer: Advanced3DPackerV2, truck_type: Dict, cartons: List[Dict],
+                     constraints: Optional[Dict], deadline: Optional[float],
+                     cancel_event: Optional[Any]) -> Optional[Dict[str, Any]]:
+    """Pack one truck; None if the deadline passed before it started or the search was cancelled"""
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    remaining = None
+    if deadline is not None:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+    result = packer.pack_cartons_advanced(
+        truck_type, cartons, constraints, deadline_seconds=remaining, cancel_event=cancel_event)
+    if result.truncated and cancel_event is not None and cancel_event.is_set():
+        return None  # stopped part-way by the cancellation
+    return _build_recommendation(truck_type, result, packer.strategy)
+
+
+# Score a complete packing needs to count towards target_recommendations
+GOOD_RECOMMENDATION_SCORE = 80.0
+
+# Load shipped once to each recommendation worker process
+_worker_packer: Optional[Advanced3DPackerV2] = None
+_worker_cartons: List[Dict] = []
+_worker_constraints: Optional[Dict] = None
+_worker_cancel: Optional[Any] = None
+
+
+def _init_recommendation_worker(strategy_value: str, cartons: List[Dict],
+                                constraints: Optional[Dict], cancel_event: Any):
+    """Process pool initializer: keep the load and the shared cancel flag"""
+    global _worker_packer, _worker_cartons, _worker_constraints, _worker_cancel
+    _worker_packer = Advanced3DPackerV2(strategy=PackingStrategy(strategy_value))
+    _worker_cartons = cartons
+    _worker_constraints = constraints
+    _worker_cancel = cancel_event
+
+
+def _recommend_truck_in_worker(truck_type: Dict, deadline: Optional[float]) -> Optional[Dict[str, Any]]:
+    return _recommend_truck(_worker_packer, truck_type, _worker_cartons, _worker_constraints,
+                            deadline, _worker_cancel)
+
+
 def create_enterprise_packing_recommendation(truck_types: List[Dict],
                                              cartons: List[Dict],
                                              optimization_goal: str = 'balanced',
-                                             constraints: Optional[Dict] = None) -> Dict[str,
-                                                                                         Any]:
+                                             constraints: Optional[Dict] = None,
+                                             deadline_seconds: Optional[float] = None,
+                                             max_workers: int = 1,
+                                             parallel_backend: str = 'process',
+                                             target_recommendations: Optional[int] = None,
+                                             min_recommendation_score: float = GOOD_RECOMMENDATION_SCORE
+                                             ) -> Dict[str, Any]:
     """
     Create enterprise-grade truck recommendations using 2024-2025 research algorithms
 
+    Trucks that provably cannot hold the load (volume, weight or a carton that fits
+    in no orientation) are skipped, unless no truck passes that check. The rest are
+    packed tightest first (least spare volume) in this process, or with max_workers
+    > 1 in a pool capped at the CPU count (parallel_backend='thread' for threads).
+    The pool is started for this call only, so it suits batch jobs rather than
+    web requests.
+
     Args:
         truck_types: List of available truck types
         cartons: List of cartons to pack
         optimization_goal: 'stability', 'efficiency', 'balanced', 'weight_distribution', 'mcda'
         constraints: Advanced constraints for enterprise requirements
+        deadline_seconds: Wall-clock budget shared by all trucks; trucks not reached
+            in time are skipped and the result is marked truncated
+        max_workers: Trucks packed at the same time
+        parallel_backend: 'process' or 'thread'
+        target_recommendations: Once this many trucks have packed every carton with a
+            recommendation score of at least min_recommendation_score, trucks whose
+            score bound cannot beat the current target_recommendations-th score are
+            cancelled, so the top results match packing every truck (None packs
+            every candidate truck)
+        min_recommendation_score: Score a complete packing needs to count towards
+            target_recommendations
 
     Returns:
         Dict with comprehensive recommendations and analysis
     """
-    # Map optimization goals to advanced strategies
-    strategy_map = {
-        'stability': PackingStrategy.STABILITY_FIRST_V2,
-        'efficiency': PackingStrategy.EXTREME_POINTS_V2,
-        'balanced': PackingStrategy.HYBRID_OPTIMIZATION,
-        'weight_distribution': PackingStrategy.WEIGHT_BALANCED,
-        'mcda': PackingStrategy.MCDA_OPTIMIZATION,
-        'spatial': PackingStrategy.SPATIAL_CORNER_FITNESS
-    }
-
-    strategy = strategy_map.get(
+    strategy = STRATEGY_BY_GOAL.get(
         optimization_goal,
         PackingStrategy.HYBRID_OPTIMIZATION)
     packer = Advanced3DPackerV2(strategy=strategy)
 
-    recommendations = []
-
-    for truck_type in truck_types:
-        try:
-            start_time = time.time()
-            result = packer.pack_cartons_advanced(
-                truck_type, cartons, constraints)
-
-            # Enhanced recommendation with enterprise metrics
-            recommendation = {
-                'truck_name': result.truck_name,
-                'truck_type': truck_type,
-                # Convert to dict for JSON serialization
-                'packing_result': asdict(result),
-                'utilization_score': result.truck_utilization,
-                'stability_score': result.stability_score * 100,
-                'efficiency_score': result.packing_efficiency,
-                'support_quality_score': result.support_quality_score * 100,
-                'weight_distribution_score': result.weight_distribution_score * 100,
-                'fragility_compliance_score': result.fragility_compliance_score * 100,
-                'packed_count': len(result.packed_cartons),
-                'unpacked_count': len(result.unpacked_cartons),
-                'processing_time': result.processing_time,
-                'center_of_gravity': result.center_of_gravity,
-                'warnings': result.warnings,
-                'recommendation_score': _calculate_recommendation_score(result),
-                'algorithm_details': {
-                    'strategy': strategy.value,
-                    'version': '2024-2025 Research Implementation',
-                    'features': [
-                        'Multi-Criteria Decision Analysis',
-                        'Stability Validation',
-                        'Weight Distribution Optimization',
-                        'Support Area Calculations',
-                        'Fragility Compliance',
-                        'Real-world Constraints'
-                    ]
-                }
-            }
-
-            recommendations.append(recommendation)
+    deadline = time.time() + deadline_seconds if deadline_seconds is not None else None
+
+    # Bound-based pruning and ordering
+    bounded = []
+    skipped_trucks = []
+    for order, truck_type in enumerate(truck_types):
+        reason, slack = _truck_load_bound(truck_type, cartons, packer)
+        bounded.append((reason, slack, order, truck_type))
+        if reason is not None:
+            skipped_trucks.append({'truck_name': truck_type.get('name', 'Unknown'), 'reason': reason})
+    candidates = [entry for entry in bounded if entry[0] is None]
+    if not candidates:
+        # No truck holds the whole load: rank partial packings as before
+        candidates = bounded
+        skipped_trucks = []
+    candidates.sort(key=lambda entry: (entry[1], entry[2]))
+    # Tightest first also means the score bounds never increase along the candidates
+    load_volume = sum(c['length'] * c['width'] * c['height'] for c in cartons)
+    score_bounds = {order: _recommendation_score_bound(truck_type, load_volume)
+                    for _, _, order, truck_type in candidates}
 
-        except Exception as e:
-            logger.error(
-                f"Packing failed for truck {
-                    truck_type.get(
-                        'name',
-                        'Unknown')}: {e}")
-            continue
-
-    # Sort by recommendation score (best first)
-    recommendations.sort(key=lambda x: x['recommendation_score'], reverse=True)
+    recommendations = []
+    finished = 0
+    good_results = 0
+
+    def accept(order: int, recommendation: Optional[Dict]):
+        """Collect one packed truck"""
+        nonlocal finished, good_results
+        if recommendation is None:
+            return
+        finished += 1
+        recommendation['_order'] = order
+        recommendations.append(recommendation)
+        if (recommendation['unpacked_count'] == 0 and not recommendation['truncated'] and
+                recommendation['recommendation_score'] >= min_recommendation_score):
+            good_results += 1
+
+    def hopeless(order: int) -> bool:
+        """True once enough good results are in and the truck cannot reach the top ones"""
+        if target_recommendations is None or good_results < target_recommendations:
+            return False
+        scores = sorted((r['recommendation_score'] for r in recommendations), reverse=True)
+        # Ties go to the earlier truck, so only a bound below the cutoff rules a truck out
+        return score_bounds[order] < scores[target_recommendations - 1]
+
+    def failed(truck_type: Dict, error: Exception):
+        nonlocal finished
+        finished += 1
+        logger.error(f"Packing failed for truck {truck_type.get('name', 'Unknown')}: {error}")
+
+    cancel_event = None
+    executor = None
+    workers = min(max_workers, len(candidates), os.cpu_count() or 1)
+    if workers > 1:
+        if parallel_backend == 'process':
+            try:
+                cancel_event = multiprocessing.Event()
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_recommendation_worker,
+                    initargs=(strategy.value, cartons, constraints, cancel_event)
+                )
+            except (OSError, ValueError, NotImplementedError) as e:
+                logger.warning(f"Process pool unavailable ({e}), falling back to threads")
+        if executor is None:
+            cancel_event = threading.Event()
+            executor = ThreadPoolExecutor(max_workers=workers)
+
+    enough = False
+    if executor is None:
+        for _, _, order, truck_type in candidates:
+            if hopeless(order):
+                enough = True  # later trucks have no higher bound
+                break
+            try:
+                accept(order, _recommend_truck(packer, truck_type, cartons, constraints,
+                                               deadline, None))
+            except Exception as e:
+                failed(truck_type, e)
+    else:
+        with executor:
+            if isinstance(executor, ProcessPoolExecutor):
+                futures = {executor.submit(_recommend_truck_in_worker, truck_type, deadline): (order, truck_type)
+                           for _, _, order, truck_type in candidates}
+            else:
+                futures = {executor.submit(_recommend_truck, packer, truck_type, cartons, constraints,
+                                           deadline, cancel_event): (order, truck_type)
+                           for _, _, order, truck_type in candidates}
+            outstanding = set(futures)
+            while outstanding:
+                done, outstanding = wait(outstanding, return_when=FIRST_COMPLETED)
+                for future in done:
+                    order, truck_type = futures[future]
+                    try:
+                        accept(order, future.result())
+                    except Exception as e:
+                        failed(truck_type, e)
+                ruled_out = {future for future in outstanding if hopeless(futures[future][0])}
+                if not ruled_out:
+                    continue
+                enough = True
+                if ruled_out == outstanding:
+                    # Running trucks stop before their next carton, queued ones never start
+                    cancel_event.set()
+                    for future in outstanding:
+                        future.cancel()
+                    break
+                # Queued trucks that cannot reach the top never start
+                outstanding -= {future for future in ruled_out if future.cancel()}
+
+    unfinished = len(candidates) - finished
+    if enough and unfinished:
+        logger.info(f"{good_results} complete recommendations found; "
+                    f"{unfinished} of {len(candidates)} trucks cancelled")
+    # Otherwise unfinished trucks were not reached before the deadline
+    truncated = (unfinished > 0 and not enough) or any(r['truncated'] for r in recommendations)
+    if truncated and deadline is not None:
+        logger.warning(
+            f"Deadline of {deadline_seconds}s reached after "
+            f"{len(recommendations)} of {len(candidates)} trucks")
+
+    # Sort by recommendation score (best first), ties in input order
+    recommendations.sort(key=lambda x: (-x['recommendation_score'], x.pop('_order')))
 
     return {
         'recommendations': recommendations,
         'optimization_goal': optimization_goal,
         'strategy_used': strategy.value,
         'total_cartons': len(cartons),
-        'analysis_complete': True,
+        'analysis_complete': not truncated,
+        'truncated': truncated,
+        'skipped_trucks': skipped_trucks,
+        'cancelled_trucks': unfinished if enough else 0,
         'algorithm_version': '2024-2025 Research Implementation V2',
         'performance_summary': {
             'average_processing_time': sum(
@@ -7,6 +7,8 @@ Features:
 - RANSAC-based geometric optimization for complex spatial arrangements
 - Multi-criteria optimization (space + cost + stability + weight distribution)
 - Advanced rotation and orientation algorithms
+- LAFF free space on a GCD-resolution grid with a summed-volume table:
+  O(1) emptiness queries and a vectorized first-fit over all anchors
 - Real-time performance optimization with confidence scoring
 - Professional-grade algorithm performance targeting 85%+ space utilization
 
@@ -19,7 +21,7 @@ import math
 import time
 import logging
 from typing import List, Dict, Tuple, Optional, Any
-from functools import lru_cache
+from functools import lru_cache, reduce
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from py3dbp import Packer, Bin, Item
 import random
@@ -371,50 +373,135 @@ class Truck:
         """Calculate actual usable volume considering efficiency"""
         return self.calculate_volume() * self.loading_efficiency
 
+# Largest occupancy grid (cells) LAFFPacker allocates; coarser cells beyond this
+MAX_OCCUPANCY_CELLS = 4_000_000
+# Anchors whose box sums OccupancyGrid.first_fit evaluates per array operation
+FIRST_FIT_SLAB_ANCHORS = 65_536
+
+def occupancy_resolution(truck_dims: Tuple[float, float, float], carton_dims: List[float],
+                         max_cells: int = MAX_OCCUPANCY_CELLS) -> int:
+    """
+    Cell size in whole cm: the GCD of the (rounded up) carton dimensions, so cartons
+    cover whole cells exactly, coarsened if the truck would need more than max_cells
+    """
+    sides = [math.ceil(side - 1e-9) for side in carton_dims if side > 0]
+    unit = reduce(math.gcd, sides) if sides else 1
+    truck_volume = truck_dims[0] * truck_dims[1] * truck_dims[2]
+    if truck_volume / unit ** 3 > max_cells:
+        unit = math.ceil((truck_volume / max_cells) ** (1 / 3))
+    return max(1, unit)
+
+class OccupancyGrid:
+    """
+    Occupied truck space on a grid of `unit` cm cells with a summed-volume table.
+
+    The table holds the number of occupied cells in every prefix box
+    [0, i) x [0, j) x [0, k), so whether a box is empty is 8 lookups, and the
+    box sums at every anchor of a carton footprint are 8 array slices. Placing
+    a box adds its clipped volume to the affected prefixes instead of
+    recomputing the table.
+    
+    Cells are never freed, so the first fit of a box shape only moves forward;
+    each shape's search resumes at the x of its previous first fit.
+    """
+    
+    def __init__(self, length: float, width: float, height: float, unit: int = 1):
+        self.unit = unit
+        self.shape = (int(length // unit), int(width // unit), int(height // unit))
+        self.table = np.zeros(tuple(n + 1 for n in self.shape), dtype=np.int32)
+        self._front: Dict[Tuple[int, int, int], int] = {}
+    
+    def cells(self, dims: Tuple[float, float, float]) -> Tuple[int, int, int]:
+        """Cells a carton covers along each axis (partial cells count as whole)"""
+        return tuple(max(1, math.ceil(side / self.unit - 1e-9)) for side in dims)
+    
+    def is_empty(self, x: int, y: int, z: int, l: int, w: int, h: int) -> bool:
+        """True if the box of cells [x, x+l) x [y, y+w) x [z, z+h) is inside the grid and unoccupied"""
+        if x < 0 or y < 0 or z < 0:
+            return False
+        if x + l > self.shape[0] or y + w > self.shape[1] or z + h > self.shape[2]:
+            return False
+        t = self.table
+        x2, y2, z2 = x + l, y + w, z + h
+        occupied = (t[x2, y2, z2] - t[x, y2, z2] - t[x2, y, z2] - t[x2, y2, z]
+                    + t[x, y, z2] + t[x, y2, z] + t[x2, y, z] - t[x, y, z])
+        return occupied == 0
+    
+    def first_fit(self, l: int, w: int, h: int) -> Optional[Tuple[int, int, int]]:
+        """Lowest empty anchor in (x, y, z) lexicographic order for an l x w x h box, or None"""
+        if l > self.shape[0] or w > self.shape[1] or h > self.shape[2]:
+            return None
+        t = self.table
+        anchors_x = self.shape[0] - l + 1
+        # Slabs of anchors along x, so the search stops near the fill front
+        slab = max(1, FIRST_FIT_SLAB_ANCHORS // ((self.shape[1] - w + 1) * (self.shape[2] - h + 1)))
+        for x0 in range(self._front.get((l, w, h), 0), anchors_x, slab):
+            x1 = min(anchors_x, x0 + slab)
+            lo, hi = slice(x0, x1), slice(x0 + l, x1 + l)
+            occupied = (t[hi, w:, h:] - t[lo, w:, h:] - t[hi, :-w, h:] - t[hi, w:, :-h]
+                        + t[lo, :-w, h:] + t[lo, w:, :-h] + t[hi, :-w, :-h] - t[lo, :-w, :-h])
+            empty = (occupied == 0).ravel()
+            index = int(np.argmax(empty))
+            if empty[index]:
+                x, y, z = np.unravel_index(index, occupied.shape)
+                self._front[(l, w, h)] = int(x) + x0
+                return int(x) + x0, int(y), int(z)
+        self._front[(l, w, h)] = anchors_x
+        return None
+    
+    def occupy(self, x: int, y: int, z: int, l: int, w: int, h: int):
+        """Mark a box of cells as occupied"""
+        # Prefix [0, i) overlaps [x, x+l) in clip(i - x, 0, l) cells; only prefixes past the anchor change
+        fx = np.clip(np.arange(1, self.shape[0] + 1 - x), 0, l).astype(np.int32)
+        fy = np.clip(np.arange(1, self.shape[1] + 1 - y), 0, w).astype(np.int32)
+        fz = np.clip(np.arange(1, self.shape[2] + 1 - z), 0, h).astype(np.int32)
+        self.table[x + 1:, y + 1:, z + 1:] += fx[:, None, None] * fy[None, :, None] * fz[None, None, :]
+
 class LAFFPacker:
-    """Advanced Largest Area Fit First (LAFF) 3D Packing Algorithm"""
+    """
+    Advanced Largest Area Fit First (LAFF) 3D Packing Algorithm
     
-    def __init__(self, truck: Truck):
+    Free space is an OccupancyGrid whose cell size is the GCD of the carton
+    dimensions (see occupancy_resolution), so a real truck needs thousands of
+    cells instead of tens of millions of 1 cm voxels.
+    """
+    
+    def __init__(self, truck: Truck, resolution: Optional[int] = None):
         self.truck = truck
-        self.space = np.zeros((
-            int(truck.length), 
-            int(truck.width), 
-            int(truck.height)
-        ), dtype=bool)
+        self.resolution = resolution
+        self.grid: Optional[OccupancyGrid] = None
         self.current_weight = 0.0
         self.packed_cartons: List[Dict] = []
     
+    def _ensure_grid(self, carton_dims: List[float]) -> OccupancyGrid:
+        """Build the grid on first use, sized for the cartons about to be packed"""
+        if self.grid is None:
+            truck_dims = (self.truck.length, self.truck.width, self.truck.height)
+            unit = self.resolution or occupancy_resolution(truck_dims, carton_dims)
+            self.grid = OccupancyGrid(*truck_dims, unit=unit)
+        return self.grid
+    
     def can_place_carton(self, carton: Carton, position: Tuple[int, int, int], rotation: Tuple[float, float, float]) -> bool:
-        """Check if a carton can be placed at a specific position"""
-        x, y, z = position
-        l, w, h = map(int, rotation)
-        
-        # Check if the carton fits within truck dimensions
-        if (x + l > self.truck.length or 
-            y + w > self.truck.width or 
-            z + h > self.truck.height):
-            return False
+        """Check if a carton can be placed at a specific position (cm, on the grid)"""
+        grid = self._ensure_grid(list(rotation))
         
         # Check weight constraint
         if self.current_weight + carton.weight > self.truck.max_weight:
             return False
         
-        # Check space occupation
-        try:
-            if np.any(self.space[x:x+l, y:y+w, z:z+h]):
-                return False
-        except IndexError:
+        # Truck bounds and space occupation in one summed-volume query
+        x, y, z = (int(p // grid.unit) for p in position)
+        if any(p % grid.unit for p in position):
             return False
-        
-        return True
+        return grid.is_empty(x, y, z, *grid.cells(rotation))
     
     def place_carton(self, carton: Carton, position: Tuple[int, int, int], rotation: Tuple[float, float, float]):
         """Place a carton in the truck"""
-        x, y, z = position
-        l, w, h = map(int, rotation)
+        grid = self._ensure_grid(list(rotation))
+        x, y, z = (int(p // grid.unit) for p in position)
         
         # Mark space as occupied
-        self.space[x:x+l, y:y+w, z:z+h] = True
+        grid.occupy(x, y, z, *grid.cells(rotation))
         
         # Update current weight
         self.current_weight += carton.weight
@@ -426,36 +513,40 @@ class LAFFPacker:
             'rotation': rotation,
             'dimensions': rotation,
             'weight': carton.weight,
-            'volume': l * w * h
+            'volume': rotation[0] * rotation[1] * rotation[2]
         })
     
     def optimize_placement(self, cartons: List[Carton]) -> List[Dict]:
         """Main optimization method using LAFF principles"""
+        if not cartons:
+            return self.packed_cartons
+        grid = self._ensure_grid([side for c in cartons for side in (c.length, c.width, c.height)])
+        
         # Sort cartons by largest area first
         sorted_cartons = sorted(cartons, key=lambda c: c.calculate_max_area(), reverse=True)
         
         for carton in sorted_cartons:
+            if self.current_weight + carton.weight > self.truck.max_weight:
+                continue
+            
+            # First fit of every rotation; the earliest anchor wins, ties go to the earlier rotation
             best_placement = None
             best_rotation = None
-            
-            # Try all rotations
+            tried = set()
             for rotation in carton.get_rotations():
-                # Find optimal placement using space exploration strategy
-                for x in range(int(self.truck.length)):
-                    for y in range(int(self.truck.width)):
-                        for z in range(int(self.truck.height)):
-                            if self.can_place_carton(carton, (x, y, z), rotation):
-                                best_placement = (x, y, z)
-                                best_rotation = rotation
-                                break
-                        if best_placement:
-                            break
-                    if best_placement:
-                        break
+                cells = grid.cells(rotation)
+                if cells in tried:
+                    continue
+                tried.add(cells)
+                anchor = grid.first_fit(*cells)
+                if anchor is not None and (best_placement is None or anchor < best_placement):
+                    best_placement = anchor
+                    best_rotation = rotation
             
             # If a placement is found, place the carton
-            if best_placement and best_rotation:
-                self.place_carton(carton, best_placement, best_rotation)
+            if best_placement is not None:
+                position = tuple(p * grid.unit for p in best_placement)
+                self.place_carton(carton, position, best_rotation)
         
         return self.packed_cartons
     
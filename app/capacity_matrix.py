@@ -0,0 +1,211 @@
+"""
+Truck x Carton Capacity Matrix for TruckOpti
+Vectorized feasibility and capacity figures for every TruckType x CartonType pair
+
+Features:
+- Rotation fit masks for all six orientations, evaluated with NumPy broadcasting
+- Max-by-volume, max-by-weight and realistic max, using the same adaptive
+  efficiency factor and safety limit as the packer's per-truck validation
+- One DB-backed matrix, built lazily and dropped whenever a truck or carton
+  type is inserted, updated or deleted
+- Entries are keyed by id and checked against the row's current dimensions,
+  so an out-of-date entry is never returned
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Same orientation order as the packer: (L,W,H), (L,H,W), (W,L,H), (W,H,L), (H,L,W), (H,W,L)
+ROTATION_ORDER = ((0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0))
+FIT_TOLERANCE = 0.1  # 1mm tolerance for measurement precision
+SAFETY_LIMIT = 1000  # Maximum realistic units of one type per truck
+
+
+def truck_signature(truck) -> Tuple[float, float, float, float]:
+    """Dimensions and weight limit that every capacity figure of a truck depends on"""
+    return (float(truck.length or 0), float(truck.width or 0), float(truck.height or 0),
+            float(truck.max_weight or 0))
+
+
+def carton_signature(carton) -> Tuple[float, float, float, float]:
+    """Dimensions and weight that every capacity figure of a carton depends on"""
+    return (float(carton.length or 0), float(carton.width or 0), float(carton.height or 0),
+            float(carton.weight or 0))
+
+
+class CapacityMatrix:
+    """Feasibility and capacity of each carton type in each truck type"""
+
+    def __init__(self, trucks: Iterable, cartons: Iterable):
+        self.trucks = list(trucks)
+        self.cartons = list(cartons)
+        self.stale = False
+
+        self.truck_signatures = [truck_signature(t) for t in self.trucks]
+        self.carton_signatures = [carton_signature(c) for c in self.cartons]
+        self.truck_index = {t.id: i for i, t in enumerate(self.trucks) if getattr(t, 'id', None) is not None}
+        self.carton_index = {c.id: i for i, c in enumerate(self.cartons) if getattr(c, 'id', None) is not None}
+
+        truck_array = np.array(self.truck_signatures, dtype=float).reshape(-1, 4)
+        carton_array = np.array(self.carton_signatures, dtype=float).reshape(-1, 4)
+        truck_dims, truck_weight = truck_array[:, :3], truck_array[:, 3]
+        carton_dims, carton_weight = carton_array[:, :3], carton_array[:, 3]
+
+        # Fit masks (trucks x cartons x rotations); every axis must fit
+        rotated = carton_dims[:, np.array(ROTATION_ORDER)]  # cartons x rotations x 3
+        truck_axes = truck_dims[:, None, None, :]
+        positive = (carton_dims > 0).all(axis=1)[None, :, None]
+        self.rotation_fit = (rotated[None] <= truck_axes + FIT_TOLERANCE).all(axis=3) & positive
+        self.strict_rotation_fit = (rotated[None] <= truck_axes).all(axis=3)
+        self.can_fit = self.rotation_fit.any(axis=2)
+
+        # Volume capacity
+        self.truck_volume = truck_dims[:, 0] * truck_dims[:, 1] * truck_dims[:, 2]
+        self.carton_volume = carton_dims[:, 0] * carton_dims[:, 1] * carton_dims[:, 2]
+        valid_volume = (self.truck_volume[:, None] > 0) & (self.carton_volume[None, :] > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.max_by_volume = np.where(
+                valid_volume,
+                np.floor_divide(self.truck_volume[:, None], np.where(self.carton_volume > 0, self.carton_volume, 1)[None, :]),
+                0
+            ).astype(np.int64)
+
+        # Weight capacity; trucks without a limit and weightless cartons follow the packer's rules
+        truck_limit = np.where(truck_weight > 0, truck_weight, np.inf)
+        unit_weight = np.where(carton_weight > 0, carton_weight, 1.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.max_by_weight = np.where(
+                np.isinf(truck_limit)[:, None],
+                np.inf,
+                np.floor_divide(np.where(np.isinf(truck_limit), 0, truck_limit)[:, None], unit_weight[None, :])
+            )
+
+        # Adaptive packing efficiency: large items pack denser than many small ones
+        efficiency = np.where(self.max_by_volume <= 5, 0.85, np.where(self.max_by_volume <= 20, 0.70, 0.60))
+        self.efficiency = efficiency
+        self.realistic_by_volume = np.floor(self.max_by_volume * efficiency).astype(np.int64)
+        realistic = np.minimum(self.realistic_by_volume, self.max_by_weight)
+        realistic = np.minimum(realistic, SAFETY_LIMIT)
+        self.realistic_max = np.where(self.can_fit, np.maximum(1, realistic), 0).astype(np.int64)
+
+    def _position(self, truck_id, truck_sig, carton_id, carton_sig) -> Optional[Tuple[int, int]]:
+        ti = self.truck_index.get(truck_id)
+        ci = self.carton_index.get(carton_id)
+        if ti is None or ci is None:
+            return None
+        if self.truck_signatures[ti] != truck_sig or self.carton_signatures[ci] != carton_sig:
+            # Row changed without going through the ORM; rebuild on next use
+            self.stale = True
+            return None
+        return ti, ci
+
+    def validation_entry(self, truck_id, truck_sig, carton_id, carton_sig) -> Optional[Dict]:
+        """Per-type validation dict in the shape the packer builds, or None if unknown"""
+        position = self._position(truck_id, truck_sig, carton_id, carton_sig)
+        if position is None:
+            return None
+        ti, ci = position
+        max_by_weight = self.max_by_weight[ti, ci]
+        return {
+            'can_fit_physically': bool(self.can_fit[ti, ci]),
+            'max_by_volume': int(self.max_by_volume[ti, ci]),
+            'max_by_weight': float('inf') if np.isinf(max_by_weight) else int(max_by_weight),
+            'realistic_max': int(self.realistic_max[ti, ci]),
+            'item_volume': float(self.carton_volume[ci]),
+            'current_count': 0
+        }
+
+    def lookup(self, truck, carton) -> Optional[Dict]:
+        """Validation entry for a truck/carton pair of model objects"""
+        return self.validation_entry(getattr(truck, 'id', None), truck_signature(truck),
+                                     getattr(carton, 'id', None), carton_signature(carton))
+
+    def first_strict_rotation(self, ti: int, ci: int) -> Optional[Tuple[float, float, float]]:
+        """First orientation (packer order) that fits without tolerance"""
+        fitting = np.flatnonzero(self.strict_rotation_fit[ti, ci])
+        if fitting.size == 0:
+            return None
+        carton = self.cartons[ci]
+        dims = (carton.length, carton.width, carton.height)
+        return tuple(dims[axis] for axis in ROTATION_ORDER[fitting[0]])
+
+    def may_hold_all(self, truck, carton_quantities: Dict) -> bool:
+        """False when the matrix proves a single truck cannot take the whole load"""
+        total_volume = 0.0
+        total_weight = 0.0
+        for carton, quantity in carton_quantities.items():
+            entry = self.lookup(truck, carton)
+            if entry is not None and not entry['can_fit_physically']:
+                return False
+            length, width, height, weight = carton_signature(carton)
+            total_volume += length * width * height * quantity
+            total_weight += weight * quantity
+
+        length, width, height, max_weight = truck_signature(truck)
+        if total_volume > length * width * height:
+            return False
+        if max_weight > 0 and total_weight > max_weight:
+            return False
+        return True
+
+
+_matrix: Optional[CapacityMatrix] = None
+_matrix_lock = threading.Lock()
+_listeners_registered = False
+
+
+def invalidate_capacity_matrix(*_args):
+    """Drop the cached matrix (used as an SQLAlchemy mapper event handler)"""
+    global _matrix
+    _matrix = None
+
+
+def _register_invalidation_listeners():
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    from sqlalchemy import event
+    from .models import TruckType, CartonType
+
+    for model in (TruckType, CartonType):
+        for event_name in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(model, event_name, invalidate_capacity_matrix)
+    _listeners_registered = True
+
+
+def get_capacity_matrix(build: bool = True) -> Optional[CapacityMatrix]:
+    """
+    The matrix for all TruckType x CartonType rows in the DB.
+
+    Built on first use (needs an app context) and rebuilt after truck or carton
+    edits. With build=False only an already built, current matrix is returned,
+    which is what worker threads without an app context should use.
+    """
+    global _matrix
+    matrix = _matrix
+    if matrix is not None and not matrix.stale:
+        return matrix
+    if not build:
+        return None
+
+    with _matrix_lock:
+        if _matrix is not None and not _matrix.stale:
+            return _matrix
+        try:
+            _register_invalidation_listeners()
+            from .models import TruckType, CartonType
+            trucks = TruckType.query.all()
+            cartons = CartonType.query.all()
+        except Exception as exc:
+            # No app context or tables yet; callers fall back to computing per pair
+            logger.debug(f"Capacity matrix unavailable: {exc}")
+            return None
+
+        _matrix = CapacityMatrix(trucks, cartons)
+        logger.info(f"Capacity matrix built for {len(trucks)} trucks x {len(cartons)} cartons")
+        return _matrix
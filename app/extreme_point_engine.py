@@ -0,0 +1,264 @@
+"""
+Native Extreme-Point Packing Engine for TruckOpti
+Drop-in alternative to py3dbp's Packer for single-truck packing
+
+Features:
+- Same add_bin / add_item / pack interface as py3dbp.Packer
+- Leaves bin.items, bin.unfitted_items, item.position and item.rotation_type set the
+  way py3dbp does, so packer results are summarized by the same code
+- Integer centimetre geometry (carton sizes rounded up, truck sizes rounded down)
+- Extreme points maintained incrementally instead of re-deriving pivots from every
+  placed item
+- Collision checks go through the shared SpatialIndex, so they only look at nearby boxes
+- LoadState keeps placements and extreme points of a loaded bin, so late cartons
+  can be added to it without repacking
+"""
+
+import bisect
+import math
+import time
+from typing import Dict, List, Tuple
+
+from .spatial_index import SpatialIndex
+
+# Same order as py3dbp's RotationType, so rotation_type values mean the same thing
+# in both engines. Each entry maps (width, height, depth) to the placed extents.
+ROTATION_AXES = (
+    (0, 1, 2),  # RT_WHD
+    (1, 0, 2),  # RT_HWD
+    (1, 2, 0),  # RT_HDW
+    (2, 1, 0),  # RT_DHW
+    (2, 0, 1),  # RT_DWH
+    (0, 2, 1),  # RT_WDH
+)
+
+MIN_GRID_CELL = 5  # cm
+
+
+def to_int_cm(value, round_up=True) -> int:
+    """Convert a dimension in cm to whole centimetres"""
+    value = float(value)
+    return int(math.ceil(value - 1e-9)) if round_up else int(math.floor(value + 1e-9))
+
+
+def item_orientations(item) -> List[Tuple[int, Tuple[int, int, int]]]:
+    """Distinct (rotation_type, (w, h, d)) orientations of an item in integer cm"""
+    dims = (to_int_cm(item.width), to_int_cm(item.height), to_int_cm(item.depth))
+    rotation_types = range(len(ROTATION_AXES)) if getattr(item, 'can_rotate', True) else (0,)
+
+    orientations = []
+    seen = set()
+    for rotation_type in rotation_types:
+        axes = ROTATION_AXES[rotation_type]
+        extents = (dims[axes[0]], dims[axes[1]], dims[axes[2]])
+        if extents not in seen:
+            seen.add(extents)
+            orientations.append((rotation_type, extents))
+    return orientations
+
+
+class LoadState:
+    """
+    Placements and extreme points of one (partly) loaded bin.
+
+    Dimensions follow py3dbp: width/height/depth are the truck length/width/height
+    as passed to Bin. The state can be saved with to_dict() and restored with
+    from_dict(), so more items can be added to a loaded truck later without
+    repacking what is already there.
+    """
+
+    def __init__(self, width, height, depth, max_weight=None, cell_size=None):
+        self.width = to_int_cm(width, round_up=False)
+        self.height = to_int_cm(height, round_up=False)
+        self.depth = to_int_cm(depth, round_up=False)
+        self.max_weight = float(max_weight) if max_weight else float('inf')
+        self.grid = SpatialIndex(max(MIN_GRID_CELL, cell_size or MIN_GRID_CELL))
+        self.placements = []
+        self.total_weight = 0.0
+
+        # Extreme points as (x, z, y) so sorted order is wall-building order
+        self.points = [(0, 0, 0)]
+        self.point_set = {(0, 0, 0)}
+        self._failed_points: Dict[Tuple, set] = {}
+
+    def place(self, item) -> bool:
+        """Put an item at the first extreme point it fits; sets position and rotation_type"""
+        weight = float(item.weight or 0)
+        if self.total_weight + weight > self.max_weight:
+            return False
+
+        orientations = item_orientations(item)
+        # Points fail for a set of allowed extents, not for the sorted dimensions:
+        # a carton that may not rotate only shares them with identically oriented ones
+        size_key = frozenset(extents for _, extents in orientations)
+        failed = self._failed_points.setdefault(size_key, set())
+
+        placement = None
+        for point in self.points:
+            if point in failed:
+                continue
+            px, pz, py = point
+            best = None
+            for rotation_type, (w, h, d) in orientations:
+                if px + w > self.width or py + h > self.height or pz + d > self.depth:
+                    continue
+                if self.grid.overlaps(px, py, pz, px + w, py + h, pz + d):
+                    continue
+                # Prefer the orientation that keeps the wall thin, then low
+                if best is None or (w, d) < (best[1][0], best[1][2]):
+                    best = (rotation_type, (w, h, d))
+            if best is not None:
+                placement = (point, best)
+                break
+            failed.add(point)
+
+        if placement is None:
+            return False
+
+        point, (rotation_type, extents) = placement
+        px, pz, py = point
+        item.position = [px, py, pz]
+        item.rotation_type = rotation_type
+        self._occupy(item.name, rotation_type, (px, py, pz), extents, weight)
+        return True
+
+    def _occupy(self, name, rotation_type, position, extents, weight):
+        x, y, z = position
+        w, h, d = extents
+        self.grid.insert(len(self.placements), x, y, z, x + w, y + h, z + d)
+        self.placements.append({
+            'name': name,
+            'position': [x, y, z],
+            'size': [w, h, d],
+            'rotation_type': rotation_type,
+            'weight': weight,
+        })
+        self.total_weight += weight
+
+        point = (x, z, y)
+        if point in self.point_set:
+            self.points.pop(bisect.bisect_left(self.points, point))
+            self.point_set.discard(point)
+        for new_point in ((x + w, z, y), (x, z + d, y), (x, z, y + h)):
+            self._add_point(new_point)
+
+    def _add_point(self, point):
+        # Points on fractional boxes (placed by another engine) are rounded up to whole cm
+        nx, nz, ny = (to_int_cm(value) for value in point)
+        point = (nx, nz, ny)
+        if nx < self.width and ny < self.height and nz < self.depth and point not in self.point_set:
+            self.point_set.add(point)
+            bisect.insort(self.points, point)
+
+    def used_volume(self) -> float:
+        return sum(p['size'][0] * p['size'][1] * p['size'][2] for p in self.placements)
+
+    def extreme_points(self) -> List[List[int]]:
+        """Current extreme points as [x, y, z]"""
+        return [[x, y, z] for x, z, y in self.points]
+
+    def to_dict(self) -> Dict:
+        return {
+            'width': self.width,
+            'height': self.height,
+            'depth': self.depth,
+            'max_weight': None if math.isinf(self.max_weight) else self.max_weight,
+            'placements': [dict(p) for p in self.placements],
+            'extreme_points': self.extreme_points(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LoadState':
+        """
+        Restore a saved state. Placements may also be packer result entries
+        (position, rotation_type and the unrotated width/height/depth), so any
+        packed truck can be topped up. Without saved extreme points they are
+        rebuilt from the corners of the placed boxes.
+        """
+        placements = data.get('placements', [])
+        extents = []
+        for placement in placements:
+            if 'size' in placement:
+                extents.append(tuple(float(v) for v in placement['size']))
+            else:
+                dims = (float(placement['width']), float(placement['height']), float(placement['depth']))
+                axes = ROTATION_AXES[int(placement.get('rotation_type') or 0)]
+                extents.append((dims[axes[0]], dims[axes[1]], dims[axes[2]]))
+
+        smallest = min((min(e) for e in extents), default=None)
+        state = cls(data['width'], data['height'], data['depth'], data.get('max_weight'),
+                    cell_size=smallest)
+        for placement, size in zip(placements, extents):
+            position = tuple(float(v) for v in placement['position'])
+            state._occupy(placement.get('name'), int(placement.get('rotation_type') or 0),
+                          position, size, float(placement.get('weight') or 0))
+
+        saved_points = data.get('extreme_points')
+        if saved_points is not None:
+            state.points = []
+            state.point_set = set()
+            for x, y, z in saved_points:
+                state._add_point((x, z, y))
+        return state
+
+
+class ExtremePointPacker:
+    """
+    Extreme-point packer with the py3dbp.Packer interface.
+
+    Items are placed largest first. Candidate positions are the extreme points
+    created by the boxes placed so far, tried in wall-building order (along the
+    bin width first, then bottom-up, then across). A point that cannot take an
+    item in any orientation is remembered for that item size, so runs of
+    identical cartons never re-test it.
+
+    With a deadline (time.time() value) set, items not reached by then are
+    reported unfitted and truncated is set; a bin always gets at least one
+    placement attempt, so the result is never empty just because time ran out.
+    """
+
+    def __init__(self, deadline=None):
+        self.bins = []
+        self.items = []
+        self.unfit_items = []
+        self.total_items = 0
+        self.deadline = deadline
+        self.truncated = False
+
+    def add_bin(self, bin):
+        self.bins.append(bin)
+
+    def add_item(self, item):
+        self.total_items = len(self.items) + 1
+        self.items.append(item)
+
+    def pack(self, bigger_first=True, distribute_items=False, number_of_decimals=None):
+        """Pack the added items into each bin (py3dbp-compatible signature)"""
+        items = sorted(
+            self.items,
+            key=lambda item: float(item.width) * float(item.height) * float(item.depth),
+            reverse=bigger_first
+        )
+        for bin in self.bins:
+            self._pack_to_bin(bin, items)
+            if distribute_items:
+                items = list(bin.unfitted_items)
+        self.unfit_items = list(items) if distribute_items else []
+
+    def _pack_to_bin(self, bin, items):
+        bin.items = []
+        bin.unfitted_items = []
+        if not items:
+            return
+
+        smallest_dim = min(min(item_orientations(item)[0][1]) for item in items)
+        state = LoadState(bin.width, bin.height, bin.depth, bin.max_weight, cell_size=smallest_dim)
+        for index, item in enumerate(items):
+            if self.deadline is not None and bin.items and time.time() >= self.deadline:
+                bin.unfitted_items.extend(items[index:])
+                self.truncated = True
+                break
+            if state.place(item):
+                bin.items.append(item)
+            else:
+                bin.unfitted_items.append(item)
@@ -1,11 +1,26 @@
 from py3dbp import Packer, Bin, Item
+import itertools
 import json
+import math
 import time
+import zlib
 from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import logging
+from dataclasses import dataclass, astuple, replace
 from typing import List, Dict, Tuple, Optional
 
+from .extreme_point_engine import ExtremePointPacker, LoadState, ROTATION_AXES
+from .packing_cache import get_packing_cache, packing_cache_key
+from .packing_cost_model import get_packing_cost_model, prior_estimate
+
+try:
+    from .capacity_matrix import CapacityMatrix, get_capacity_matrix, truck_signature
+    CAPACITY_MATRIX_AVAILABLE = True
+except ImportError as e:
+    logging.warning(f"Capacity matrix not available: {e}")
+    CAPACITY_MATRIX_AVAILABLE = False
+
 # Common Indian Truck Types
 INDIAN_TRUCKS = [
     # City/LCV
@@ -60,6 +75,25 @@ INDIAN_CARTONS = [
     {"type": "E", "length": 90, "width": 70, "height": 50, "weight": 10, "qty": 50}
 ]
 
+# Part of every packing cache key; bump when placement or admission logic changes
+PACKING_ALGORITHM_VERSION = '2.2'
+PARALLEL_PACKING_MIN_UNITS = 500  # cartons above which trucks are packed in parallel batches
+
+# 'float' packs catalogue centimetres as given; 'int_mm' normalizes every dimension to
+# whole millimetres on ingestion, so fit and overlap checks are exact integer comparisons
+GEOMETRY_MODES = ('float', 'int_mm')
+DEFAULT_GEOMETRY = 'float'
+MM_PER_CM = 10
+
+def to_int_mm(value_cm, round_up=True) -> int:
+    """Centimetres as whole millimetres; cartons round up and trucks down, so nothing fits only on paper"""
+    scaled = round(float(value_cm or 0) * MM_PER_CM, 6)
+    return int(math.ceil(scaled)) if round_up else int(math.floor(scaled))
+
+def _item_color(name: str) -> str:
+    """Display colour derived from the item name (stable across processes, unlike hash())"""
+    return '#%06x' % (zlib.crc32(name.encode('utf-8')) & 0xFFFFFF)
+
 @lru_cache(maxsize=128)
 def _calculate_item_sort_key(name: str, weight: float, value: float, priority: int, fragile: bool, stackable: bool, optimization_goal: str) -> Tuple:
     """Cached function to calculate sorting key for items"""
@@ -203,79 +237,393 @@ def _get_improvement_suggestions(space_util, weight_util, pack_eff, goal):
     
     return suggestions if suggestions else ["Optimization looks good - no major improvements needed"]
 
-def pack_cartons_optimized(truck_types_with_quantities, carton_types_with_quantities, optimization_goal='space', use_parallel=True, max_workers=4):
+@dataclass
+class CartonGroup:
+    """All units of one carton type in a packing request, handled as a single entry"""
+    key: int
+    name: str
+    length: float
+    width: float
+    height: float
+    weight: float
+    quantity: int
+    fragile: bool = False
+    stackable: bool = True
+    max_stack_height: int = 5
+    value: float = 0
+    priority: int = 1
+    can_rotate: bool = True
+    carton_type_id: Optional[int] = None
+
+    @property
+    def volume(self) -> float:
+        return self.length * self.width * self.height
+
+    def make_item(self, serial: int) -> Item:
+        """Materialize one unit as a py3dbp Item (only done for units admitted to a truck)"""
+        item = Item(f"{self.name}_{serial}", self.length, self.width, self.height, self.weight)
+        item.fragile = self.fragile
+        item.stackable = self.stackable
+        item.max_stack_height = self.max_stack_height
+        item.value = self.value
+        item.priority = self.priority
+        item.can_rotate = self.can_rotate
+        item.carton_group_key = self.key
+        item.carton_serial = serial
+        return item
+
+def _build_carton_groups(carton_types_with_quantities, optimization_goal='space', geometry=DEFAULT_GEOMETRY) -> List[CartonGroup]:
+    """Collapse {carton_type: quantity} into CartonGroups sorted for the optimization goal"""
+    scale = to_int_mm if geometry == 'int_mm' else (lambda value: value)
+    groups = []
+    groups_by_signature = {}
+
+    for carton_type, quantity in carton_types_with_quantities.items():
+        if not quantity or quantity <= 0:
+            continue
+        weight = carton_type.weight if carton_type.weight else 0
+        # Identical carton types share one group so unit names stay unique
+        signature = (carton_type.name, carton_type.length, carton_type.width, carton_type.height, weight)
+        if signature in groups_by_signature:
+            groups_by_signature[signature].quantity += quantity
+            continue
+
+        group = CartonGroup(
+            key=len(groups),
+            name=carton_type.name,
+            length=scale(carton_type.length),
+            width=scale(carton_type.width),
+            height=scale(carton_type.height),
+            weight=weight,
+            quantity=quantity,
+            fragile=getattr(carton_type, 'fragile', False),
+            stackable=getattr(carton_type, 'stackable', True),
+            max_stack_height=getattr(carton_type, 'max_stack_height', 5),
+            value=getattr(carton_type, 'value', 0) or 0,
+            priority=getattr(carton_type, 'priority', 1) or 1,
+            can_rotate=getattr(carton_type, 'can_rotate', True),
+            carton_type_id=getattr(carton_type, 'id', None),
+        )
+        groups_by_signature[signature] = group
+        groups.append(group)
+
+    return _sort_carton_groups(groups, optimization_goal)
+
+def _sort_carton_groups(groups, optimization_goal) -> List[CartonGroup]:
+    """Groups in packing order for the goal; ties keep input order (group keys)"""
+    return sorted(sorted(groups, key=lambda g: g.key), key=lambda g: _calculate_item_sort_key(
+        g.name, g.weight, g.value, g.priority,
+        g.fragile, g.stackable, optimization_goal
+    ))
+
+class RemainingInventory:
+    """Unpacked units per carton group, with O(1) lookups and removals as trucks are filled.
+
+    Units are identified by (group key, serial). Serials handed to a truck but not
+    packed are returned to a per-group pool so the next truck reuses them and unit
+    names stay unique across the whole request.
+    """
+
+    def __init__(self, groups: List[CartonGroup]):
+        self._quantity = {group.key: group.quantity for group in groups}
+        self._count = dict(self._quantity)
+        self._next_serial = {group.key: 0 for group in groups}
+        self._returned = {group.key: {} for group in groups}  # insertion-ordered set
+
+    def count(self, key: int) -> int:
+        return self._count.get(key, 0)
+
+    def total(self) -> int:
+        return sum(self._count.values())
+
+    def __bool__(self):
+        return any(self._count.values())
+
+    def serials(self, key: int, limit: int) -> List[int]:
+        """Serials of up to `limit` unpacked units of a group (does not remove them)"""
+        limit = min(limit, self._count.get(key, 0))
+        serials = []
+        for serial in self._returned[key]:
+            if len(serials) >= limit:
+                break
+            serials.append(serial)
+        fresh_end = min(self._quantity[key], self._next_serial[key] + limit - len(serials))
+        serials.extend(range(self._next_serial[key], fresh_end))
+        return serials
+
+    def consume(self, key: int, packed_serials: List[int]):
+        """Remove packed units; fresh serials skipped over go back to the pool"""
+        returned = self._returned[key]
+        next_serial = self._next_serial[key]
+        fresh = []
+        for serial in packed_serials:
+            if serial in returned:
+                del returned[serial]
+            elif serial >= next_serial:
+                fresh.append(serial)
+        if fresh:
+            packed_fresh = set(fresh)
+            last = max(fresh)
+            for serial in range(next_serial, last + 1):
+                if serial not in packed_fresh:
+                    returned[serial] = None
+            self._next_serial[key] = last + 1
+        self._count[key] -= len(packed_serials)
+
+class BlockLayerPacker:
+    """
+    Closed-form block/layer packer for loads made of a few carton types.
+
+    Each carton type is laid out as full slices across the truck: for every
+    allowed orientation the slice holds floor(W/w) x floor(H/d) units, and the
+    orientation packing the most units into the shortest length wins. Columns
+    are no taller than the type's max_stack_height, and a single layer for
+    non-stackable cartons. Slices fill the truck from the front; leftover units
+    of every type are packed by the generic engine into the remaining length.
+    Geometry is reported as floats for both parts, so the result is summarized
+    like any other engine. A deadline is handed on to fallback engines that
+    support one.
+    """
+
+    def __init__(self, fallback=Packer, deadline=None):
+        self.fallback = fallback
+        self.bins = []
+        self.items = []
+        self.unfit_items = []
+        self.blocks = []
+        self.deadline = deadline
+        self.truncated = False
+
+    def add_bin(self, bin):
+        self.bins.append(bin)
+
+    def add_item(self, item):
+        self.items.append(item)
+
+    def pack(self, bigger_first=True, distribute_items=False, number_of_decimals=None):
+        """Pack the added items into the first bin (py3dbp-compatible signature)"""
+        for bin in self.bins[:1]:
+            self._pack_to_bin(bin, list(self.items), bigger_first)
+
+    @staticmethod
+    def _orientations(item):
+        dims = (float(item.width), float(item.height), float(item.depth))
+        rotation_types = range(len(ROTATION_AXES)) if getattr(item, 'can_rotate', True) else (0,)
+        seen = set()
+        for rotation_type in rotation_types:
+            axes = ROTATION_AXES[rotation_type]
+            extents = (dims[axes[0]], dims[axes[1]], dims[axes[2]])
+            if extents not in seen:
+                seen.add(extents)
+                yield rotation_type, extents
+
+    def _pack_to_bin(self, bin, items, bigger_first=True):
+        length, width, height = float(bin.width), float(bin.height), float(bin.depth)
+        max_weight = float(bin.max_weight) if bin.max_weight else float('inf')
+
+        # Items of one carton type share a signature; largest types go first
+        by_type = {}
+        for item in items:
+            signature = (float(item.width), float(item.height), float(item.depth),
+                         float(item.weight or 0), getattr(item, 'can_rotate', True),
+                         getattr(item, 'stackable', True), getattr(item, 'max_stack_height', None))
+            by_type.setdefault(signature, []).append(item)
+        types = sorted(by_type.items(), key=lambda entry: entry[0][0] * entry[0][1] * entry[0][2],
+                       reverse=bigger_first)
+
+        placed = []
+        leftovers = []
+        offset = 0.0
+        weight_used = 0.0
+        self.blocks = []
+        for signature, units in types:
+            unit_weight, stackable, max_stack_height = signature[3], signature[5], signature[6]
+            weight_room = int((max_weight - weight_used) // unit_weight) if unit_weight > 0 else len(units)
+
+            best = None
+            for rotation_type, (w, h, d) in self._orientations(units[0]):
+                across, up = int((width + 1e-9) // h), int((height + 1e-9) // d)
+                if not stackable:
+                    up = min(up, 1)
+                elif max_stack_height:
+                    up = min(up, int(max_stack_height))
+                per_slice = across * up
+                if per_slice == 0 or offset + w > length + 1e-9:
+                    continue
+                slices = min(len(units) // per_slice, int((length - offset + 1e-9) // w))
+                count = min(slices * per_slice, weight_room)
+                if count <= 0:
+                    continue
+                used_length = -(-count // per_slice) * w
+                if best is None or (count, -used_length) > (best[0], -best[1]):
+                    best = (count, used_length, rotation_type, (w, h, d), across, per_slice)
+
+            if best is None:
+                leftovers.extend(units)
+                continue
+
+            count, used_length, rotation_type, (w, h, d), across, per_slice = best
+            for i, item in enumerate(units[:count]):
+                slice_index, cell = divmod(i, per_slice)
+                level, column = divmod(cell, across)
+                # Floor row across the truck first, then upwards, so a partial slice stays supported
+                item.position = [offset + slice_index * w, column * h, level * d]
+                item.rotation_type = rotation_type
+                placed.append(item)
+            self.blocks.append({'items': count, 'rotation_type': rotation_type,
+                                'start': offset, 'length': used_length})
+            offset += used_length
+            weight_used += count * unit_weight
+            leftovers.extend(units[count:])
+
+        unfitted = []
+        remaining_length = length - offset
+        remaining_weight = max_weight - weight_used
+        if leftovers and remaining_length > 0 and remaining_weight > 0:
+            # Generic engine gets only as many units as could fit by volume in the remainder
+            room = remaining_length * width * height
+            candidates = []
+            for item in sorted(leftovers, key=lambda i: float(i.width) * float(i.height) * float(i.depth),
+                               reverse=bigger_first):
+                item_volume = float(item.width) * float(item.height) * float(item.depth)
+                if item_volume <= room:
+                    room -= item_volume
+                    candidates.append(item)
+                else:
+                    unfitted.append(item)
+
+            remainder = Bin(f"{bin.name}_remainder", remaining_length, width, height, remaining_weight)
+            packer = self.fallback()
+            if hasattr(packer, 'deadline'):
+                packer.deadline = self.deadline
+            packer.add_bin(remainder)
+            for item in candidates:
+                packer.add_item(item)
+            packer.pack()
+            self.truncated = getattr(packer, 'truncated', False)
+            for item in remainder.items:
+                item.position = [float(item.position[0]) + offset, float(item.position[1]), float(item.position[2])]
+                placed.append(item)
+            unfitted.extend(remainder.unfitted_items)
+        else:
+            unfitted.extend(leftovers)
+
+        # Report plain floats whichever engine placed the item
+        for item in placed + unfitted:
+            item.width, item.height, item.depth = float(item.width), float(item.height), float(item.depth)
+            item.weight = float(item.weight or 0)
+        bin.width, bin.height, bin.depth, bin.max_weight = length, width, height, max_weight
+        bin.items = placed
+        bin.unfitted_items = unfitted
+
+# Placement engines for _pack_single_truck; all share py3dbp's Packer interface.
+# 'block' is opt-in: closed-form slices for bulk loads of a few carton types
+PACKING_ENGINES = {
+    'py3dbp': Packer,
+    'extreme_points': ExtremePointPacker,
+    'block': BlockLayerPacker,
+}
+DEFAULT_PACKING_ENGINE = 'py3dbp'
+
+def _create_truck_bin(truck_type, idx=0, geometry=DEFAULT_GEOMETRY):
+    """Empty py3dbp Bin for one truck of a TruckType, remembering the type for costing"""
+    dimensions = (truck_type.length, truck_type.width, truck_type.height)
+    if geometry == 'int_mm':
+        dimensions = tuple(to_int_mm(value, round_up=False) for value in dimensions)
+    bin_obj = Bin(
+        f"{truck_type.name}_{idx}",
+        *dimensions,
+        truck_type.max_weight if truck_type.max_weight else float('inf')
+    )
+    bin_obj.truck_type = truck_type
+    bin_obj.geometry = geometry
+    return bin_obj
+
+def _restore_cm_geometry(truck_bin):
+    """Convert a bin packed in integer millimetres (and its items) back to centimetres for reporting"""
+    if getattr(truck_bin, 'geometry', DEFAULT_GEOMETRY) != 'int_mm':
+        return
+    truck_bin.width, truck_bin.height, truck_bin.depth = (
+        int(value) / MM_PER_CM for value in (truck_bin.width, truck_bin.height, truck_bin.depth))
+    for item in list(truck_bin.items) + list(truck_bin.unfitted_items):
+        item.width, item.height, item.depth = (
+            int(value) / MM_PER_CM for value in (item.width, item.height, item.depth))
+        if getattr(item, 'position', None):
+            item.position = [int(value) / MM_PER_CM for value in item.position]
+    truck_bin.geometry = DEFAULT_GEOMETRY
+
+def pack_cartons_optimized(truck_types_with_quantities, carton_types_with_quantities, optimization_goal='space', use_parallel=True, max_workers=4, parallel_backend='thread', engine=DEFAULT_PACKING_ENGINE, use_cache=True, deadline_seconds=None, geometry=DEFAULT_GEOMETRY):
     """
     Optimized 3D packing algorithm for TruckOpti with performance improvements.
     - Handles large datasets (>1000 cartons) efficiently
     - Uses caching and parallel processing for better performance
     - Supports optimization_goal: 'space', 'cost', 'weight', 'min_trucks'
     - Added logging and performance monitoring
+    - parallel_backend: 'thread' (default) or 'process' to pack candidate trucks on multiple cores
+    - engine: placement engine from PACKING_ENGINES ('py3dbp' or the native 'extreme_points')
+    - use_cache: reuse results of identical problems from the persistent packing cache
+    - deadline_seconds: wall-clock budget; when it expires no further trucks are started, the
+      extreme-point engine stops placing cartons, and the trucks packed so far are returned
+      with 'truncated' set (truncated results are never cached)
+    - geometry: 'float' (catalogue cm) or 'int_mm' to pack in whole millimetres; results are
+      reported in cm either way and int_mm runs are byte-identical across runs
     """
-    start_time = time.time()
-    logging.info(f"Starting packing optimization with goal: {optimization_goal}")
+    if engine not in PACKING_ENGINES:
+        raise ValueError(f"Unknown packing engine '{engine}', expected one of {sorted(PACKING_ENGINES)}")
+    if geometry not in GEOMETRY_MODES:
+        raise ValueError(f"Unknown geometry mode '{geometry}', expected one of {GEOMETRY_MODES}")
     
-    def create_bin_optimized(truck_type, idx=0):
-        bin_obj = Bin(
-            f"{truck_type.name}_{idx}",
-            truck_type.length,
-            truck_type.width,
-            truck_type.height,
-            truck_type.max_weight if truck_type.max_weight else float('inf')
-        )
-        bin_obj.truck_type = truck_type
-        return bin_obj
+    start_time = time.time()
+    deadline = start_time + deadline_seconds if deadline_seconds is not None else None
+    logging.info(f"Starting packing optimization with goal: {optimization_goal}, engine: {engine}")
+    
+    cache = get_packing_cache() if use_cache else None
+    if cache is not None:
+        total_units = sum(quantity for quantity in carton_types_with_quantities.values() if quantity and quantity > 0)
+        cache_key = packing_cache_key(truck_types_with_quantities, carton_types_with_quantities,
+                                      optimization_goal, engine, PACKING_ALGORITHM_VERSION, geometry,
+                                      _execution_mode(total_units, use_parallel, max_workers, parallel_backend))
+        cached_results = cache.get(cache_key)
+        if cached_results is not None:
+            logging.info(f"Packing cache hit ({cache_key[:12]}) in {time.time() - start_time:.3f} seconds")
+            return cached_results
+    
+    if CAPACITY_MATRIX_AVAILABLE:
+        # Build (or reuse) the capacity matrix here, where the app context is available
+        get_capacity_matrix()
 
-    # Pre-process items for better performance
-    items = []
-    item_cache = {}  # Cache for similar items
-    
-    for carton_type, quantity in carton_types_with_quantities.items():
-        # Cache key for identical carton types
-        cache_key = f"{carton_type.name}_{carton_type.length}_{carton_type.width}_{carton_type.height}_{carton_type.weight}"
-        
-        if cache_key not in item_cache:
-            base_item = Item(
-                carton_type.name,
-                carton_type.length,
-                carton_type.width,
-                carton_type.height,
-                carton_type.weight if carton_type.weight else 0
-            )
-            # Add custom attributes with safe defaults
-            base_item.fragile = getattr(carton_type, 'fragile', False)
-            base_item.stackable = getattr(carton_type, 'stackable', True)
-            base_item.max_stack_height = getattr(carton_type, 'max_stack_height', 5)
-            base_item.value = getattr(carton_type, 'value', 0) or 0
-            base_item.priority = getattr(carton_type, 'priority', 1) or 1
-            base_item.can_rotate = getattr(carton_type, 'can_rotate', True)
-            item_cache[cache_key] = base_item
-        
-        # Create multiple instances efficiently
-        base_item = item_cache[cache_key]
-        for i in range(quantity):
-            item_copy = Item(
-                f"{base_item.name}_{i}",
-                base_item.width, base_item.height, base_item.depth,
-                base_item.weight
-            )
-            # Copy attributes with safe defaults
-            item_copy.fragile = getattr(base_item, 'fragile', False)
-            item_copy.stackable = getattr(base_item, 'stackable', True)
-            item_copy.max_stack_height = getattr(base_item, 'max_stack_height', 5)
-            item_copy.value = getattr(base_item, 'value', 0) or 0
-            item_copy.priority = getattr(base_item, 'priority', 1) or 1
-            item_copy.can_rotate = getattr(base_item, 'can_rotate', True)
-            items.append(item_copy)
-
-    # Optimized sorting using cached function
-    items.sort(key=lambda x: _calculate_item_sort_key(
-        x.name, x.weight, x.value, x.priority, 
-        x.fragile, x.stackable, optimization_goal
-    ))
+    # Group identical cartons instead of expanding them into one Item per unit.
+    # py3dbp Items are only materialized per truck for the units admitted to it.
+    groups = _build_carton_groups(carton_types_with_quantities, optimization_goal, geometry)
 
     # Pre-allocate truck bins with better ordering
     available_trucks = []
-    truck_list = list(truck_types_with_quantities.items())
+    for truck_type, quantity in _sort_trucks_for_goal(truck_types_with_quantities.items(), optimization_goal):
+        for i in range(quantity):
+            available_trucks.append(_create_truck_bin(truck_type, i, geometry))
+
+    results, truncated = _pack_truck_bins(available_trucks, groups, use_parallel, max_workers,
+                                          parallel_backend, engine, deadline)
+    
+    if truncated:
+        logging.warning(f"Packing deadline of {deadline_seconds}s reached, returning {len(results)} packed trucks")
+    else:
+        if cache is not None:
+            cache.put(cache_key, results)
+        # Complete runs are telemetry for the packing cost model
+        cost_model = get_packing_cost_model()
+        if cost_model is not None:
+            cost_model.record(sum(group.quantity for group in groups), len(groups), len(available_trucks),
+                              engine, time.time() - start_time)
+    
+    end_time = time.time()
+    logging.info(f"Packing completed in {end_time - start_time:.2f} seconds")
+    
+    return results
+
+def _sort_trucks_for_goal(truck_types_with_quantities, optimization_goal):
+    """(truck_type, quantity) pairs in the order trucks are filled for the optimization goal"""
+    truck_list = list(truck_types_with_quantities)
     
     # Sort trucks by volume (largest first) for better space optimization
     if optimization_goal in ['space', 'min_trucks']:
@@ -284,79 +632,384 @@ def pack_cartons_optimized(truck_types_with_quantities, carton_types_with_quanti
         truck_list.sort(key=lambda x: getattr(x[0], 'cost_per_km', 0))
     elif optimization_goal == 'weight':
         truck_list.sort(key=lambda x: getattr(x[0], 'max_weight', 1000), reverse=True)
-    
-    for truck_type, quantity in truck_list:
-        for i in range(quantity):
-            available_trucks.append(create_bin_optimized(truck_type, i))
+    return truck_list
+
+def _uses_parallel_packing(total_units, use_parallel):
+    """Parallel truck batches are only used for large datasets"""
+    return use_parallel and total_units > PARALLEL_PACKING_MIN_UNITS
 
-    if use_parallel and len(items) > 500:  # Use parallel processing for large datasets
-        results = _pack_parallel(available_trucks, items, max_workers)
+def _execution_mode(total_units, use_parallel, max_workers, parallel_backend):
+    """Cache key component: parallel batches can fill trucks differently from the sequential pass"""
+    if _uses_parallel_packing(total_units, use_parallel):
+        return f'parallel:{parallel_backend}:{max_workers}'
+    return 'sequential'
+
+def _pack_truck_bins(available_trucks, groups, use_parallel=True, max_workers=4, parallel_backend='thread',
+                     engine=DEFAULT_PACKING_ENGINE, deadline=None):
+    """Fill the ordered truck bins with the carton groups; returns (results, truncated)"""
+    total_units = sum(group.quantity for group in groups)
+    if _uses_parallel_packing(total_units, use_parallel):
+        results, truncated = _pack_parallel(available_trucks, groups, max_workers, parallel_backend, engine, deadline)
     else:
-        results = _pack_sequential(available_trucks, items)
+        results, truncated = _pack_sequential(available_trucks, groups, engine, deadline)
     
-    end_time = time.time()
-    logging.info(f"Packing completed in {end_time - start_time:.2f} seconds")
-    
-    return results
+    for result in results:
+        result['truncated'] = truncated
+    return results, truncated
+
+def _deadline_passed(deadline, results):
+    """True once the deadline has expired and there is already something to return"""
+    return deadline is not None and bool(results) and time.time() >= deadline
 
-def _pack_sequential(available_trucks, items):
-    """Sequential packing implementation"""
+def _consume_packed_cartons(inventory, result):
+    """Take a chosen truck's cartons out of the inventory; the per-unit serials never leave the packer"""
+    for key, serials in result.pop('packed_serials').items():
+        inventory.consume(key, serials)
+
+def _pack_sequential(available_trucks, groups, engine=DEFAULT_PACKING_ENGINE, deadline=None):
+    """Sequential packing implementation; returns (results, truncated)"""
     results = []
-    remaining_items = items.copy()
+    truncated = False
+    inventory = RemainingInventory(groups)
     
     for truck_bin in available_trucks:
-        if not remaining_items:
+        if not inventory:
+            break
+        if _deadline_passed(deadline, results):
+            truncated = True
             break
             
-        result = _pack_single_truck(truck_bin, remaining_items)
+        result = _pack_single_truck(truck_bin, groups, inventory, engine, deadline)
+        truncated = truncated or result['calculation_metadata']['truncated']
         if result['fitted_items']:
             results.append(result)
-            remaining_items = [item for item in remaining_items if item.name not in [fit['name'] for fit in result['fitted_items']]]
+            _consume_packed_cartons(inventory, result)
     
-    return results
+    return results, truncated
+
+def _pack_parallel(available_trucks, groups, max_workers, backend='thread', engine=DEFAULT_PACKING_ENGINE, deadline=None):
+    """Parallel packing implementation for better performance; returns (results, truncated).
 
-def _pack_parallel(available_trucks, items, max_workers):
-    """Parallel packing implementation for better performance"""
+    backend='thread' packs candidate trucks in a thread pool (cheap to start, but py3dbp
+    is pure Python so threads contend for the GIL). backend='process' packs them in
+    worker processes that receive the carton group table once and return placements only.
+    """
     results = []
-    remaining_items = items.copy()
+    truncated = False
+    inventory = RemainingInventory(groups)
     
     # Process trucks in batches for better parallelization
     batch_size = min(max_workers, len(available_trucks))
-    
-    for i in range(0, len(available_trucks), batch_size):
-        if not remaining_items:
-            break
+    if batch_size <= 0:
+        return results, truncated
+    
+    executor = None
+    if backend == 'process':
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_packing_worker,
+                initargs=([astuple(group) for group in groups],)
+            )
+        except (OSError, ValueError, NotImplementedError) as exc:
+            logging.warning(f'Process pool unavailable ({exc}), falling back to threads')
+    use_processes = executor is not None
+    if not use_processes:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    with executor:
+        for i in range(0, len(available_trucks), batch_size):
+            if not inventory:
+                break
+            if _deadline_passed(deadline, results):
+                truncated = True
+                break
+                
+            truck_batch = available_trucks[i:i+batch_size]
             
-        truck_batch = available_trucks[i:i+batch_size]
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_truck = {
-                executor.submit(_pack_single_truck, truck, remaining_items.copy()): truck 
-                for truck in truck_batch
-            }
+            # Each truck materializes its own Items, so no py3dbp state is shared between workers.
+            # The inventory is only read while the batch runs and updated once it has finished.
+            if use_processes:
+                future_to_truck = {
+                    executor.submit(_pack_truck_in_worker, _truck_bin_spec(truck), inventory, engine, deadline,
+                                    getattr(truck, 'geometry', DEFAULT_GEOMETRY)): truck
+                    for truck in truck_batch
+                }
+            else:
+                future_to_truck = {
+                    executor.submit(_pack_single_truck, truck, groups, inventory, engine, deadline): truck
+                    for truck in truck_batch
+                }
             
             batch_results = []
             for future in as_completed(future_to_truck):
                 try:
-                    result = future.result()
+                    if use_processes:
+                        result = _summarize_worker_packing(future_to_truck[future], groups, future.result())
+                    else:
+                        result = future.result()
                     if result['fitted_items']:
-                        batch_results.append(result)
+                        batch_results.append((truck_batch.index(future_to_truck[future]), result))
                 except Exception as exc:
                     logging.error(f'Truck packing generated an exception: {exc}')
             
-            # Sort by utilization and take the best result
+            # Sort by utilization and take the best result; ties go to the earlier truck,
+            # so the choice does not depend on which worker finished first
             if batch_results:
-                best_result = max(batch_results, key=lambda x: x['utilization'])
+                best_result = max(batch_results, key=lambda x: (x[1]['utilization'], -x[0]))[1]
+                truncated = truncated or best_result['calculation_metadata']['truncated']
                 results.append(best_result)
-                # Update remaining items
-                fitted_names = [fit['name'] for fit in best_result['fitted_items']]
-                remaining_items = [item for item in remaining_items if item.name not in fitted_names]
+                # Update remaining quantities
+                _consume_packed_cartons(inventory, best_result)
     
-    return results
+    return results, truncated
+
+# Carton group table shipped once to each packing worker process
+_worker_groups: List[CartonGroup] = []
+
+def _init_packing_worker(group_table):
+    """Process pool initializer: rebuild the carton groups from their compact tuple form"""
+    global _worker_groups
+    _worker_groups = [CartonGroup(*row) for row in group_table]
+
+def _truck_bin_spec(truck_bin) -> Tuple:
+    """Picklable (name, width, height, depth, max_weight) of a not yet packed truck bin"""
+    return (truck_bin.name, truck_bin.width, truck_bin.height, truck_bin.depth, truck_bin.max_weight)
+
+def _pack_truck_in_worker(truck_spec, inventory, engine=DEFAULT_PACKING_ENGINE, deadline=None,
+                          geometry=DEFAULT_GEOMETRY):
+    """Pack one truck inside a worker process and return its placements instead of py3dbp objects"""
+    truck_bin = Bin(*truck_spec)
+    truck_bin.geometry = geometry
+    packer, admission = _admit_cartons(truck_bin, _worker_groups, inventory, engine, deadline)
+    packer.pack()
+    admission['truncated'] = getattr(packer, 'truncated', False)
+    _restore_cm_geometry(truck_bin)
+    
+    placements = [
+        (item.carton_group_key, item.carton_serial, item.position, item.rotation_type,
+         item.width, item.height, item.depth, item.weight)
+        for item in truck_bin.items
+    ]
+    unfitted = [(item.carton_group_key, item.carton_serial) for item in truck_bin.unfitted_items]
+    # py3dbp normalizes the bin dimensions while packing; hand them back so the parent matches
+    bin_dimensions = (truck_bin.width, truck_bin.height, truck_bin.depth, truck_bin.max_weight)
+    return bin_dimensions, placements, unfitted, admission
 
-def _pack_single_truck(truck_bin, items_to_pack):
-    """Pack items into a single truck bin with enhanced accuracy validation"""
-    packer = Packer()
+def _summarize_worker_packing(truck_bin, groups, worker_result):
+    """Rebuild a truck bin's items from worker placements and summarize it like a local pack"""
+    bin_dimensions, placements, unfitted, admission = worker_result
+    groups_by_key = {group.key: group for group in groups}
+    
+    truck_bin.width, truck_bin.height, truck_bin.depth, truck_bin.max_weight = bin_dimensions
+    truck_bin.items = []
+    for key, serial, position, rotation_type, width, height, depth, weight in placements:
+        item = groups_by_key[key].make_item(serial)
+        item.width, item.height, item.depth, item.weight = width, height, depth, weight
+        item.position = position
+        item.rotation_type = rotation_type
+        truck_bin.items.append(item)
+    truck_bin.unfitted_items = [groups_by_key[key].make_item(serial) for key, serial in unfitted]
+    
+    return _summarize_truck_packing(truck_bin, admission)
+
+def _validate_carton_group(group, truck_bin):
+    """Check physical fit, volume and weight limits of one carton type against a truck bin"""
+    integer_geometry = getattr(truck_bin, 'geometry', DEFAULT_GEOMETRY) == 'int_mm'
+    # The capacity matrix is computed from catalogue centimetres
+    cached = None if integer_geometry else _capacity_matrix_entry(group, truck_bin)
+    if cached is not None:
+        return cached
+    unit_scale = MM_PER_CM if integer_geometry else 1
+
+    # Calculate realistic constraints
+    truck_volume = truck_bin.width * truck_bin.height * truck_bin.depth
+    truck_max_weight = truck_bin.max_weight
+    # Carton length/width/height map onto the py3dbp Item's width/height/depth
+    item = group.make_item(0)
+    
+    # Physical dimension check with rotation possibilities
+    can_fit_physically = False
+    item_volume = item.width * item.height * item.depth
+    
+    # ENHANCED DIMENSIONAL VALIDATION: Check all possible rotations with better logic
+    rotations = []
+    
+    # Only add unique rotations to avoid redundant checks
+    unique_dims = set()
+    potential_rotations = [
+        (item.width, item.height, item.depth),
+        (item.width, item.depth, item.height),
+        (item.height, item.width, item.depth),
+        (item.height, item.depth, item.width),
+        (item.depth, item.width, item.height),
+        (item.depth, item.height, item.width)
+    ]
+    
+    for rotation in potential_rotations:
+        if rotation not in unique_dims:
+            unique_dims.add(rotation)
+            rotations.append(rotation)
+    
+    # ENHANCED VALIDATION: Check each rotation with detailed logging
+    valid_rotations = []
+    for w, h, d in rotations:
+        # Validate dimensions are positive and reasonable
+        if w <= 0 or h <= 0 or d <= 0:
+            logging.warning(f"DIMENSION ERROR: Invalid carton dimensions for {group.name}: {w}x{h}x{d}")
+            continue
+        
+        # Check if dimensions are unreasonably large (> 10 meters in any direction)
+        if max(w, h, d) > 1000 * unit_scale:
+            logging.warning(f"DIMENSION WARNING: Very large carton {group.name}: {w}x{h}x{d} "
+                            f"{'mm' if integer_geometry else 'cm'}")
+        
+        # Check fit with tolerance for measurement precision (integer millimetres are exact)
+        tolerance = 0 if integer_geometry else 0.1  # 1mm tolerance for measurement precision
+        # Convert truck bin dimensions to float to handle Decimal type
+        truck_width = float(truck_bin.width or 0)
+        truck_height = float(truck_bin.height or 0)
+        truck_depth = float(truck_bin.depth or 0)
+
+        if (w <= truck_width + tolerance and 
+            h <= truck_height + tolerance and 
+            d <= truck_depth + tolerance):
+            valid_rotations.append((w, h, d))
+            can_fit_physically = True
+            logging.debug(f"DIMENSION OK: {group.name} fits as {w}x{h}x{d} in truck {truck_bin.name}")
+    
+    # If no valid rotations found, log detailed reason
+    if not can_fit_physically:
+        # Convert truck bin dimensions to float to handle Decimal type
+        min_truck_dims = [float(truck_bin.width), float(truck_bin.height), float(truck_bin.depth)]
+        max_item_dims = [item.width, item.height, item.depth]
+        min_truck_dims.sort()
+        max_item_dims.sort()
+        
+        logging.warning(f"DIMENSION ANALYSIS: {group.name} cannot fit in {truck_bin.name}")
+        logging.warning(f"  Item dimensions (sorted): {max_item_dims}")
+        logging.warning(f"  Truck dimensions (sorted): {min_truck_dims}")
+        
+        # Check which dimension is problematic
+        for i in range(3):
+            if max_item_dims[i] > min_truck_dims[i]:
+                logging.warning(f"  Problematic dimension {i+1}: item={max_item_dims[i]} > truck={min_truck_dims[i]}")
+                break
+    
+    # ENHANCED VOLUME CALCULATION with validation
+    if item_volume <= 0:
+        logging.error(f"VOLUME ERROR: Invalid item volume for {group.name}: {item_volume}")
+        max_by_volume = 0
+    elif truck_volume <= 0:
+        logging.error(f"VOLUME ERROR: Invalid truck volume for {truck_bin.name}: {truck_volume}")
+        max_by_volume = 0
+    else:
+        max_by_volume = int(truck_volume // item_volume)
+        
+        # Validate reasonable volume ratio
+        volume_ratio = item_volume / truck_volume
+        if volume_ratio > 0.5:
+            logging.info(f"VOLUME ANALYSIS: Large item {group.name} takes {volume_ratio:.1%} of truck volume")
+        elif volume_ratio < 0.001:
+            logging.info(f"VOLUME ANALYSIS: Very small item {group.name} - {max_by_volume} theoretical max")
+    
+    # ENHANCED WEIGHT CALCULATION with validation
+    if item.weight <= 0:
+        logging.warning(f"WEIGHT WARNING: Zero/negative weight for {group.name}, assuming 1kg")
+        item_weight = 1.0
+        max_by_weight = int(truck_max_weight // item_weight) if truck_max_weight > 0 else float('inf')
+    elif truck_max_weight <= 0:
+        logging.warning(f"WEIGHT WARNING: No weight limit for truck {truck_bin.name}")
+        max_by_weight = float('inf')
+    else:
+        item_weight = item.weight
+        max_by_weight = int(truck_max_weight // item_weight)
+        
+        # Validate weight distribution
+        weight_ratio = item_weight / truck_max_weight
+        if weight_ratio > 0.5:
+            logging.info(f"WEIGHT ANALYSIS: Heavy item {group.name} - {weight_ratio:.1%} of truck capacity")
+    
+    # ENHANCED PACKING EFFICIENCY CALCULATION
+    # Different efficiency rates based on item size and complexity
+    if max_by_volume <= 5:
+        # Large items - higher efficiency possible
+        packing_efficiency = 0.85
+    elif max_by_volume <= 20:
+        # Medium items - standard efficiency
+        packing_efficiency = 0.70
+    else:
+        # Many small items - lower efficiency due to gaps
+        packing_efficiency = 0.60
+    
+    realistic_max_by_volume = int(max_by_volume * packing_efficiency)
+    
+    # ENHANCED FINAL CALCULATION with safety checks
+    if max_by_weight == float('inf'):
+        realistic_max = realistic_max_by_volume
+        limiting_factor = 'volume'
+    else:
+        realistic_max = min(realistic_max_by_volume, max_by_weight)
+        limiting_factor = 'volume' if realistic_max_by_volume < max_by_weight else 'weight'
+    
+    # Additional safety constraints
+    if realistic_max > 1000:
+        logging.warning(f"CONSTRAINT WARNING: Very high capacity {realistic_max} for {group.name} - applying safety limit")
+        realistic_max = min(realistic_max, 1000)  # Safety limit
+    
+    # Log calculation details for transparency
+    logging.debug(f"CALCULATION SUMMARY for {group.name}:")
+    logging.debug(f"  Max by volume: {max_by_volume} (efficiency: {packing_efficiency:.0%})")
+    logging.debug(f"  Max by weight: {max_by_weight}")
+    logging.debug(f"  Realistic max: {realistic_max} (limited by {limiting_factor})")
+    
+    return {
+        'can_fit_physically': can_fit_physically,
+        'max_by_volume': max_by_volume,
+        'max_by_weight': max_by_weight,
+        'realistic_max': max(1, realistic_max) if can_fit_physically else 0,
+        'item_volume': item_volume,
+        'current_count': 0
+    }
+
+def _shared_group_validation(group, truck_bin):
+    """Group validation, computed once per truck type when the bin carries a shared validation_cache"""
+    table = getattr(truck_bin, 'validation_cache', None)
+    if table is None:
+        return _validate_carton_group(group, truck_bin)
+    if group.key not in table:
+        table[group.key] = _validate_carton_group(group, truck_bin)
+    # Admission records its count in the dict, so every truck gets its own copy
+    return dict(table[group.key])
+
+def _capacity_matrix_entry(group, truck_bin):
+    """Precomputed validation for DB truck/carton types, or None to compute it directly"""
+    if not CAPACITY_MATRIX_AVAILABLE or group.carton_type_id is None:
+        return None
+    truck_type = getattr(truck_bin, 'truck_type', None)
+    if truck_type is None:
+        return None
+    matrix = get_capacity_matrix(build=False)
+    if matrix is None:
+        return None
+    carton_sig = (float(group.length or 0), float(group.width or 0), float(group.height or 0), float(group.weight or 0))
+    return matrix.validation_entry(getattr(truck_type, 'id', None), truck_signature(truck_type),
+                                   group.carton_type_id, carton_sig)
+
+def _pack_single_truck(truck_bin, groups, inventory, engine=DEFAULT_PACKING_ENGINE, deadline=None):
+    """Pack the remaining quantities of each carton group into a single truck bin with enhanced accuracy validation"""
+    packer, admission = _admit_cartons(truck_bin, groups, inventory, engine, deadline)
+    packer.pack()
+    admission['truncated'] = getattr(packer, 'truncated', False)
+    _restore_cm_geometry(truck_bin)
+    return _summarize_truck_packing(truck_bin, admission)
+
+def _admit_cartons(truck_bin, groups, inventory, engine=DEFAULT_PACKING_ENGINE, deadline=None):
+    """Validate each carton group against the truck and add the admitted units to a fresh engine Packer"""
+    packer = PACKING_ENGINES[engine]()
+    if hasattr(packer, 'deadline'):
+        # py3dbp has no time bound; the native engines stop placing cartons at the deadline
+        packer.deadline = deadline
     packer.add_bin(truck_bin)
     
     # CRITICAL FIX: Enhanced pre-validation with realistic constraints
@@ -364,203 +1017,105 @@ def _pack_single_truck(truck_bin, items_to_pack):
     oversized_items = []
     rejected_by_constraints = []
     
-    # Calculate realistic constraints
-    truck_volume = truck_bin.width * truck_bin.height * truck_bin.depth
-    truck_max_weight = truck_bin.max_weight
-    
-    # Pre-validation: Check physical constraints for each item type
+    # Pre-validation: Check physical constraints once per item type, not once per unit
     item_type_validation = {}
-    for item in items_to_pack:
-        item_key = f"{item.name.split('_')[0]}"  # Get base name without index
+    total_items_input = 0
+    for group in groups:
+        count = inventory.count(group.key)
+        if count <= 0:
+            continue
+        total_items_input += count
         
-        if item_key not in item_type_validation:
-            # Physical dimension check with rotation possibilities
-            can_fit_physically = False
-            item_volume = item.width * item.height * item.depth
-            
-            # ENHANCED DIMENSIONAL VALIDATION: Check all possible rotations with better logic
-            rotations = []
-            
-            # Only add unique rotations to avoid redundant checks
-            unique_dims = set()
-            potential_rotations = [
-                (item.width, item.height, item.depth),
-                (item.width, item.depth, item.height),
-                (item.height, item.width, item.depth),
-                (item.height, item.depth, item.width),
-                (item.depth, item.width, item.height),
-                (item.depth, item.height, item.width)
-            ]
-            
-            for rotation in potential_rotations:
-                if rotation not in unique_dims:
-                    unique_dims.add(rotation)
-                    rotations.append(rotation)
-            
-            # ENHANCED VALIDATION: Check each rotation with detailed logging
-            valid_rotations = []
-            for w, h, d in rotations:
-                # Validate dimensions are positive and reasonable
-                if w <= 0 or h <= 0 or d <= 0:
-                    logging.warning(f"DIMENSION ERROR: Invalid carton dimensions for {item.name}: {w}x{h}x{d}")
-                    continue
-                
-                # Check if dimensions are unreasonably large (> 10 meters in any direction)
-                if w > 1000 or h > 1000 or d > 1000:
-                    logging.warning(f"DIMENSION WARNING: Very large carton {item.name}: {w}x{h}x{d} cm")
-                
-                # Check fit with tolerance for measurement precision
-                tolerance = 0.1  # 1mm tolerance for measurement precision
-                # Convert truck bin dimensions to float to handle Decimal type
-                truck_width = float(truck_bin.width or 0)
-                truck_height = float(truck_bin.height or 0)
-                truck_depth = float(truck_bin.depth or 0)
-
-                if (w <= truck_width + tolerance and 
-                    h <= truck_height + tolerance and 
-                    d <= truck_depth + tolerance):
-                    valid_rotations.append((w, h, d))
-                    can_fit_physically = True
-                    logging.debug(f"DIMENSION OK: {item.name} fits as {w}x{h}x{d} in truck {truck_bin.name}")
-            
-            # If no valid rotations found, log detailed reason
-            if not can_fit_physically:
-                # Convert truck bin dimensions to float to handle Decimal type
-                min_truck_dims = [float(truck_bin.width), float(truck_bin.height), float(truck_bin.depth)]
-                max_item_dims = [item.width, item.height, item.depth]
-                min_truck_dims.sort()
-                max_item_dims.sort()
-                
-                logging.warning(f"DIMENSION ANALYSIS: {item.name} cannot fit in {truck_bin.name}")
-                logging.warning(f"  Item dimensions (sorted): {max_item_dims}")
-                logging.warning(f"  Truck dimensions (sorted): {min_truck_dims}")
-                
-                # Check which dimension is problematic
-                for i in range(3):
-                    if max_item_dims[i] > min_truck_dims[i]:
-                        logging.warning(f"  Problematic dimension {i+1}: item={max_item_dims[i]} > truck={min_truck_dims[i]}")
-                        break
-            
-            # ENHANCED VOLUME CALCULATION with validation
-            if item_volume <= 0:
-                logging.error(f"VOLUME ERROR: Invalid item volume for {item.name}: {item_volume}")
-                max_by_volume = 0
-            elif truck_volume <= 0:
-                logging.error(f"VOLUME ERROR: Invalid truck volume for {truck_bin.name}: {truck_volume}")
-                max_by_volume = 0
-            else:
-                max_by_volume = int(truck_volume // item_volume)
-                
-                # Validate reasonable volume ratio
-                volume_ratio = item_volume / truck_volume
-                if volume_ratio > 0.5:
-                    logging.info(f"VOLUME ANALYSIS: Large item {item.name} takes {volume_ratio:.1%} of truck volume")
-                elif volume_ratio < 0.001:
-                    logging.info(f"VOLUME ANALYSIS: Very small item {item.name} - {max_by_volume} theoretical max")
-            
-            # ENHANCED WEIGHT CALCULATION with validation
-            if item.weight <= 0:
-                logging.warning(f"WEIGHT WARNING: Zero/negative weight for {item.name}, assuming 1kg")
-                item_weight = 1.0
-                max_by_weight = int(truck_max_weight // item_weight) if truck_max_weight > 0 else float('inf')
-            elif truck_max_weight <= 0:
-                logging.warning(f"WEIGHT WARNING: No weight limit for truck {truck_bin.name}")
-                max_by_weight = float('inf')
-            else:
-                item_weight = item.weight
-                max_by_weight = int(truck_max_weight // item_weight)
-                
-                # Validate weight distribution
-                weight_ratio = item_weight / truck_max_weight
-                if weight_ratio > 0.5:
-                    logging.info(f"WEIGHT ANALYSIS: Heavy item {item.name} - {weight_ratio:.1%} of truck capacity")
-            
-            # ENHANCED PACKING EFFICIENCY CALCULATION
-            # Different efficiency rates based on item size and complexity
-            if max_by_volume <= 5:
-                # Large items - higher efficiency possible
-                packing_efficiency = 0.85
-            elif max_by_volume <= 20:
-                # Medium items - standard efficiency
-                packing_efficiency = 0.70
-            else:
-                # Many small items - lower efficiency due to gaps
-                packing_efficiency = 0.60
-            
-            realistic_max_by_volume = int(max_by_volume * packing_efficiency)
-            
-            # ENHANCED FINAL CALCULATION with safety checks
-            if max_by_weight == float('inf'):
-                realistic_max = realistic_max_by_volume
-                limiting_factor = 'volume'
-            else:
-                realistic_max = min(realistic_max_by_volume, max_by_weight)
-                limiting_factor = 'volume' if realistic_max_by_volume < max_by_weight else 'weight'
-            
-            # Additional safety constraints
-            if realistic_max > 1000:
-                logging.warning(f"CONSTRAINT WARNING: Very high capacity {realistic_max} for {item.name} - applying safety limit")
-                realistic_max = min(realistic_max, 1000)  # Safety limit
-            
-            # Log calculation details for transparency
-            logging.debug(f"CALCULATION SUMMARY for {item.name}:")
-            logging.debug(f"  Max by volume: {max_by_volume} (efficiency: {packing_efficiency:.0%})")
-            logging.debug(f"  Max by weight: {max_by_weight}")
-            logging.debug(f"  Realistic max: {realistic_max} (limited by {limiting_factor})")
-            
-            item_type_validation[item_key] = {
-                'can_fit_physically': can_fit_physically,
-                'max_by_volume': max_by_volume,
-                'max_by_weight': max_by_weight,
-                'realistic_max': max(1, realistic_max) if can_fit_physically else 0,
-                'item_volume': item_volume,
-                'current_count': 0
-            }
-    
-    # Apply validation constraints
-    for item in items_to_pack:
-        item_key = f"{item.name.split('_')[0]}"
-        validation = item_type_validation[item_key]
+        validation = _shared_group_validation(group, truck_bin)
+        item_type_validation[group.name] = validation
         
         # Check if item type can fit at all
         if not validation['can_fit_physically']:
             oversized_items.append({
-                'name': item.name,
-                'dimensions': [item.width, item.height, item.depth],
+                'name': group.name,
+                'quantity': count,
+                'dimensions': [group.length, group.width, group.height],
                 'truck_dimensions': [truck_bin.width, truck_bin.height, truck_bin.depth],
                 'reason': 'Item dimensions exceed truck capacity in all rotations'
             })
-            logging.warning(f"DIMENSION VALIDATION: Item {item.name} cannot fit in {truck_bin.name}")
+            logging.warning(f"DIMENSION VALIDATION: {count} x {group.name} cannot fit in {truck_bin.name}")
             continue
         
         # Check realistic quantity constraints
-        if validation['current_count'] >= validation['realistic_max']:
+        limit = validation['realistic_max']
+        admitted = min(count, limit)
+        if admitted < count:
             rejected_by_constraints.append({
-                'name': item.name,
-                'reason': f"Realistic limit reached: {validation['realistic_max']} items of this type",
+                'name': group.name,
+                'quantity': count - admitted,
+                'reason': f"Realistic limit reached: {limit} items of this type",
                 'max_by_volume': validation['max_by_volume'],
                 'max_by_weight': validation['max_by_weight'],
                 'realistic_max': validation['realistic_max']
             })
-            logging.info(f"QUANTITY VALIDATION: Item {item.name} rejected - realistic limit reached")
-            continue
+            logging.info(f"QUANTITY VALIDATION: {count - admitted} x {group.name} rejected - realistic limit reached")
         
-        # Item passes all validations
-        packer.add_item(item)
-        valid_items.append(item)
-        validation['current_count'] += 1
+        # Only the admitted units become py3dbp Items
+        for serial in inventory.serials(group.key, admitted):
+            item = group.make_item(serial)
+            packer.add_item(item)
+            valid_items.append(item)
+        validation['current_count'] = admitted
     
-    packer.pack()
+    admission = {
+        'total_items_input': total_items_input,
+        'valid_items_count': len(valid_items),
+        'oversized_items': oversized_items,
+        'rejected_by_constraints': rejected_by_constraints,
+        'item_type_validation': item_type_validation,
+        'packing_engine': engine,
+        'packing_mode': 'block' if engine == 'block' else 'generic'
+    }
+    return packer, admission
+
+def _truck_trip_cost(truck_type, distance_km=100):
+    """Trip cost of one truck over distance_km, or None if the truck type has no cost data"""
+    if not truck_type:
+        return None
+    has_cost_data = (
+        (getattr(truck_type, 'cost_per_km', 0) or 0) > 0 or
+        (getattr(truck_type, 'fuel_efficiency', 0) or 0) > 0 or  
+        (getattr(truck_type, 'driver_cost_per_day', 0) or 0) > 0 or
+        (getattr(truck_type, 'maintenance_cost_per_km', 0) or 0) > 0
+    )
+    if not has_cost_data:
+        return None
+    
+    # distance_km defaults to 100 - should be user input
+    fuel_eff = getattr(truck_type, 'fuel_efficiency', 0) or 0
+    maint_cost = getattr(truck_type, 'maintenance_cost_per_km', 0) or 0
+    driver_cost_val = getattr(truck_type, 'driver_cost_per_day', 0) or 0
+    cost_per_km = getattr(truck_type, 'cost_per_km', 0) or 0
+    
+    fuel_cost = (distance_km / fuel_eff) * 100 if fuel_eff > 0 else 0
+    maintenance_cost = distance_km * maint_cost
+    driver_cost = driver_cost_val
+    return fuel_cost + maintenance_cost + driver_cost + (cost_per_km * distance_km)
+
+def _summarize_truck_packing(truck_bin, admission):
+    """Build the result dict (placements, utilization, validation and cost) for a packed truck bin"""
+    total_items_input = admission['total_items_input']
+    valid_items_count = admission['valid_items_count']
+    oversized_items = admission['oversized_items']
+    rejected_by_constraints = admission['rejected_by_constraints']
+    item_type_validation = admission['item_type_validation']
     
     # Process results with enhanced validation
     packed_items_details = []
     actual_volume_used = 0
     actual_weight_used = 0
+    packed_serials = {}
     
     for item in truck_bin.items:
         item_volume = item.width * item.height * item.depth
         actual_volume_used += item_volume
         actual_weight_used += item.weight
+        packed_serials.setdefault(item.carton_group_key, []).append(item.carton_serial)
         
         packed_items_details.append({
             'name': item.name,
@@ -571,7 +1126,7 @@ def _pack_single_truck(truck_bin, items_to_pack):
             'depth': float(item.depth),
             'volume': float(item_volume),
             'weight': float(item.weight),
-            'color': '#%06x' % (hash(item.name) & 0xFFFFFF),
+            'color': _item_color(item.name),
         })
     
     # AGENT 1 FIX: Enhanced calculation with validation checks
@@ -611,9 +1166,11 @@ def _pack_single_truck(truck_bin, items_to_pack):
         # Check if item position + dimensions exceed truck bounds
         if hasattr(item, 'position') and item.position:
             # Ensure all dimensions are converted to float to prevent Decimal mixing
-            end_x = float(item.position[0]) + float(item.width)
-            end_y = float(item.position[1]) + float(item.height)  
-            end_z = float(item.position[2]) + float(item.depth)
+            # Use the placed (rotated) extents, not the catalogue dimensions
+            placed_w, placed_h, placed_d = item.get_dimension()
+            end_x = float(item.position[0]) + float(placed_w)
+            end_y = float(item.position[1]) + float(placed_h)
+            end_z = float(item.position[2]) + float(placed_d)
             
             tolerance = 0.1  # 1mm tolerance
             # Convert all dimensions to float explicitly
@@ -670,10 +1227,10 @@ def _pack_single_truck(truck_bin, items_to_pack):
     
     # ENHANCED CALCULATION TRANSPARENCY
     calculation_metadata = {
-        'total_items_input': len(items_to_pack),
-        'valid_items_for_packing': len(valid_items),
-        'oversized_items_rejected': len(oversized_items),
-        'constraint_rejected_items': len(rejected_by_constraints),
+        'total_items_input': total_items_input,
+        'valid_items_for_packing': valid_items_count,
+        'oversized_items_rejected': sum(entry['quantity'] for entry in oversized_items),
+        'constraint_rejected_items': sum(entry['quantity'] for entry in rejected_by_constraints),
         'items_successfully_packed': len(truck_bin.items),
         'items_failed_to_pack': len(truck_bin.unfitted_items),
         'truck_total_volume_cm3': total_truck_volume,
@@ -682,7 +1239,8 @@ def _pack_single_truck(truck_bin, items_to_pack):
         'truck_max_weight_kg': truck_bin.max_weight,
         'actual_weight_used_kg': actual_weight_used,
         'weight_utilization_percentage': round(weight_utilization * 100, 2),
-        'packing_efficiency': round((len(truck_bin.items) / len(valid_items)) * 100, 2) if valid_items else 0,
+        'packing_efficiency': round((len(truck_bin.items) / valid_items_count) * 100, 2) if valid_items_count else 0,
+        'truncated': admission.get('truncated', False),
         'validation_passed': validation_passed,
         'validation_errors': validation_errors,
         'validation_warnings': validation_warnings,
@@ -691,37 +1249,20 @@ def _pack_single_truck(truck_bin, items_to_pack):
         'constraint_rejected_items': rejected_by_constraints,
         'item_type_validations': item_type_validation,
         'calculation_method': 'Enhanced 3D packing with adaptive efficiency factor',
+        'packing_engine': admission['packing_engine'],
+        'packing_mode': admission.get('packing_mode', 'generic'),
         'validation_status': 'PASSED' if validation_passed else 'FAILED',
         'theoretical_utilization': theoretical_utilization,
-        'bounding_box_efficiency': bounding_box_efficiency if len(truck_bin.items) > 0 else 0
+        'bounding_box_efficiency': bounding_box_efficiency if len(truck_bin.items) > 0 else 0,
+        'packed_quantities': {key: len(serials) for key, serials in packed_serials.items()}
     }
     
     unfitted_items_details = [{'name': item.name} for item in truck_bin.unfitted_items]
     
     # Realistic Cost Calculation - only show if cost data available
-    truck_type = getattr(truck_bin, 'truck_type', None)
-    has_cost_data = False
-    
-    if truck_type:
-        has_cost_data = (
-            (getattr(truck_type, 'cost_per_km', 0) or 0) > 0 or
-            (getattr(truck_type, 'fuel_efficiency', 0) or 0) > 0 or  
-            (getattr(truck_type, 'driver_cost_per_day', 0) or 0) > 0 or
-            (getattr(truck_type, 'maintenance_cost_per_km', 0) or 0) > 0
-        )
+    truck_cost = _truck_trip_cost(getattr(truck_bin, 'truck_type', None))
     
-    if has_cost_data and truck_type:
-        # Only calculate if we have actual cost data
-        distance_km = 100  # Default distance - should be user input
-        fuel_eff = getattr(truck_type, 'fuel_efficiency', 0) or 0
-        maint_cost = getattr(truck_type, 'maintenance_cost_per_km', 0) or 0
-        driver_cost_val = getattr(truck_type, 'driver_cost_per_day', 0) or 0
-        cost_per_km = getattr(truck_type, 'cost_per_km', 0) or 0
-        
-        fuel_cost = (distance_km / fuel_eff) * 100 if fuel_eff > 0 else 0
-        maintenance_cost = distance_km * maint_cost
-        driver_cost = driver_cost_val
-        truck_cost = fuel_cost + maintenance_cost + driver_cost + (cost_per_km * distance_km)
+    if truck_cost is not None:
         total_carton_value = sum(getattr(item, 'value', 0) or 0 for item in truck_bin.items)
         total_cost = truck_cost + total_carton_value
     else:
@@ -739,7 +1280,8 @@ def _pack_single_truck(truck_bin, items_to_pack):
         'total_cost': float(total_cost),
         'truck_cost': float(truck_cost),
         'carton_value': float(total_carton_value),
-        'calculation_metadata': calculation_metadata  # Include calculation transparency
+        'calculation_metadata': calculation_metadata,  # Include calculation transparency
+        'packed_serials': packed_serials  # Internal, removed by _consume_packed_cartons
     }
 
 # Keep the original function for backward compatibility
@@ -817,7 +1359,7 @@ def pack_cartons(truck_types_with_quantities, carton_types_with_quantities, opti
                 'width': float(item.width),
                 'height': float(item.height),
                 'depth': float(item.depth),
-                'color': '#%06x' % (hash(item.name) & 0xFFFFFF),
+                'color': _item_color(item.name),
             })
         
         # Calculate space utilization (volume-based)
@@ -881,35 +1423,92 @@ def _calculate_cargo_metrics(carton_hash):
     """Cache cargo metrics calculation"""
     return carton_hash
 
+def _martello_l2(sizes, capacity):
+    """Martello-Toth L2 lower bound on the number of 1D bins for (size, count) pairs"""
+    if capacity <= 0 or not sizes:
+        return 0
+    total = sum(size * count for size, count in sizes)
+    best = math.ceil(total / capacity - 1e-9)
+    half = capacity / 2
+    for alpha in {0} | {size for size, _ in sizes if size <= half}:
+        large = sum(count for size, count in sizes if size > capacity - alpha)
+        medium_count = sum(count for size, count in sizes if half < size <= capacity - alpha)
+        medium_size = sum(size * count for size, count in sizes if half < size <= capacity - alpha)
+        small_size = sum(size * count for size, count in sizes if alpha <= size <= half)
+        # Small items first use the space left over next to the medium ones
+        overflow = small_size - (medium_count * capacity - medium_size)
+        best = max(best, large + medium_count + max(0, math.ceil(overflow / capacity - 1e-9)))
+    return best
+
+def _truck_count_lower_bound(truck, carton_types_with_quantities):
+    """
+    Fewest trucks of one type that could possibly hold the whole load, or None
+    if some carton fits the truck in no orientation.
+
+    Combines the volume and weight bounds with rotation-safe L1/L2 bounds: a
+    carton whose every fitting orientation is wider than half the truck on both
+    cross axes cannot sit beside another such carton, so those cartons form a
+    1D bin-packing instance along the remaining axis.
+    """
+    truck_dims = (float(truck.length), float(truck.width), float(truck.height))
+    truck_volume = truck_dims[0] * truck_dims[1] * truck_dims[2]
+    if truck_volume <= 0:
+        return None
+    tolerance = 0.1  # same fit tolerance as the per-truck validation
+    
+    total_volume = 0.0
+    total_weight = 0.0
+    lengthwise = {0: [], 1: [], 2: []}  # axis -> [(min extent along axis, quantity)]
+    for carton, quantity in carton_types_with_quantities.items():
+        if not quantity or quantity <= 0:
+            continue
+        dims = (float(carton.length), float(carton.width), float(carton.height))
+        fitting = [rotation for rotation in set(itertools.permutations(dims))
+                   if all(rotation[axis] <= truck_dims[axis] + tolerance for axis in range(3))]
+        if not fitting:
+            return None
+        total_volume += dims[0] * dims[1] * dims[2] * quantity
+        total_weight += (carton.weight or 0) * quantity
+        
+        for axis in range(3):
+            cross = [other for other in range(3) if other != axis]
+            if all(rotation[other] > truck_dims[other] / 2 for rotation in fitting for other in cross):
+                lengthwise[axis].append((min(rotation[axis] for rotation in fitting), quantity))
+    
+    bound = math.ceil(total_volume / truck_volume - 1e-9)
+    if truck.max_weight:
+        bound = max(bound, math.ceil(total_weight / truck.max_weight - 1e-9))
+    for axis, sizes in lengthwise.items():
+        bound = max(bound, _martello_l2(sizes, truck_dims[axis]))
+    return max(1, bound)
+
 def calculate_optimal_truck_combination(carton_types_with_quantities, available_truck_types, max_trucks=10, optimization_strategy='space_utilization'):
     """
     Enhanced truck combination recommendation with max space utilization priority
     - Prioritizes smallest truck first for maximum space utilization
     - Supports multiple optimization strategies: 'space_utilization', 'cost_saving', 'balanced'
-    - Optimized for faster performance with early termination
+    - Every truck type is tried with 1 to max_trucks trucks; volume, weight and L1/L2
+      lower bounds skip the counts that cannot hold the load, and larger counts are
+      not tried once one packs everything or leaves a truck empty
+    - Trucks that can take only part of the order (a carton fits in no orientation,
+      or more than max_trucks would be needed) are kept with partial_fit set
     """
     best_combinations = []
     
-    # Quick pre-filter: Calculate total carton volume and weight
-    total_volume = sum(
-        (carton.length * carton.width * carton.height) * qty 
-        for carton, qty in carton_types_with_quantities.items()
-    )
-    total_weight = sum(
-        (carton.weight if carton.weight else 5) * qty 
-        for carton, qty in carton_types_with_quantities.items()
-    )
-    
-    # Pre-filter trucks that are obviously too small
+    # Lower bounds on the trucks of each type needed for the cartons that fit it at all
     viable_trucks = []
+    lower_bounds = {}
+    unfit_cartons = {}
     for truck in available_truck_types:
-        truck_volume = truck.length * truck.width * truck.height
-        truck_capacity = truck.max_weight if truck.max_weight else 10000
-        
-        # Skip trucks that are clearly too small (less than 20% of total requirements)
-        if truck_volume < total_volume * 0.2 and truck_capacity < total_weight * 0.2:
+        fitting = {carton: quantity for carton, quantity in carton_types_with_quantities.items()
+                   if quantity and quantity > 0 and _truck_count_lower_bound(truck, {carton: quantity}) is not None}
+        if not fitting:
             continue
+        unfit_cartons[truck] = [carton.name for carton, quantity in carton_types_with_quantities.items()
+                                if quantity and quantity > 0 and carton not in fitting]
+        lower_bounds[truck] = _truck_count_lower_bound(truck, fitting)
         viable_trucks.append(truck)
+    logging.info(f"Lower-bound pruning kept {len(viable_trucks)} of {len(available_truck_types)} truck types")
     
     # Sort trucks based on optimization strategy
     if optimization_strategy == 'space_utilization':
@@ -939,23 +1538,12 @@ def calculate_optimal_truck_combination(carton_types_with_quantities, available_
         sorted_trucks = sorted(viable_trucks, 
                               key=lambda t: (t.length * t.width * t.height, getattr(t, 'cost_per_km', 999999)))
     
-    # Limit testing to top 5 most promising trucks for speed
-    top_trucks = sorted_trucks[:5]
-    
-    # Try different truck combinations with smarter logic and early termination
-    for truck_type in top_trucks:
-        truck_volume = truck_type.length * truck_type.width * truck_type.height
-        truck_capacity = truck_type.max_weight if truck_type.max_weight else 10000
-        
-        # Estimate reasonable quantity range based on cargo size
-        min_trucks_needed = max(1, min(
-            int(total_volume / truck_volume) + 1,
-            int(total_weight / truck_capacity) + 1
-        ))
-        # Limit max trucks for performance
-        max_reasonable = min(3, min_trucks_needed + 1)  # Reduced from max_trucks
+    # Try each truck type from its lower bound upwards; fewer trucks cannot hold what fits it.
+    # A bound above max_trucks leaves only max_trucks, which packs part of the order.
+    for truck_type in sorted_trucks:
+        min_trucks_needed = lower_bounds[truck_type]
         
-        for quantity in range(1, max_reasonable + 1):
+        for quantity in range(min(min_trucks_needed, max_trucks), max_trucks + 1):
             truck_combo = {truck_type: quantity}
             
             # Test packing with this combination
@@ -994,6 +1582,9 @@ def calculate_optimal_truck_combination(carton_types_with_quantities, available_
                 'truck_type': truck_type.name,
                 'truck_dimensions': f"{truck_type.length}×{truck_type.width}×{truck_type.height}",
                 'quantity': trucks_actually_used,
+                'lower_bound_trucks': min_trucks_needed,
+                'partial_fit': packing_success < 0.99,
+                'unfit_cartons': unfit_cartons[truck_type],
                 'total_cost': total_cost,
                 'avg_utilization': total_utilization,
                 'packing_success_rate': packing_success,
@@ -1002,25 +1593,174 @@ def calculate_optimal_truck_combination(carton_types_with_quantities, available_
                 'cost_per_item': total_cost / total_fitted_items if total_fitted_items > 0 else float('inf')
             })
             
-            # Early termination: if we found a perfect solution, stop
-            if packing_success >= 0.99 and space_efficiency >= 0.8:
+            # More trucks of this type cannot help once everything is packed or a truck stays empty
+            if packing_success >= 0.99 or trucks_actually_used < quantity:
                 break
     
     # Sort by composite efficiency score (higher is better)
     best_combinations.sort(key=lambda x: x['efficiency_score'], reverse=True)
     
-    # Remove duplicates and ensure variety in recommendations (limit to top 3 for speed)
+    # Remove duplicates (extra trucks that stayed empty repeat a smaller combination)
     seen_trucks = set()
     diverse_combinations = []
     
-    for combo in best_combinations[:3]:  # Limit to top 3 for performance
+    for combo in best_combinations:
         truck_key = (combo['truck_type'], combo['quantity'])
-        if truck_key not in seen_trucks and len(diverse_combinations) < 5:
+        if truck_key not in seen_trucks:
             seen_trucks.add(truck_key)
             diverse_combinations.append(combo)
     
     return diverse_combinations
 
+FLEET_MIX_TIME_BUDGET = 10.0  # seconds
+
+def calculate_optimal_fleet_mix(carton_types_with_quantities, available_truck_types, objective='cost',
+                                max_trucks=10, time_budget_seconds=FLEET_MIX_TIME_BUDGET,
+                                engine=DEFAULT_PACKING_ENGINE):
+    """
+    Best mix of truck types for the whole load (e.g. one 32 ft + one Tata Ace)
+    - Depth-first branch-and-bound that adds trucks largest type first, so the
+      remainder left by big trucks can go to a smaller, cheaper one
+    - objective: 'cost' (trip cost, then fewest trucks) or 'trucks' (fewest trucks, then cost);
+      trucks without cost data count as free, ties go to the smaller total volume
+    - Each (truck type, remaining cartons) packing is computed once and reused
+    - Volume, weight and cost-per-volume lower bounds prune partial mixes; the search
+      stops after time_budget_seconds and returns the best mix so far with optimal=False
+    - Each packing gets what is left of the budget; a packing cut short by it sets
+      truncated (and optimal=False)
+    """
+    if objective not in ('cost', 'trucks'):
+        raise ValueError(f"Unknown fleet objective '{objective}', expected 'cost' or 'trucks'")
+    
+    start_time = time.time()
+    deadline = start_time + time_budget_seconds
+    groups = _build_carton_groups(carton_types_with_quantities, 'space')
+    trucks = sorted(
+        (t for t in available_truck_types if t.length * t.width * t.height > 0),
+        key=lambda t: t.length * t.width * t.height, reverse=True
+    )
+    
+    # Units that fit no truck in any orientation can never be packed
+    def fits_somewhere(group):
+        dims = sorted((group.length, group.width, group.height))
+        return any(all(d <= t + 0.1 for d, t in zip(dims, sorted((truck.length, truck.width, truck.height))))
+                   for truck in trucks)
+    packable = [group for group in groups if fits_somewhere(group)]
+    unpackable_items = sum(group.quantity for group in groups if group not in packable)
+    
+    volumes = [t.length * t.width * t.height for t in trucks]
+    weights = [t.max_weight if t.max_weight else float('inf') for t in trucks]
+    costs = [_truck_trip_cost(t) or 0 for t in trucks]
+    # Bounds for trucks at index >= i (children never go back to a larger type)
+    suffix_volume = [max(volumes[i:]) for i in range(len(trucks))]
+    suffix_weight = [max(weights[i:]) for i in range(len(trucks))]
+    suffix_cost_ratio = [min(c / v for c, v in zip(costs[i:], volumes[i:])) for i in range(len(trucks))]
+    
+    packings = {}
+    
+    def pack_truck(index, counts):
+        memo_key = (index, counts)
+        if memo_key not in packings:
+            subgroups = [replace(group, quantity=count) for group, count in zip(packable, counts) if count > 0]
+            result = _pack_single_truck(_create_truck_bin(trucks[index]), subgroups, RemainingInventory(subgroups),
+                                        engine, deadline)
+            result.pop('packed_serials')
+            if result['calculation_metadata']['truncated']:
+                stats['truncated'] = True
+            packed = result['calculation_metadata']['packed_quantities']
+            packings[memo_key] = (tuple(packed.get(group.key, 0) for group in packable), result)
+        return packings[memo_key]
+    
+    def solution_key(unpacked, cost, truck_count, volume):
+        if objective == 'cost':
+            return (unpacked, round(cost, 6), truck_count, volume)
+        return (unpacked, truck_count, round(cost, 6), volume)
+    
+    best = {'key': None, 'trucks': []}
+    visited = {}
+    stats = {'nodes': 0, 'timed_out': False, 'truncated': False}
+    
+    def search(start, counts, cost, volume, chosen):
+        stats['nodes'] += 1
+        unpacked = sum(counts)
+        key = solution_key(unpacked, cost, len(chosen), volume)
+        if best['key'] is None or key < best['key']:
+            best['key'], best['trucks'] = key, list(chosen)
+        if unpacked == 0 or len(chosen) >= max_trucks or start >= len(trucks):
+            return
+        if time.time() > deadline:
+            stats['timed_out'] = True
+            return
+        
+        remaining_volume = sum(group.volume * count for group, count in zip(packable, counts))
+        remaining_weight = sum(group.weight * count for group, count in zip(packable, counts))
+        trucks_needed = max(1, math.ceil(remaining_volume / suffix_volume[start] - 1e-9),
+                            math.ceil(remaining_weight / suffix_weight[start] - 1e-9))
+        bound = solution_key(0, cost + remaining_volume * suffix_cost_ratio[start],
+                             len(chosen) + trucks_needed, volume + remaining_volume)
+        if bound >= best['key']:
+            return
+        
+        # Same remainder reached before at no higher truck count, cost and volume
+        state = (start, counts)
+        previous = visited.get(state)
+        if previous and all(p <= c for p, c in zip(previous, (len(chosen), cost, volume))):
+            return
+        visited[state] = (len(chosen), cost, volume)
+        
+        for index in range(start, len(trucks)):
+            packed, result = pack_truck(index, counts)
+            if not any(packed):
+                continue
+            chosen.append((index, result))
+            search(index, tuple(c - p for c, p in zip(counts, packed)),
+                   cost + costs[index], volume + volumes[index], chosen)
+            chosen.pop()
+            if stats['timed_out']:
+                return
+    
+    if packable and trucks:
+        search(0, tuple(group.quantity for group in packable), 0, 0, [])
+    
+    mix = []
+    truck_mix = {}
+    for index, result in best['trucks']:
+        truck_type = trucks[index]
+        truck_mix[truck_type.name] = truck_mix.get(truck_type.name, 0) + 1
+        mix.append({
+            'truck_type': truck_type.name,
+            'truck_type_id': getattr(truck_type, 'id', None),
+            'truck_dimensions': f"{truck_type.length}×{truck_type.width}×{truck_type.height}",
+            'packed_items': len(result['fitted_items']),
+            'utilization': result['utilization'],
+            'weight_utilization': result['weight_utilization'],
+            'truck_cost': costs[index],
+            'truncated': result['calculation_metadata']['truncated']
+        })
+    
+    total_items = sum(group.quantity for group in groups)
+    packed_items = sum(entry['packed_items'] for entry in mix)
+    elapsed = time.time() - start_time
+    logging.info(f"Fleet mix search: {stats['nodes']} nodes, {len(packings)} packings in {elapsed:.2f}s")
+    
+    return {
+        'objective': objective,
+        'trucks': mix,
+        'truck_mix': truck_mix,
+        'truck_count': len(mix),
+        'total_cost': sum(entry['truck_cost'] for entry in mix),
+        'total_items': total_items,
+        'packed_items': packed_items,
+        'unpacked_items': total_items - packed_items,
+        'unpackable_items': unpackable_items,
+        'complete': packed_items == total_items,
+        'optimal': not stats['timed_out'] and not stats['truncated'],
+        'truncated': stats['truncated'],
+        'nodes_explored': stats['nodes'],
+        'packings_computed': len(packings),
+        'elapsed_seconds': round(elapsed, 3)
+    }
+
 class SpaceOptimizer:
     def __init__(self, truck=None, cartons=None):
         self.truck = truck
@@ -1071,6 +1811,10 @@ class SpaceOptimizer:
         )
         return max(0, total_truck_volume - total_packed_volume)
     
+    def add_cartons_to_load(self, load_state, carton_types_with_quantities):
+        """Top up an already packed truck; returns only the added placements (see pack_into_existing_load)"""
+        return pack_into_existing_load(load_state, carton_types_with_quantities)
+    
     def optimize_remaining_space(self, truck, packed_cartons, remaining_volume):
         """Generate recommendations for remaining space"""
         # Analyze remaining volume and suggest optimal carton sizes
@@ -1100,25 +1844,140 @@ class SpaceOptimizer:
         
         return remaining_space_suggestions[:5]  # Top 5 recommendations
 
-def estimate_packing_time(num_cartons, num_trucks):
+def pack_into_existing_load(load_state, carton_types_with_quantities, optimization_goal='space'):
     """
-    Estimate packing computation time based on dataset size
+    Add cartons to an already loaded truck without repacking it.
+
+    load_state is a saved LoadState dict (see extreme_point_engine), or a
+    truck's dimensions plus the 'placements' from a packing result. New cartons
+    go onto the saved extreme points, largest first. Only the delta is
+    returned: the added placements, the cartons that did not fit and the new
+    extreme points. Append 'added_state_placements' to the saved placements and
+    replace its extreme points to persist the topped-up load.
     """
-    base_time = 0.1  # seconds
-    complexity_factor = (num_cartons * num_trucks) / 1000
-    return base_time + (complexity_factor * 0.05)
+    state = LoadState.from_dict(load_state)
+    groups = _build_carton_groups(carton_types_with_quantities, optimization_goal)
+    
+    # Continue unit numbering after the units already on the truck
+    next_serial = {}
+    for placement in state.placements:
+        name, _, suffix = str(placement.get('name') or '').rpartition('_')
+        if suffix.isdigit():
+            next_serial[name] = max(next_serial.get(name, 0), int(suffix) + 1)
+    
+    items = []
+    for group in groups:
+        start = next_serial.get(group.name, 0)
+        items.extend(group.make_item(serial) for serial in range(start, start + group.quantity))
+    items.sort(key=lambda item: float(item.width) * float(item.height) * float(item.depth), reverse=True)
+    
+    placed_before = len(state.placements)
+    added_items = []
+    unfitted_items = []
+    for item in items:
+        if not state.place(item):
+            unfitted_items.append({'name': item.name})
+            continue
+        item_volume = float(item.width) * float(item.height) * float(item.depth)
+        added_items.append({
+            'name': item.name,
+            'position': item.position,
+            'rotation_type': item.rotation_type,
+            'width': float(item.width),
+            'height': float(item.height),
+            'depth': float(item.depth),
+            'volume': item_volume,
+            'weight': float(item.weight),
+            'color': _item_color(item.name),
+        })
+    
+    truck_volume = state.width * state.height * state.depth
+    return {
+        'added_items': added_items,
+        'unfitted_items': unfitted_items,
+        'added_state_placements': state.placements[placed_before:],
+        'extreme_points': state.extreme_points(),
+        'utilization': state.used_volume() / truck_volume if truck_volume > 0 else 0,
+        'weight_utilization': state.total_weight / state.max_weight if not math.isinf(state.max_weight) else 0,
+        'total_weight': state.total_weight,
+        'items_on_truck': len(state.placements)
+    }
+
+def estimate_packing_time(num_cartons, num_trucks, num_types=None, engine=DEFAULT_PACKING_ENGINE):
+    """
+    Estimate packing computation time in seconds from the telemetry-fitted cost model
+    (falls back to a rule of thumb when no telemetry store is available)
+    """
+    cost_model = get_packing_cost_model()
+    if cost_model is None:
+        return prior_estimate(num_cartons, num_trucks)
+    return cost_model.estimate(num_cartons, num_types or 1, num_trucks, engine)['seconds']
 
 # Enhanced multi-truck fleet optimization
-def optimize_fleet_distribution(carton_list, truck_fleet, optimization_goals=['cost', 'space']):
+def optimize_fleet_distribution(carton_list, truck_fleet, optimization_goals=['cost', 'space'],
+                                engine=DEFAULT_PACKING_ENGINE):
     """
     Advanced multi-objective fleet optimization
+
+    Carton groups, per-truck-type validation and the capacity matrix are prepared
+    once for all goals. Goals that fill cartons and trucks in the same order give
+    the same packing and share one run. The distinct runs are packed one after
+    another: the engines are pure Python, so threads would only add overhead.
     """
+    start_time = time.time()
     results = {}
+    goal_results = {}
     
+    cache = get_packing_cache()
+    cache_keys = {}
     for goal in optimization_goals:
-        start_time = time.time()
-        result = pack_cartons_optimized(truck_fleet, carton_list, goal, use_parallel=True)
-        processing_time = time.time() - start_time
+        if cache is not None:
+            cache_keys[goal] = packing_cache_key(truck_fleet, carton_list, goal, engine, PACKING_ALGORITHM_VERSION,
+                                                 execution='sequential')
+            cached_results = cache.get(cache_keys[goal])
+            if cached_results is not None:
+                goal_results[goal] = (cached_results, 0.0)
+    
+    # Shared preprocessing for every goal still to pack
+    if CAPACITY_MATRIX_AVAILABLE:
+        get_capacity_matrix()
+    base_groups = _build_carton_groups(carton_list)
+    validation_tables = {id(truck_type): {} for truck_type in truck_fleet}
+    
+    runs = {}
+    for goal in optimization_goals:
+        if goal in goal_results:
+            continue
+        groups = _sort_carton_groups(base_groups, goal)
+        truck_list = _sort_trucks_for_goal(truck_fleet.items(), goal)
+        order = (tuple(group.key for group in groups), tuple(id(truck_type) for truck_type, _ in truck_list))
+        runs.setdefault(order, (groups, truck_list, []))[2].append(goal)
+    
+    def pack_run(groups, truck_list):
+        run_start = time.time()
+        available_trucks = []
+        for truck_type, quantity in truck_list:
+            for i in range(quantity):
+                truck_bin = _create_truck_bin(truck_type, i)
+                truck_bin.validation_cache = validation_tables[id(truck_type)]
+                available_trucks.append(truck_bin)
+        packed, _ = _pack_truck_bins(available_trucks, groups, use_parallel=False, engine=engine)
+        run_time = time.time() - run_start
+        if cost_model is not None:
+            cost_model.record(sum(group.quantity for group in groups), len(groups), len(available_trucks),
+                              engine, run_time)
+        return packed, run_time
+    
+    cost_model = get_packing_cost_model()
+    for groups, truck_list, goals in runs.values():
+        packed, run_time = pack_run(groups, truck_list)
+        for goal in goals:
+            goal_results[goal] = (packed, run_time)
+            if cache is not None:
+                cache.put(cache_keys[goal], packed)
+    
+    for goal in optimization_goals:
+        result, processing_time = goal_results[goal]
         
         # Calculate fleet-wide metrics
         total_cost = sum(r['total_cost'] for r in result)
@@ -1140,7 +1999,9 @@ def optimize_fleet_distribution(carton_list, truck_fleet, optimization_goals=['c
     return {
         'results': results,
         'recommended_strategy': best_strategy,
-        'strategy_comparison': results
+        'strategy_comparison': results,
+        'packing_runs': len(runs),
+        'total_processing_time': time.time() - start_time
     }
 
 # === COMPREHENSIVE DIMENSIONAL VALIDATION SYSTEM ===
@@ -1326,6 +2187,39 @@ def validate_carton_dimensions(carton):
 
 def build_compatibility_matrix(trucks, cartons):
     """Build a compatibility matrix between trucks and cartons"""
+    if not CAPACITY_MATRIX_AVAILABLE:
+        return _build_compatibility_matrix_loop(trucks, cartons)
+
+    capacity = CapacityMatrix(trucks, cartons)
+    matrix = []
+    
+    for ti, truck in enumerate(capacity.trucks):
+        for ci, carton in enumerate(capacity.cartons):
+            best_rotation = capacity.first_strict_rotation(ti, ci)
+            can_fit = best_rotation is not None
+            
+            max_by_volume = int(capacity.max_by_volume[ti, ci])
+            has_weight_limit = carton.weight > 0 and truck.max_weight > 0
+            max_by_weight = int(capacity.max_by_weight[ti, ci]) if has_weight_limit else float('inf')
+            
+            realistic_max = min(max_by_volume, max_by_weight) if max_by_weight != float('inf') else max_by_volume
+            realistic_max = int(realistic_max * 0.7)  # 70% efficiency
+            
+            matrix.append({
+                'truck_name': truck.name,
+                'carton_name': carton.name,
+                'can_fit': can_fit,
+                'best_rotation': best_rotation,
+                'max_by_volume': max_by_volume,
+                'max_by_weight': max_by_weight,
+                'realistic_max': realistic_max,
+                'compatibility_score': realistic_max if can_fit else 0
+            })
+    
+    return matrix
+
+def _build_compatibility_matrix_loop(trucks, cartons):
+    """Pure-Python fallback for build_compatibility_matrix when NumPy is unavailable"""
     matrix = []
     
     for truck in trucks:
@@ -0,0 +1,251 @@
+"""
+Persistent Packing Result Cache for TruckOpti
+Content-addressed SQLite cache for pack_cartons_optimized results
+
+Features:
+- Keys are a SHA-256 of the canonical problem: truck dimensions, limits and
+  cost data with quantities, the cartons in input order, optimization goal,
+  packing engine, geometry mode, execution mode and algorithm version
+- Stored in the app data directory, so results survive restarts and are
+  shared by every worker process
+- Lookups only read; hit/miss counters and the last-used time of hit entries
+  are collected in memory and written in one batch every few seconds
+- Least recently used entries are evicted once max_entries is exceeded
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 5000
+CACHE_FILENAME = 'packing_cache.db'
+STATS_FLUSH_SECONDS = 5.0  # pending counters and LRU touches are written at most this often
+STATS_FLUSH_LOOKUPS = 100  # ... or once this many lookups are pending
+
+TRUCK_FIELDS = ('name', 'length', 'width', 'height', 'max_weight',
+                'cost_per_km', 'fuel_efficiency', 'driver_cost_per_day', 'maintenance_cost_per_km')
+CARTON_FIELDS = ('name', 'length', 'width', 'height', 'weight', 'can_rotate', 'fragile',
+                 'stackable', 'max_stack_height', 'value', 'priority')
+
+
+def _canonical_value(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return round(float(value), 6)
+    return str(value)
+
+
+def _canonical_entry(obj, fields, quantity):
+    return [_canonical_value(getattr(obj, field, None)) for field in fields] + [int(quantity)]
+
+
+def packing_cache_key(truck_types_with_quantities, carton_types_with_quantities,
+                      optimization_goal, engine, version, geometry='float', execution='sequential') -> str:
+    """
+    Hash of everything a packing result depends on.
+
+    Names and cost fields are included because they appear in the result
+    (item names, bin names, costs); database ids are not. Input order is kept:
+    carton group keys in the result follow it, and ties in the packing order
+    keep it. execution identifies the truck-filling mode ('sequential', or the
+    parallel backend and batch size), since parallel batches can pack differently.
+    """
+    trucks = [
+        _canonical_entry(truck, TRUCK_FIELDS, quantity)
+        for truck, quantity in truck_types_with_quantities.items() if quantity
+    ]
+    cartons = [
+        _canonical_entry(carton, CARTON_FIELDS, quantity)
+        for carton, quantity in carton_types_with_quantities.items() if quantity and quantity > 0
+    ]
+    problem = {
+        'trucks': trucks,
+        'cartons': cartons,
+        'goal': optimization_goal,
+        'engine': engine,
+        'geometry': geometry,
+        'execution': execution,
+        'version': version,
+    }
+    encoded = json.dumps(problem, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class PackingCache:
+    """SQLite-backed store of packing results keyed by problem hash"""
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending_hits = 0
+        self._pending_misses = 0
+        self._pending_touches: Dict[str, list] = {}  # key -> [last_used, hits]
+        self._last_flush = time.time()
+        self._init_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _init_database(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS packing_results (
+                    key TEXT PRIMARY KEY,
+                    result BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            ''')
+            conn.execute("INSERT OR IGNORE INTO cache_stats (name, value) VALUES ('hits', 0), ('misses', 0)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached result for key, or None (each call counts as a hit or a miss)"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute('SELECT result FROM packing_results WHERE key = ?', (key,)).fetchone()
+            result = pickle.loads(row[0]) if row is not None else None
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logger.warning(f"Packing cache read failed: {e}")
+            result = None
+
+        now = time.time()
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                self._pending_misses += 1
+            else:
+                self.hits += 1
+                self._pending_hits += 1
+                touch = self._pending_touches.setdefault(key, [now, 0])
+                touch[0] = now
+                touch[1] += 1
+            flush_due = (self._pending_hits + self._pending_misses >= STATS_FLUSH_LOOKUPS or
+                         now - self._last_flush >= STATS_FLUSH_SECONDS)
+        if flush_due:
+            self.flush()
+        return result
+
+    def flush(self):
+        """Write the pending hit/miss counters and last-used times in one transaction"""
+        with self._lock:
+            hits, misses, touches = self._pending_hits, self._pending_misses, self._pending_touches
+            self._pending_hits, self._pending_misses, self._pending_touches = 0, 0, {}
+            self._last_flush = time.time()
+        if not (hits or misses or touches):
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    'UPDATE packing_results SET last_used = MAX(last_used, ?), hit_count = hit_count + ? '
+                    'WHERE key = ?', [(last_used, count, key) for key, (last_used, count) in touches.items()]
+                )
+                conn.executemany("UPDATE cache_stats SET value = value + ? WHERE name = ?",
+                                 [(hits, 'hits'), (misses, 'misses')])
+        except sqlite3.Error as e:
+            logger.warning(f"Packing cache statistics update failed: {e}")
+
+    def put(self, key: str, result: Any):
+        """Store a result and evict the least recently used entries beyond max_entries"""
+        # Recent hits must count before deciding what is least recently used
+        self.flush()
+        now = time.time()
+        try:
+            blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO packing_results (key, result, created_at, last_used, hit_count) '
+                    'VALUES (?, ?, ?, ?, 0)', (key, blob, now, now)
+                )
+                conn.execute(
+                    'DELETE FROM packing_results WHERE key IN ('
+                    'SELECT key FROM packing_results ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,)
+                )
+        except (sqlite3.Error, pickle.PicklingError, TypeError) as e:
+            logger.warning(f"Packing cache write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._pending_hits, self._pending_misses, self._pending_touches = 0, 0, {}
+        with self._connect() as conn:
+            conn.execute('DELETE FROM packing_results')
+            conn.execute("UPDATE cache_stats SET value = 0")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts for this process and for all processes sharing the file"""
+        self.flush()
+        try:
+            with self._connect() as conn:
+                totals = dict(conn.execute('SELECT name, value FROM cache_stats').fetchall())
+                entries, size = conn.execute(
+                    'SELECT COUNT(*), COALESCE(SUM(LENGTH(result)), 0) FROM packing_results'
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Packing cache stats unavailable: {e}")
+            totals, entries, size = {}, None, None
+
+        total_hits = totals.get('hits', 0)
+        total_misses = totals.get('misses', 0)
+        lookups = total_hits + total_misses
+        return {
+            'path': self.path,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'size_bytes': size,
+            'hits': total_hits,
+            'misses': total_misses,
+            'hit_rate': round(total_hits / lookups, 4) if lookups else 0.0,
+            'process_hits': self.hits,
+            'process_misses': self.misses,
+        }
+
+
+_cache: Optional[PackingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_packing_cache() -> Optional[PackingCache]:
+    """Shared cache in the app data directory, or None if it cannot be opened"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    from .config.settings import Config
+                    path = os.environ.get('TRUCKOPTI_PACKING_CACHE') or \
+                        os.path.join(Config.get_app_data_directory(), CACHE_FILENAME)
+                    _cache = PackingCache(path)
+                    atexit.register(_cache.flush)
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning(f"Packing cache disabled: {e}")
+                    return None
+    return _cache
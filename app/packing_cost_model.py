@@ -0,0 +1,243 @@
+"""
+Empirical Packing Cost Model for TruckOpti
+Predicts packing run time from telemetry of earlier runs
+
+Features:
+- Every real (non-cached) packing run records cartons, distinct carton types,
+  trucks, engine and elapsed seconds in a SQLite telemetry table
+- Per-engine log-log least-squares fit:
+  ln(seconds) = b0 + b1 ln(cartons) + b2 ln(types) + b3 ln(trucks)
+- Refits automatically after every REFIT_INTERVAL new measurements
+- Until an engine has MIN_SAMPLES measurements, runs of all engines are pooled;
+  with no data at all the old linear rule of thumb is used
+- plan_packing_execution turns an estimate into sync / background / reject
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_FILENAME = 'packing_telemetry.db'
+MIN_SAMPLES = 8            # measurements needed before a fit replaces the prior
+REFIT_INTERVAL = 25        # new measurements between automatic refits
+MAX_FIT_SAMPLES = 2000     # most recent runs used per fit
+RIDGE = 1e-6               # keeps the normal equations solvable for constant features
+P90_Z = 1.2816             # one-sided 90% quantile of the standard normal
+
+POOLED = '*'
+
+
+def _features(num_cartons, num_types, num_trucks) -> List[float]:
+    return [1.0,
+            math.log(max(1, num_cartons)),
+            math.log(max(1, num_types)),
+            math.log(max(1, num_trucks))]
+
+
+def prior_estimate(num_cartons, num_trucks) -> float:
+    """Rule of thumb used before any telemetry exists"""
+    return 0.1 + (num_cartons * num_trucks) / 1000 * 0.05
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> Optional[List[float]]:
+    """Gaussian elimination with partial pivoting for the small normal equations"""
+    size = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(size)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        if abs(rows[pivot][col]) < 1e-12:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, size):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, size + 1):
+                rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        solution[r] = (rows[r][size] - sum(rows[r][c] * solution[c] for c in range(r + 1, size))) / rows[r][r]
+    return solution
+
+
+def fit_log_linear(samples: Sequence[Sequence[float]]) -> Optional[Dict[str, Any]]:
+    """Least-squares fit over (cartons, types, trucks, seconds) rows; None if underdetermined"""
+    if len(samples) < MIN_SAMPLES:
+        return None
+    xs = [_features(n, k, t) for n, k, t, _ in samples]
+    ys = [math.log(max(seconds, 1e-4)) for _, _, _, seconds in samples]
+    size = len(xs[0])
+    xtx = [[sum(x[i] * x[j] for x in xs) + (RIDGE if i == j else 0.0) for j in range(size)] for i in range(size)]
+    xty = [sum(x[i] * y for x, y in zip(xs, ys)) for i in range(size)]
+    coefficients = _solve(xtx, xty)
+    if coefficients is None:
+        return None
+    residuals = [y - sum(c * f for c, f in zip(coefficients, x)) for x, y in zip(xs, ys)]
+    dof = max(1, len(samples) - size)
+    return {
+        'coefficients': coefficients,
+        'residual_std': math.sqrt(sum(r * r for r in residuals) / dof),
+        'samples': len(samples),
+        'fitted_at': time.time(),
+    }
+
+
+class PackingCostModel:
+    """Telemetry store and per-engine run time model"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fits: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._pending: Dict[str, int] = {}
+        self._init_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _init_database(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS packing_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    engine TEXT NOT NULL,
+                    num_cartons INTEGER NOT NULL,
+                    num_types INTEGER NOT NULL,
+                    num_trucks INTEGER NOT NULL,
+                    elapsed_seconds REAL NOT NULL,
+                    recorded_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_packing_runs_engine ON packing_runs (engine, id)')
+
+    def record(self, num_cartons: int, num_types: int, num_trucks: int, engine: str, elapsed_seconds: float):
+        """Store one measurement; refits the engine's model every REFIT_INTERVAL measurements"""
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT INTO packing_runs (engine, num_cartons, num_types, num_trucks, elapsed_seconds, recorded_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (engine, int(num_cartons), int(num_types), int(num_trucks), float(elapsed_seconds), time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Packing telemetry write failed: {e}")
+            return
+
+        with self._lock:
+            self._pending[engine] = self._pending.get(engine, 0) + 1
+            fit = self._fits.get(engine)
+            due = self._pending[engine] >= REFIT_INTERVAL or (fit is None and engine in self._fits)
+        if due:
+            self.refit(engine)
+
+    def _load_samples(self, engine: str) -> List[tuple]:
+        query = 'SELECT num_cartons, num_types, num_trucks, elapsed_seconds FROM packing_runs'
+        params: tuple = ()
+        if engine != POOLED:
+            query += ' WHERE engine = ?'
+            params = (engine,)
+        query += ' ORDER BY id DESC LIMIT ?'
+        with self._connect() as conn:
+            return conn.execute(query, params + (MAX_FIT_SAMPLES,)).fetchall()
+
+    def refit(self, engine: str) -> Optional[Dict[str, Any]]:
+        """Fit the engine's model (and the pooled one) from the most recent measurements"""
+        fits = {}
+        for key in (engine, POOLED):
+            try:
+                fits[key] = fit_log_linear(self._load_samples(key))
+            except sqlite3.Error as e:
+                logger.warning(f"Packing telemetry read failed: {e}")
+                fits[key] = None
+        with self._lock:
+            self._fits.update(fits)
+            self._pending[engine] = 0
+        if fits[engine] is not None:
+            logger.info(f"Packing cost model for '{engine}' refit on {fits[engine]['samples']} runs "
+                        f"(residual std {fits[engine]['residual_std']:.2f})")
+        return fits[engine]
+
+    def _fit_for(self, engine: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            known = engine in self._fits
+        if not known:
+            self.refit(engine)
+        with self._lock:
+            return self._fits.get(engine) or self._fits.get(POOLED)
+
+    def estimate(self, num_cartons: int, num_types: int, num_trucks: int, engine: str) -> Dict[str, Any]:
+        """Expected and 90th percentile run time in seconds, with the source of the estimate"""
+        fit = self._fit_for(engine)
+        if fit is None:
+            seconds = prior_estimate(num_cartons, num_trucks)
+            return {'seconds': seconds, 'p90_seconds': seconds * 2, 'source': 'prior', 'samples': 0}
+
+        log_seconds = sum(c * f for c, f in zip(fit['coefficients'], _features(num_cartons, num_types, num_trucks)))
+        # Guard against wild extrapolation far outside the measured range
+        log_seconds = min(log_seconds, math.log(24 * 3600))
+        return {
+            'seconds': math.exp(log_seconds),
+            'p90_seconds': math.exp(log_seconds + P90_Z * fit['residual_std']),
+            'source': 'fitted',
+            'samples': fit['samples'],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            with self._connect() as conn:
+                counts = dict(conn.execute('SELECT engine, COUNT(*) FROM packing_runs GROUP BY engine').fetchall())
+        except sqlite3.Error as e:
+            logger.warning(f"Packing telemetry stats unavailable: {e}")
+            counts = {}
+        with self._lock:
+            models = {
+                engine: {'samples': fit['samples'], 'residual_std': round(fit['residual_std'], 4),
+                         'coefficients': [round(c, 4) for c in fit['coefficients']]}
+                for engine, fit in self._fits.items() if fit is not None
+            }
+        return {'path': self.path, 'measurements': counts, 'models': models}
+
+
+def plan_packing_execution(estimate: Dict[str, Any], sync_budget_seconds: float,
+                           max_seconds: float, background_slots_free: bool = True) -> str:
+    """
+    'sync' if the run should finish inside the request budget, 'background' if it
+    may take longer but is acceptable, 'reject' if it exceeds max_seconds or no
+    background slot is free.
+    """
+    if estimate['p90_seconds'] <= sync_budget_seconds:
+        return 'sync'
+    if estimate['seconds'] > max_seconds or not background_slots_free:
+        return 'reject'
+    return 'background'
+
+
+_model: Optional[PackingCostModel] = None
+_model_lock = threading.Lock()
+
+
+def get_packing_cost_model() -> Optional[PackingCostModel]:
+    """Shared model backed by the app data directory, or None if the store cannot be opened"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                try:
+                    from .config.settings import Config
+                    path = os.environ.get('TRUCKOPTI_PACKING_TELEMETRY') or \
+                        os.path.join(Config.get_app_data_directory(), TELEMETRY_FILENAME)
+                    _model = PackingCostModel(path)
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning(f"Packing cost model disabled: {e}")
+                    return None
+    return _model
@@ -0,0 +1,164 @@
+"""
+Background Packing Run Store for TruckOpti
+SQLite-backed status and results of packing runs moved out of the request
+
+Features:
+- Stored in the app data directory next to the packing cache, so every
+  worker process sees every run and finished runs survive restarts
+- Results are stored as JSON, the form the status endpoint returns them in
+- Finished runs are deleted retention_seconds after they finish
+- A run whose process is gone (restart, crash) or that is still running
+  stale_seconds after it started is reported as failed, so it neither
+  hangs its pollers nor holds a background slot
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+RUNS_FILENAME = 'packing_runs.db'
+DEFAULT_RETENTION_SECONDS = 3600
+DEFAULT_STALE_SECONDS = 1200  # twice the longest run routes admit to the background
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        # Exists but belongs to someone else, or the check is unsupported
+        return True
+    return True
+
+
+class PackingRunStore:
+    """Status rows of background packing runs shared by all worker processes"""
+
+    def __init__(self, path: str, retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+                 stale_seconds: float = DEFAULT_STALE_SECONDS):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.stale_seconds = stale_seconds
+        self._init_database()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _init_database(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS background_runs (
+                    run_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    started_at REAL NOT NULL,
+                    finished_at REAL,
+                    estimated_seconds REAL NOT NULL,
+                    result TEXT,
+                    error TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_background_runs_status ON background_runs (status, finished_at)')
+
+    def _expire(self, conn, now: float):
+        """Delete runs past retention and fail runs that can no longer finish"""
+        conn.execute("DELETE FROM background_runs WHERE status != 'running' AND finished_at < ?",
+                     (now - self.retention_seconds,))
+        running = conn.execute("SELECT run_id, pid, started_at FROM background_runs WHERE status = 'running'").fetchall()
+        lost = []
+        for run_id, pid, started_at in running:
+            if now - started_at > self.stale_seconds:
+                lost.append(('Packing run exceeded its time limit', now, run_id))
+            elif pid != os.getpid() and not _process_alive(pid):
+                lost.append(('Packing run was interrupted by a server restart', now, run_id))
+        if lost:
+            conn.executemany("UPDATE background_runs SET status = 'failed', error = ?, finished_at = ? "
+                             "WHERE run_id = ? AND status = 'running'", lost)
+
+    def create(self, kind: str, estimated_seconds: float) -> str:
+        """Register a run started by this process and return its id"""
+        run_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._connect() as conn:
+            self._expire(conn, now)
+            conn.execute(
+                "INSERT INTO background_runs (run_id, kind, status, pid, started_at, estimated_seconds) "
+                "VALUES (?, ?, 'running', ?, ?, ?)",
+                (run_id, kind, os.getpid(), now, float(estimated_seconds))
+            )
+        return run_id
+
+    def finish(self, run_id: str, result: Any = None, error: Optional[str] = None):
+        """Store the result (or the error) of a run"""
+        status = 'failed' if error is not None else 'completed'
+        encoded = json.dumps(result, default=str) if error is None else None
+        try:
+            with self._connect() as conn:
+                conn.execute("UPDATE background_runs SET status = ?, result = ?, error = ?, finished_at = ? "
+                             "WHERE run_id = ?", (status, encoded, error, time.time(), run_id))
+        except sqlite3.Error as e:
+            logger.warning(f"Packing run {run_id} could not be stored: {e}")
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """The run as a dict, or None if it is unknown or expired"""
+        with self._connect() as conn:
+            self._expire(conn, time.time())
+            row = conn.execute(
+                'SELECT kind, status, started_at, finished_at, estimated_seconds, result, error '
+                'FROM background_runs WHERE run_id = ?', (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        kind, status, started_at, finished_at, estimated_seconds, result, error = row
+        return {
+            'run_id': run_id,
+            'kind': kind,
+            'status': status,
+            'started_at': started_at,
+            'finished_at': finished_at,
+            'estimated_seconds': estimated_seconds,
+            'result': json.loads(result) if result is not None else None,
+            'error': error,
+        }
+
+    def running_count(self) -> int:
+        """Runs still in progress in any worker process"""
+        with self._connect() as conn:
+            self._expire(conn, time.time())
+            return conn.execute("SELECT COUNT(*) FROM background_runs WHERE status = 'running'").fetchone()[0]
+
+
+_store: Optional[PackingRunStore] = None
+_store_lock = threading.Lock()
+
+
+def get_packing_run_store() -> Optional[PackingRunStore]:
+    """Shared store in the app data directory, or None if it cannot be opened"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    from .config.settings import Config
+                    path = os.environ.get('TRUCKOPTI_PACKING_RUNS') or \
+                        os.path.join(Config.get_app_data_directory(), RUNS_FILENAME)
+                    _store = PackingRunStore(path)
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning(f"Background packing runs disabled: {e}")
+                    return None
+    return _store
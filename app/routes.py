@@ -1,22 +1,29 @@
 from app.route_optimizer import route_optimizer, Location
 from flask import (request, jsonify, Blueprint, flash, render_template,
                    redirect, url_for, current_app)
+from werkzeug.datastructures import FileStorage
 from app.models import (db, TruckType, CartonType, PackingJob, PackingResult,
                         Shipment, UserSettings)
 import json  # noqa: F401
 from version import VERSION, BUILD_DATE, BUILD_NAME  # noqa: F401
+import threading
 import time
 import traceback
 from decimal import Decimal
 from datetime import datetime
 from functools import lru_cache
 import hashlib
+import io
+import math
+import sqlite3
 from app.packer import (
     INDIAN_TRUCKS,
     INDIAN_CARTONS,
     pack_cartons,
     pack_cartons_optimized,
-    calculate_optimal_truck_combination)
+    calculate_optimal_truck_combination,
+    PACKING_ENGINES,
+    DEFAULT_PACKING_ENGINE)
 
 from app.cost_engine import cost_engine
 # Import advanced 3D packer V2 for state-of-the-art recommendations
@@ -36,6 +43,13 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Packing budget for synchronous requests; the HTTP front end times out at 10 s
+PACKING_DEADLINE_SECONDS = 8.0
+
+# Admission control for packing runs that are predicted to exceed the request budget
+BACKGROUND_PACKING_MAX_SECONDS = 600
+MAX_BACKGROUND_PACKING_RUNS = 2
+
 # Import comprehensive debug logging system
 try:
     import sys
@@ -341,6 +355,7 @@ def recommend_truck():
 
                 # Prepare multiple cartons (process all form entries)
                 carton_data = []
+                carton_type_count = 0
                 i = 1
                 while True:
                     carton_id = request.form.get(f'carton_type_{i}')
@@ -352,6 +367,7 @@ def recommend_truck():
 
                     carton = CartonType.query.get(int(carton_id))
                     if carton and int(carton_qty) > 0:
+                        carton_type_count += 1
                         for _ in range(int(carton_qty)):
                             carton_data.append({
                                 'name': f"{carton.name}_{len(carton_data) + 1}",
@@ -391,9 +407,28 @@ def recommend_truck():
                     "optimization_goal": optimization_goal
                 })
 
+                # Loads too large for the request run in the background; the quick
+                # legacy estimate below is shown meanwhile
+                packing_mode = 'sync'
+                if ADVANCED_PACKER_AVAILABLE and len(carton_data) > 0:
+                    estimate = _estimate_packing(len(carton_data), carton_type_count, len(truck_data))
+                    packing_mode = _plan_packing(estimate)
+                    if packing_mode == 'reject':
+                        flash(f"This load is too large to pack (estimated {estimate['seconds']:.0f}s, "
+                              f"limit {BACKGROUND_PACKING_MAX_SECONDS}s)", 'error')
+                    elif packing_mode == 'background':
+                        run_id = _start_background_packing_run(
+                            'recommendation', estimate,
+                            lambda: create_enterprise_packing_recommendation(
+                                truck_data, carton_data, optimization_goal,
+                                deadline_seconds=BACKGROUND_PACKING_MAX_SECONDS,
+                                target_recommendations=5))
+                        flash(f"Packing continues in the background (about {estimate['seconds']:.0f}s); "
+                              f"results at {url_for('api.api_get_packing_run', run_id=run_id)}", 'info')
+
                 # Use Advanced 3D Packer V2 if available, fallback to legacy
                 print(f"[CRITICAL DEBUG] ADVANCED_PACKER_AVAILABLE={ADVANCED_PACKER_AVAILABLE}, carton_data_length={len(carton_data)}")
-                if ADVANCED_PACKER_AVAILABLE and len(carton_data) > 0:
+                if ADVANCED_PACKER_AVAILABLE and len(carton_data) > 0 and packing_mode == 'sync':
                     try:
                         print(
                             "[DEBUG] Using Advanced 3D Packer V2 - 2024-2025 Research Implementation")
@@ -407,8 +442,11 @@ def recommend_truck():
                             "optimization_goal": optimization_goal
                         }, None)
                         
+                        # Only the top 5 are shown, so trucks that cannot beat the 5th score are cancelled
                         advanced_result = create_enterprise_packing_recommendation(
-                            truck_data, carton_data, optimization_goal)
+                            truck_data, carton_data, optimization_goal,
+                            deadline_seconds=PACKING_DEADLINE_SECONDS,
+                            target_recommendations=5)
                         
                         # Log algorithm execution completion
                         algo_execution_time = (time.time() - algo_start_time) * 1000
@@ -1842,21 +1880,11 @@ def api_cost_analysis():
     })
 
 
-@api.route('/fleet-cost-optimization', methods=['POST'])
-def api_fleet_cost_optimization():
-    """Advanced fleet cost optimization with multiple objectives"""
-    data = request.get_json()
-    truck_data = data.get('trucks', [])
-    carton_data = data.get('cartons', [])
-    route_info = data.get(
-        'route_info', {
-            'distance_km': 100, 'route_type': 'highway'})
-    optimization_goals = data.get('optimization_goals', ['cost', 'space'])
-
-    # Process truck quantities
+def _parse_fleet_cost_request(data):
+    """(truck_quantities, fleet_allocation, carton_quantities) for a fleet cost optimization request"""
     truck_quantities = {}
     fleet_allocation = []
-    for item in truck_data:
+    for item in data.get('trucks', []):
         truck_type = TruckType.query.get(item['id'])
         if truck_type:
             quantity = item.get('quantity', 1)
@@ -1864,28 +1892,35 @@ def api_fleet_cost_optimization():
             fleet_allocation.append(
                 {'truck_type': truck_type, 'quantity': quantity})
 
-    # Process carton quantities
     carton_quantities = {}
-    for item in carton_data:
+    for item in data.get('cartons', []):
         carton_type = CartonType.query.get(item['id'])
         if carton_type:
             carton_quantities[carton_type] = item.get('quantity', 1)
 
-    if not truck_quantities or not carton_quantities:
-        return jsonify(
-            {'error': 'Both trucks and cartons must be provided'}), 400
+    return truck_quantities, fleet_allocation, carton_quantities
+
+
+def _fleet_cost_optimization(data, parsed=None):
+    """Strategy comparison and fleet costs for a fleet cost optimization request"""
+    route_info = data.get(
+        'route_info', {
+            'distance_km': 100, 'route_type': 'highway'})
+    optimization_goals = data.get('optimization_goals', ['cost', 'space'])
+    truck_quantities, fleet_allocation, carton_quantities = parsed or _parse_fleet_cost_request(data)
 
     # Get optimized packing results
     from app.packer import optimize_fleet_distribution
     optimization_results = optimize_fleet_distribution(
-        carton_quantities, truck_quantities, optimization_goals
+        carton_quantities, truck_quantities, optimization_goals,
+        engine=data.get('engine', DEFAULT_PACKING_ENGINE)
     )
 
     # Calculate comprehensive fleet costs
     fleet_costs = cost_engine.calculate_multi_truck_fleet_cost(
         fleet_allocation, route_info)
 
-    return jsonify({
+    return {
         'optimization_results': optimization_results,
         'fleet_costs': fleet_costs,
         'recommendations': {
@@ -1894,43 +1929,214 @@ def api_fleet_cost_optimization():
             'cost_savings_potential': fleet_costs['total_costs']['total_cost'] * 0.15,
             'efficiency_improvements': optimization_results['results']
         }
-    })
+    }
 
 
-@api.route('/truck-recommendation-ai', methods=['POST'])
-def api_truck_recommendation_ai():
-    """AI-powered truck recommendation based on carton requirements"""
-    from datetime import datetime
+def _estimate_packing(num_cartons, num_types, num_trucks, engine=DEFAULT_PACKING_ENGINE, runs=1):
+    """Predicted run time of runs packings of the load, from telemetry or the prior"""
+    from app.packing_cost_model import get_packing_cost_model, prior_estimate
+
+    cost_model = get_packing_cost_model()
+    if cost_model is not None:
+        estimate = cost_model.estimate(num_cartons, num_types, num_trucks, engine)
+    else:
+        seconds = prior_estimate(num_cartons, num_trucks)
+        estimate = {'seconds': seconds, 'p90_seconds': seconds * 2, 'source': 'prior', 'samples': 0}
+    return dict(estimate, seconds=estimate['seconds'] * runs, p90_seconds=estimate['p90_seconds'] * runs)
+
+
+def _plan_packing(estimate):
+    """'sync', 'background' or 'reject' for a run with this estimate"""
+    from app.packing_cost_model import plan_packing_execution
+    from app.packing_runs import get_packing_run_store
+
+    store = get_packing_run_store()
+    try:
+        slots_free = store is not None and store.running_count() < MAX_BACKGROUND_PACKING_RUNS
+    except sqlite3.Error as e:
+        logger.warning(f"Background packing runs unavailable: {e}")
+        slots_free = False
+    return plan_packing_execution(estimate, PACKING_DEADLINE_SECONDS, BACKGROUND_PACKING_MAX_SECONDS, slots_free)
+
+
+def _capacity_error(estimate):
+    return jsonify({
+        'error': 'Packing request exceeds the available capacity',
+        'estimated_seconds': round(estimate['seconds'], 2),
+        'max_seconds': BACKGROUND_PACKING_MAX_SECONDS
+    }), 503
+
+
+def _start_background_packing_run(kind, estimate, work):
+    """Run work() on a thread with an app context and return the run id for status polling"""
+    from app.packing_runs import get_packing_run_store
+
+    app = current_app._get_current_object()
+    store = get_packing_run_store()
+    run_id = store.create(kind, estimate['seconds'])
+
+    def target():
+        with app.app_context():
+            try:
+                store.finish(run_id, work())
+            except Exception as e:
+                logger.error(f"Background packing run {run_id} failed: {e}")
+                store.finish(run_id, error=str(e))
+
+    threading.Thread(target=target, name=f'packing-run-{run_id}', daemon=True).start()
+    return run_id
+
+
+def _background_run_response(run_id, estimate):
+    return jsonify({
+        'run_id': run_id,
+        'status': 'running',
+        'estimated_seconds': round(estimate['seconds'], 2),
+        'status_url': url_for('api.api_get_packing_run', run_id=run_id)
+    }), 202
+
+
+@api.route('/fleet-cost-optimization', methods=['POST'])
+def api_fleet_cost_optimization():
+    """Advanced fleet cost optimization with multiple objectives"""
     data = request.get_json()
-    carton_data = data.get('cartons', [])
-    max_trucks = data.get('max_trucks', 10)
+    parsed = _parse_fleet_cost_request(data)
+    truck_quantities, _, carton_quantities = parsed
 
-    # Process carton quantities
-    carton_quantities = {}
-    for item in carton_data:
-        carton_type = CartonType.query.get(item['id'])
-        if carton_type:
-            carton_quantities[carton_type] = item.get('quantity', 1)
+    if not truck_quantities or not carton_quantities:
+        return jsonify(
+            {'error': 'Both trucks and cartons must be provided'}), 400
+    engine = data.get('engine', DEFAULT_PACKING_ENGINE)
+    if engine not in PACKING_ENGINES:
+        return jsonify({'error': f"engine must be one of {sorted(PACKING_ENGINES)}"}), 400
+
+    # Predict the run time from telemetry; goals that share an ordering pack once,
+    # so one pack per goal is an upper bound
+    num_cartons = sum(carton_quantities.values())
+    num_trucks = sum(truck_quantities.values())
+    num_goals = max(1, len(data.get('optimization_goals', ['cost', 'space'])))
+    estimate = _estimate_packing(num_cartons, len(carton_quantities), num_trucks, engine, runs=num_goals)
+
+    mode = _plan_packing(estimate)
+    if mode == 'reject':
+        return _capacity_error(estimate)
+    if mode == 'background':
+        run_id = _start_background_packing_run('fleet-cost', estimate, lambda: _fleet_cost_optimization(data))
+        return _background_run_response(run_id, estimate)
+
+    response = _fleet_cost_optimization(data, parsed)
+    response['estimated_seconds'] = round(estimate['seconds'], 2)
+    return jsonify(response)
+
+
+@api.route('/packing-runs/<run_id>', methods=['GET'])
+def api_get_packing_run(run_id):
+    """Status, progress ETA and (when finished) the result of a background packing run"""
+    from app.packing_runs import get_packing_run_store
+
+    store = get_packing_run_store()
+    run = store.get(run_id) if store is not None else None
+    if run is None:
+        return jsonify({'error': 'Unknown packing run'}), 404
+
+    elapsed = (run['finished_at'] or time.time()) - run['started_at']
+    estimated = max(run['estimated_seconds'], 1e-3)
+    finished = run['status'] != 'running'
+    return jsonify({
+        'run_id': run_id,
+        'kind': run['kind'],
+        'status': run['status'],
+        'elapsed_seconds': round(elapsed, 2),
+        'estimated_seconds': round(run['estimated_seconds'], 2),
+        'eta_seconds': 0 if finished else round(max(0.0, estimated - elapsed), 2),
+        'progress': 1.0 if finished else round(min(0.99, elapsed / estimated), 3),
+        'result': run['result'],
+        'error': run['error']
+    })
 
-    if not carton_quantities:
-        return jsonify({'error': 'No cartons provided'}), 400
 
-    # Get all available truck types
+def _truck_recommendation_ai(carton_counts, max_trucks, fleet_objective, fleet_time_budget,
+                             deadline_seconds):
+    """
+    Truck combinations and the mixed fleet for {carton type id: quantity}; the
+    fleet search gets what is left of deadline_seconds, at most fleet_time_budget
+    """
+    from app.packer import calculate_optimal_fleet_mix
+
+    start = time.time()
+    carton_quantities = {CartonType.query.get(carton_id): quantity
+                         for carton_id, quantity in carton_counts.items()}
     available_trucks = TruckType.query.filter_by(availability=True).all()
 
     # Use AI-powered recommendation
-    from app.packer import calculate_optimal_truck_combination
     recommendations = calculate_optimal_truck_combination(
         carton_quantities,
         available_trucks,
         max_trucks,
         optimization_strategy='space_utilization')
 
-    return jsonify({
+    # Mixed fleets (e.g. one large truck plus a small one for the remainder)
+    remaining_budget = max(0.0, deadline_seconds - (time.time() - start))
+    fleet_mix = calculate_optimal_fleet_mix(
+        carton_quantities,
+        available_trucks,
+        objective=fleet_objective,
+        max_trucks=max_trucks,
+        time_budget_seconds=min(fleet_time_budget, remaining_budget))
+
+    return {
         'recommendations': recommendations,
+        'fleet_mix': fleet_mix,
         'total_cartons': sum(carton_quantities.values()),
         'analysis_timestamp': datetime.now().isoformat()
-    })
+    }
+
+
+@api.route('/truck-recommendation-ai', methods=['POST'])
+def api_truck_recommendation_ai():
+    """AI-powered truck recommendation based on carton requirements"""
+    request_start = time.time()
+    data = request.get_json()
+    carton_data = data.get('cartons', [])
+    max_trucks = data.get('max_trucks', 10)
+
+    try:
+        fleet_time_budget = float(data.get('fleet_time_budget', PACKING_DEADLINE_SECONDS))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'fleet_time_budget must be a number of seconds'}), 400
+    if not math.isfinite(fleet_time_budget) or fleet_time_budget < 0:
+        return jsonify({'error': 'fleet_time_budget must be a non-negative number of seconds'}), 400
+    fleet_objective = data.get('fleet_objective', 'cost')
+    if fleet_objective not in ('cost', 'trucks'):
+        return jsonify({'error': "fleet_objective must be 'cost' or 'trucks'"}), 400
+
+    # Process carton quantities
+    carton_counts = {}
+    for item in carton_data:
+        carton_type = CartonType.query.get(item['id'])
+        if carton_type:
+            carton_counts[carton_type.id] = item.get('quantity', 1)
+
+    if not carton_counts:
+        return jsonify({'error': 'No cartons provided'}), 400
+
+    # Truck combinations and the fleet mix each pack the load
+    num_trucks = TruckType.query.filter_by(availability=True).count()
+    estimate = _estimate_packing(sum(carton_counts.values()), len(carton_counts), num_trucks, runs=2)
+    mode = _plan_packing(estimate)
+    if mode == 'reject':
+        return _capacity_error(estimate)
+    if mode == 'background':
+        run_id = _start_background_packing_run(
+            'truck-recommendation', estimate,
+            lambda: _truck_recommendation_ai(carton_counts, max_trucks, fleet_objective, fleet_time_budget,
+                                             BACKGROUND_PACKING_MAX_SECONDS))
+        return _background_run_response(run_id, estimate)
+
+    # The fleet search only gets what is left of the request's packing deadline
+    remaining_deadline = PACKING_DEADLINE_SECONDS - (time.time() - request_start)
+    return jsonify(_truck_recommendation_ai(carton_counts, max_trucks, fleet_objective, fleet_time_budget,
+                                            remaining_deadline))
 
 
 @api.route('/fuel-prices', methods=['GET'])
@@ -1951,6 +2157,8 @@ def api_get_fuel_prices():
 def api_performance_metrics():
     """Get system performance metrics"""
     from app.packer import estimate_packing_time
+    from app.packing_cache import get_packing_cache
+    from app.packing_cost_model import get_packing_cost_model
 
     # Get sample metrics
     total_trucks = TruckType.query.count()
@@ -1959,12 +2167,17 @@ def api_performance_metrics():
     estimated_time = estimate_packing_time(
         1000, 10)  # For 1000 cartons and 10 trucks
 
+    packing_cache = get_packing_cache()
+    cost_model = get_packing_cost_model()
+
     return jsonify({
         'system_stats': {
             'total_truck_types': total_trucks,
             'total_carton_types': total_cartons,
             'estimated_packing_time_1000_cartons': f"{estimated_time:.2f} seconds"
         },
+        'packing_cache': packing_cache.stats() if packing_cache else {'enabled': False},
+        'packing_cost_model': cost_model.stats() if cost_model else {'enabled': False},
         'performance_tips': [
             "Use optimized algorithms for datasets > 500 cartons",
             "Enable parallel processing for better performance",
@@ -2738,6 +2951,10 @@ def sale_orders():
                     'optimization_mode', 'cost_saving')
                 enable_consolidation = request.form.get(
                     'enable_consolidation', 'true') == 'true'
+                engine = request.form.get('engine', DEFAULT_PACKING_ENGINE)
+                if engine not in PACKING_ENGINES:
+                    flash(f'Unknown packing engine: {engine}', 'error')
+                    return redirect(request.url)
 
                 # Map frontend optimization modes to backend optimization goals
                 optimization_goal_map = {
@@ -2748,8 +2965,28 @@ def sale_orders():
                 optimization_goal = optimization_goal_map.get(
                     optimization_mode, 'cost')
 
+                # Read the upload once, so a background run can process it too
+                content = file.read()
+                filename = file.filename
+                estimate = _estimate_sale_order_file(filename, content, engine)
+                mode = _plan_packing(estimate) if estimate is not None else 'sync'
+                if mode == 'reject':
+                    flash(f"This file is too large to process (estimated {estimate['seconds']:.0f}s, "
+                          f"limit {BACKGROUND_PACKING_MAX_SECONDS}s)", 'error')
+                    return redirect(request.url)
+                if mode == 'background':
+                    run_id = _start_background_packing_run(
+                        'sale-orders', estimate,
+                        lambda: process_sale_order_file(
+                            FileStorage(io.BytesIO(content), filename=filename), batch_name,
+                            optimization_goal, enable_consolidation, engine=engine))
+                    flash(f"Processing continues in the background (about {estimate['seconds']:.0f}s); "
+                          f"status at {url_for('api.api_get_packing_run', run_id=run_id)}", 'info')
+                    return redirect(request.url)
+
                 processing_result = process_sale_order_file(
-                    file, batch_name, optimization_goal, enable_consolidation)
+                    FileStorage(io.BytesIO(content), filename=filename), batch_name,
+                    optimization_goal, enable_consolidation, engine=engine)
 
                 if processing_result['success']:
                     flash(
@@ -2815,11 +3052,32 @@ def sale_order_results(batch_id):
         return render_template('error.html', error=str(e))
 
 
+def _estimate_sale_order_file(filename, content, engine=DEFAULT_PACKING_ENGINE):
+    """Predicted processing time of an uploaded batch, or None if it cannot be read"""
+    import pandas as pd
+
+    try:
+        if filename.endswith('.xlsx'):
+            df = pd.read_excel(io.BytesIO(content))
+        else:
+            df = pd.read_csv(io.StringIO(content.decode('utf-8')))
+        num_orders = max(1, int(df['sale_order_number'].nunique()))
+        num_cartons = int(df['quantity'].sum())
+        num_types = max(1, int(df['carton_code'].nunique()))
+    except Exception:
+        # process_sale_order_file reports unreadable files
+        return None
+    # Every order is packed on its own
+    return _estimate_packing(math.ceil(num_cartons / num_orders), num_types, TruckType.query.count(),
+                             engine, runs=num_orders)
+
+
 def process_sale_order_file(
         file,
         batch_name,
         optimization_goal='cost',
-        enable_consolidation=True):
+        enable_consolidation=True,
+        engine=DEFAULT_PACKING_ENGINE):
     """Process uploaded Excel/CSV file and generate truck recommendations"""
     import pandas as pd
     from app.models import SaleOrder, SaleOrderItem, SaleOrderBatch, TruckRecommendation, TruckType, CartonType
@@ -3111,7 +3369,7 @@ def process_sale_order_file(
                 logger.info(
                     f"Generating recommendations for order: {
                         sale_order.sale_order_number}")
-                generate_truck_recommendations(sale_order, optimization_goal)
+                generate_truck_recommendations(sale_order, optimization_goal, engine=engine)
                 logger.info(
                     f"Successfully generated recommendations for order: {
                         sale_order.sale_order_number}")
@@ -3192,17 +3450,24 @@ def _cache_recommendation(sale_order, optimization_goal, recommendations):
     _recommendation_cache[cache_key] = recommendations
 
 
-def generate_truck_recommendations(sale_order, optimization_goal='cost'):
+def generate_truck_recommendations(sale_order, optimization_goal='cost', deadline_seconds=PACKING_DEADLINE_SECONDS,
+                                   engine=DEFAULT_PACKING_ENGINE):
     """
     Generate truck recommendations with improved algorithm:
     1. Start with smallest truck that can fit all cartons
     2. If no single truck fits, find optimal combination
     3. Prioritize cost savings through space utilization
+
+    All packing runs share one deadline_seconds budget (None: no limit); trucks
+    not reached in time are left out of the comparison.
     """
     from app.models import TruckType, TruckRecommendation, CartonType
-    from app.packer import pack_cartons_optimized
+    from app.packer import pack_cartons_optimized, CAPACITY_MATRIX_AVAILABLE
     import logging
 
+    if CAPACITY_MATRIX_AVAILABLE:
+        from app.capacity_matrix import get_capacity_matrix
+
     logger = logging.getLogger(__name__)
     logger.info(
         f"Starting truck recommendations for sale order: {
@@ -3247,6 +3512,14 @@ def generate_truck_recommendations(sale_order, optimization_goal='cost'):
 
         return
 
+    deadline = time.time() + deadline_seconds if deadline_seconds is not None else None
+
+    def remaining_budget():
+        return max(0.0, deadline - time.time()) if deadline is not None else None
+
+    def out_of_time():
+        return deadline is not None and time.time() >= deadline
+
     try:
         # Get all available trucks sorted by volume (smallest first for cost
         # efficiency)
@@ -3301,12 +3574,23 @@ def generate_truck_recommendations(sale_order, optimization_goal='cost'):
         # Phase 1: Find the smallest truck that can fit everything (Early
         # termination for performance)
         logger.info("Phase 1: Finding smallest truck that fits all cartons")
-        # Limit to first 5 trucks for performance (smallest ones)
-        for truck in trucks[:5]:
+        # Skip trucks the capacity matrix rules out (an oversized carton, or
+        # more volume/weight than the truck holds) before running the packer
+        capacity = get_capacity_matrix() if CAPACITY_MATRIX_AVAILABLE else None
+        single_truck_candidates = [
+            truck for truck in trucks
+            if capacity is None or capacity.may_hold_all(truck, carton_quantities)
+        ]
+        # Limit to first 5 candidate trucks for performance (smallest ones)
+        for truck in single_truck_candidates[:5]:
+            if out_of_time():
+                logger.warning("Packing deadline reached while looking for a single fitting truck")
+                break
             try:
                 truck_combo = {truck: 1}  # Single truck only
                 pack_results = pack_cartons_optimized(
-                    truck_combo, carton_quantities, optimization_goal)
+                    truck_combo, carton_quantities, optimization_goal,
+                    engine=engine, deadline_seconds=remaining_budget())
 
                 if pack_results:
                     result = pack_results[0]
@@ -3348,10 +3632,15 @@ def generate_truck_recommendations(sale_order, optimization_goal='cost'):
                 len(trucks_to_test)} trucks for recommendations")
 
         for truck in trucks_to_test:
+            # The smallest fitting truck is always scored, even when time is up
+            if out_of_time() and truck != smallest_fitting_truck:
+                logger.warning(f"Packing deadline reached, skipping {truck.name}")
+                continue
             try:
                 truck_combo = {truck: 1}  # Single truck only
                 pack_results = pack_cartons_optimized(
-                    truck_combo, carton_quantities, optimization_goal)
+                    truck_combo, carton_quantities, optimization_goal,
+                    engine=engine, deadline_seconds=remaining_budget())
 
                 if pack_results:
                     result = pack_results[0]
@@ -4180,6 +4469,11 @@ def apply_space_optimization():
         optimization_ids = data.get('optimization_ids', [])
         additional_cartons = data.get('additional_cartons', [])
 
+        if data.get('load_state'):
+            # Top up the saved load with the extra cartons instead of repacking
+            return jsonify(apply_incremental_load(
+                data['load_state'], additional_cartons))
+
         # Simulate optimization application
         result = apply_optimizations(
             truck_index, optimization_ids, additional_cartons)
@@ -4198,6 +4492,33 @@ def apply_space_optimization():
         }), 500
 
 
+def apply_incremental_load(load_state, additional_cartons):
+    """Pack additional cartons into a saved truck load and return only the delta"""
+    from app.packer import pack_into_existing_load
+
+    carton_quantities = {}
+    for entry in additional_cartons:
+        carton_type = CartonType.query.get(entry.get('id'))
+        quantity = int(entry.get('quantity', 0) or 0)
+        if carton_type and quantity > 0:
+            carton_quantities[carton_type] = carton_quantities.get(
+                carton_type, 0) + quantity
+    if not carton_quantities:
+        raise ValueError('No valid additional cartons provided')
+
+    delta = pack_into_existing_load(load_state, carton_quantities)
+    return {
+        'success': True,
+        'new_utilization': round(delta['utilization'] * 100, 1),
+        'optimization_applied': 0,
+        'impact_summary': {
+            'cartons_added': len(delta['added_items']),
+            'cartons_not_fitted': len(delta['unfitted_items'])
+        },
+        **delta
+    }
+
+
 def generate_optimization_suggestions(truck_index):
     """Generate smart optimization suggestions for a truck"""
     base_suggestions = [{'id': 1,
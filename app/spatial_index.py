@@ -0,0 +1,329 @@
+"""
+Shared 3D Spatial Index for TruckOpti Packers
+Uniform grid over axis-aligned boxes for collision and support queries
+
+Features:
+- Each placed box is registered in the grid cells it touches, so overlap and
+  "what is directly below me" queries only inspect nearby boxes instead of
+  scanning every placed carton
+- Boxes are (x1, y1, z1, x2, y2, z2) with z as the vertical axis by default
+- Query results are returned in insertion order, so packers that report
+  supporting-box indices keep their existing output
+- HeightMap keeps the top-surface height and owning box of every floor cell,
+  so support area, supporting boxes and resting height under a footprint are
+  array slices instead of scans over the placed boxes (exact when all box
+  dimensions are multiples of the cell size)
+- SpatialIndex is pure Python (also used by TruckOptimum); HeightMap needs
+  NumPy, and callers fall back to SpatialIndex.below without it
+"""
+
+import math
+from functools import reduce
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+Box = Tuple[float, float, float, float, float, float]
+
+DEFAULT_CELL_SIZE = 50.0
+MAX_HEIGHT_MAP_CELLS = 250_000
+
+
+def suggested_cell_size(dimensions: Iterable[float], minimum: float = 1.0) -> float:
+    """Cell size close to the typical smallest carton side, so a box spans few cells"""
+    sides = sorted(float(side) for side in dimensions if side and side > 0)
+    if not sides:
+        return DEFAULT_CELL_SIZE
+    return max(minimum, sides[len(sides) // 2])
+
+
+class SpatialIndex:
+    """Uniform grid of axis-aligned boxes keyed by caller-chosen ids"""
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE, vertical_axis: int = 2):
+        self.cell_size = float(cell_size) if cell_size and cell_size > 0 else DEFAULT_CELL_SIZE
+        self.vertical_axis = vertical_axis
+        self._cells: Dict[Tuple[int, int, int], List[Hashable]] = {}
+        self._boxes: Dict[Hashable, Box] = {}
+        self._order: Dict[Hashable, int] = {}
+        self._inserted = 0
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def __contains__(self, key):
+        return key in self._boxes
+
+    def box(self, key: Hashable) -> Box:
+        return self._boxes[key]
+
+    def _cell_span(self, low: float, high: float) -> range:
+        # Cells whose half-open interval meets [low, high); at least one cell for points
+        start = math.floor(low / self.cell_size)
+        return range(start, max(start + 1, math.ceil(high / self.cell_size)))
+
+    def _cells_for(self, box: Box):
+        x1, y1, z1, x2, y2, z2 = box
+        for cx in self._cell_span(x1, x2):
+            for cy in self._cell_span(y1, y2):
+                for cz in self._cell_span(z1, z2):
+                    yield (cx, cy, cz)
+
+    def insert(self, key: Hashable, x1: float, y1: float, z1: float,
+               x2: float, y2: float, z2: float):
+        """Add a box; re-inserting an existing key replaces it"""
+        if key in self._boxes:
+            self.remove(key)
+        box = (x1, y1, z1, x2, y2, z2)
+        self._boxes[key] = box
+        self._order[key] = self._inserted
+        self._inserted += 1
+        for cell in self._cells_for(box):
+            self._cells.setdefault(cell, []).append(key)
+
+    def remove(self, key: Hashable):
+        box = self._boxes.pop(key, None)
+        if box is None:
+            return
+        del self._order[key]
+        for cell in self._cells_for(box):
+            members = self._cells.get(cell)
+            if members:
+                members.remove(key)
+                if not members:
+                    del self._cells[cell]
+
+    def candidates(self, x1: float, y1: float, z1: float,
+                   x2: float, y2: float, z2: float) -> List[Hashable]:
+        """Keys of boxes registered in any cell touched by the region (broad phase)"""
+        seen = set()
+        found = []
+        for cell in self._cells_for((x1, y1, z1, x2, y2, z2)):
+            for key in self._cells.get(cell, ()):
+                if key not in seen:
+                    seen.add(key)
+                    found.append(key)
+        found.sort(key=self._order.__getitem__)
+        return found
+
+    def overlapping(self, x1: float, y1: float, z1: float,
+                    x2: float, y2: float, z2: float,
+                    tolerance: float = 0.0) -> List[Hashable]:
+        """Keys of boxes whose interior, shrunk by tolerance, intersects the region"""
+        result = []
+        for key in self.candidates(x1, y1, z1, x2, y2, z2):
+            bx1, by1, bz1, bx2, by2, bz2 = self._boxes[key]
+            if (x1 < bx2 - tolerance and x2 > bx1 + tolerance and
+                    y1 < by2 - tolerance and y2 > by1 + tolerance and
+                    z1 < bz2 - tolerance and z2 > bz1 + tolerance):
+                result.append(key)
+        return result
+
+    def overlaps(self, x1: float, y1: float, z1: float,
+                 x2: float, y2: float, z2: float,
+                 tolerance: float = 0.0) -> bool:
+        """True if any box (shrunk by tolerance) intersects the region"""
+        boxes = self._boxes
+        for cell in self._cells_for((x1, y1, z1, x2, y2, z2)):
+            for key in self._cells.get(cell, ()):
+                bx1, by1, bz1, bx2, by2, bz2 = boxes[key]
+                if (x1 < bx2 - tolerance and x2 > bx1 + tolerance and
+                        y1 < by2 - tolerance and y2 > by1 + tolerance and
+                        z1 < bz2 - tolerance and z2 > bz1 + tolerance):
+                    return True
+        return False
+
+    def contains_point(self, x: float, y: float, z: float) -> bool:
+        """True if the point lies strictly inside any box"""
+        for key in self.candidates(x, y, z, x, y, z):
+            bx1, by1, bz1, bx2, by2, bz2 = self._boxes[key]
+            if bx1 < x < bx2 and by1 < y < by2 and bz1 < z < bz2:
+                return True
+        return False
+
+    def below(self, a1: float, b1: float, a2: float, b2: float, level: float,
+              tolerance: float = 0.0) -> List[Tuple[Hashable, float]]:
+        """
+        Boxes whose top face is within tolerance of `level` and whose footprint
+        overlaps the rectangle [a1, a2] x [b1, b2] on the two horizontal axes.
+
+        Returns (key, overlap_area) pairs in insertion order.
+        """
+        axis = self.vertical_axis
+        horizontal = [i for i in range(3) if i != axis]
+        low, high = level - tolerance, level + tolerance
+        # Boxes are registered half-open, so a top face lying exactly on a cell
+        # boundary lives in the cell below it; widen the search downwards
+        region = [a1, b1, a2, b2]
+        region.insert(axis, low - self.cell_size / 2)
+        region.insert(axis + 3, high)
+
+        result = []
+        for key in self.candidates(*region):
+            box = self._boxes[key]
+            top = box[axis + 3]
+            if not (low <= top <= high):
+                continue
+            ba1, bb1 = box[horizontal[0]], box[horizontal[1]]
+            ba2, bb2 = box[horizontal[0] + 3], box[horizontal[1] + 3]
+            overlap_a = min(a2, ba2) - max(a1, ba1)
+            overlap_b = min(b2, bb2) - max(b1, bb1)
+            if overlap_a > 0 and overlap_b > 0:
+                result.append((key, overlap_a * overlap_b))
+        return result
+
+    def clear(self):
+        self._cells.clear()
+        self._boxes.clear()
+        self._order.clear()
+        self._inserted = 0
+
+
+def build_index(boxes: Iterable[Box], cell_size: Optional[float] = None,
+                vertical_axis: int = 2) -> SpatialIndex:
+    """Index a sequence of boxes, keyed by their position in the sequence"""
+    boxes = list(boxes)
+    if cell_size is None:
+        cell_size = suggested_cell_size(min(b[3] - b[0], b[4] - b[1], b[5] - b[2]) for b in boxes)
+    index = SpatialIndex(cell_size, vertical_axis)
+    for i, box in enumerate(boxes):
+        index.insert(i, *box)
+    return index
+
+
+def exact_height_map_resolution(size_a: float, size_b: float, dimensions: Iterable[float],
+                                max_cells: int = MAX_HEIGHT_MAP_CELLS) -> Optional[float]:
+    """
+    Greatest common divisor of whole-number box dimensions, if a size_a x size_b
+    grid of that cell size has at most max_cells cells. Boxes placed at sums of
+    these dimensions then lie on cell boundaries and height map areas are exact.
+    """
+    sides = [float(side) for side in dimensions if side and side > 0]
+    if not sides or any(abs(side - round(side)) > 1e-9 for side in sides):
+        return None
+    resolution = float(reduce(math.gcd, (int(round(side)) for side in sides)))
+    if math.ceil(size_a / resolution) * math.ceil(size_b / resolution) > max_cells:
+        return None
+    return resolution
+
+
+def height_map_resolution(size_a: float, size_b: float, dimensions: Iterable[float],
+                          max_cells: int = MAX_HEIGHT_MAP_CELLS) -> float:
+    """Exact cell size when there is one, else the finest grid with at most max_cells cells"""
+    dimensions = list(dimensions)
+    resolution = exact_height_map_resolution(size_a, size_b, dimensions, max_cells)
+    if resolution is None:
+        resolution = math.sqrt(size_a * size_b / max_cells)
+    return resolution
+
+
+class HeightMap:
+    """
+    Floor grid of top-surface heights with the key of the box that owns each cell.
+
+    Coordinates are the two horizontal axes (a, b) of the caller; keys must be
+    non-negative integers (-1 marks the bare floor). Placed footprints cover
+    every cell they touch, so resting heights are never too low; support
+    queries snap to the nearest cell boundary. Both are exact for boxes aligned
+    to the grid.
+
+    Only the top surface is kept. A top face that ends up under a higher box
+    with a gap in between (a box placed under an overhang, or one overhanging
+    a lower neighbour) is hidden; the range of hidden levels is kept per cell,
+    and support queries that could miss a hidden face return None so the caller
+    can fall back to a SpatialIndex.
+    """
+
+    def __init__(self, size_a: float, size_b: float, resolution: float):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("HeightMap requires NumPy")
+        self.resolution = float(resolution)
+        self.shape = (max(1, math.ceil(size_a / self.resolution - 1e-9)),
+                      max(1, math.ceil(size_b / self.resolution - 1e-9)))
+        self.cell_area = self.resolution * self.resolution
+        self.top = np.zeros(self.shape)
+        self.owner = np.full(self.shape, -1, dtype=np.int64)
+        self.hidden_low = np.full(self.shape, np.inf)
+        self.hidden_high = np.full(self.shape, -np.inf)
+        self.has_hidden = False
+
+    def _span(self, low: float, high: float, cells: int, cover: bool) -> slice:
+        if cover:
+            start = math.floor(low / self.resolution + 1e-9)
+            stop = math.ceil(high / self.resolution - 1e-9)
+        else:
+            start, stop = round(low / self.resolution), round(high / self.resolution)
+        start = min(cells - 1, max(0, int(start)))
+        return slice(start, min(cells, max(start + 1, int(stop))))
+
+    def _region(self, a1: float, b1: float, a2: float, b2: float, cover: bool = False):
+        return (self._span(a1, a2, self.shape[0], cover),
+                self._span(b1, b2, self.shape[1], cover))
+
+    def place(self, key: int, a1: float, b1: float, a2: float, b2: float, top: float,
+              bottom: Optional[float] = None, tolerance: float = 0.0):
+        """Record a box footprint whose top face is at `top` and bottom face at `bottom`"""
+        region = self._region(a1, b1, a2, b2, cover=True)
+        current = self.top[region]
+        raised = current <= top
+        # The new top face under a higher box, or an old one under a gap
+        hidden_level = np.where(raised, np.nan, top)
+        if bottom is not None:
+            hidden_level = np.where(raised & (current < bottom - tolerance), current, hidden_level)
+        if not np.isnan(hidden_level).all():
+            np.fmin(self.hidden_low[region], hidden_level, out=self.hidden_low[region])
+            np.fmax(self.hidden_high[region], hidden_level, out=self.hidden_high[region])
+            self.has_hidden = True
+        current[raised] = top
+        self.owner[region][raised] = key
+
+    def _level_mask(self, region, level: float, tolerance: float):
+        """Cells whose top is within tolerance of level, or None if a hidden face may be there"""
+        low, high = level - tolerance, level + tolerance
+        if self.has_hidden and ((self.hidden_low[region] <= high) &
+                                (self.hidden_high[region] >= low)).any():
+            return None
+        top = self.top[region]
+        return (top >= low) & (top <= high)
+
+    def resting_height(self, a1: float, b1: float, a2: float, b2: float) -> float:
+        """Height a box with this footprint comes to rest at when lowered from above"""
+        return float(self.top[self._region(a1, b1, a2, b2, cover=True)].max())
+
+    def supported_area(self, a1: float, b1: float, a2: float, b2: float, level: float,
+                       tolerance: float = 0.0) -> Optional[float]:
+        """Area of the footprint whose top surface is within tolerance of `level`"""
+        mask = self._level_mask(self._region(a1, b1, a2, b2), level, tolerance)
+        if mask is None:
+            return None
+        return float(np.count_nonzero(mask)) * self.cell_area
+
+    def below(self, a1: float, b1: float, a2: float, b2: float, level: float,
+              tolerance: float = 0.0) -> Optional[List[Tuple[int, float]]]:
+        """
+        Boxes whose top face is within tolerance of `level` under the footprint,
+        as (key, overlap_area) pairs in key order (same shape as SpatialIndex.below)
+        """
+        region = self._region(a1, b1, a2, b2)
+        mask = self._level_mask(region, level, tolerance)
+        if mask is None:
+            return None
+        if not mask.any():
+            return []
+        owners = self.owner[region][mask]
+        counts = np.bincount(owners[owners >= 0])
+        keys = np.flatnonzero(counts)
+        return [(int(key), float(counts[key]) * self.cell_area) for key in keys]
+
+    def resting_heights(self, cells_a: int, cells_b: int):
+        """
+        Resting height of a footprint covering cells_a x cells_b cells at every
+        grid origin, as an array of shape (shape[0] - cells_a + 1, shape[1] - cells_b + 1)
+        """
+        windows = np.lib.stride_tricks.sliding_window_view(self.top, cells_a, axis=0).max(axis=-1)
+        return np.lib.stride_tricks.sliding_window_view(windows, cells_b, axis=1).max(axis=-1)
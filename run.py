@@ -4,6 +4,7 @@ import signal
 import sys
 import os
 import atexit
+import multiprocessing
 import time
 from threading import Timer
 from app import create_app
@@ -21,9 +22,6 @@ def find_available_port(start_port=5000):
             except OSError:
                 port += 1
 
-app = create_app()
-port = find_available_port()
-
 browser_opened = False
 
 def open_browser():
@@ -53,16 +51,23 @@ def cleanup():
     """Cleanup function called on exit"""
     print("TruckOpti shutting down...")
 
-# Register signal handlers for graceful shutdown
-signal.signal(signal.SIGINT, signal_handler)
-signal.signal(signal.SIGTERM, signal_handler)
-if sys.platform == "win32":
-    signal.signal(signal.SIGBREAK, signal_handler)
+if __name__ == '__main__':
+    # Packing worker processes re-run this module (spawn start method, frozen
+    # executables); they must not build the app, bind a port or open a browser
+    multiprocessing.freeze_support()
 
-# Register cleanup function
-atexit.register(cleanup)
+    app = create_app()
+    port = find_available_port()
+
+    # Register signal handlers for graceful shutdown
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+    if sys.platform == "win32":
+        signal.signal(signal.SIGBREAK, signal_handler)
+
+    # Register cleanup function
+    atexit.register(cleanup)
 
-if __name__ == '__main__':
     # Determine if we're running as executable or development
     is_executable = hasattr(sys, 'frozen') and hasattr(sys, '_MEIPASS')
     
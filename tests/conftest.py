@@ -29,6 +29,17 @@ def app():
         db.session.remove()
         db.drop_all()
 
+@pytest.fixture(autouse=True)
+def isolated_packing_stores(tmp_path, monkeypatch):
+    """Keep the persistent packing cache, telemetry and background runs out of app_data during tests"""
+    from app import packing_cache, packing_cost_model, packing_runs
+    monkeypatch.setenv('TRUCKOPTI_PACKING_CACHE', str(tmp_path / 'packing_cache.db'))
+    monkeypatch.setenv('TRUCKOPTI_PACKING_TELEMETRY', str(tmp_path / 'packing_telemetry.db'))
+    monkeypatch.setenv('TRUCKOPTI_PACKING_RUNS', str(tmp_path / 'packing_runs.db'))
+    monkeypatch.setattr(packing_cache, '_cache', None)
+    monkeypatch.setattr(packing_cost_model, '_model', None)
+    monkeypatch.setattr(packing_runs, '_store', None)
+
 @pytest.fixture(scope='function')
 def test_client(app):
     """Create a test client for making requests"""
@@ -0,0 +1,183 @@
+"""
+Tests for the TruckOptimum search-based 3D packing algorithms
+"""
+
+import random
+import sys
+import os
+from array import array
+
+# Add the TruckOptimum directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'TruckOptimum'))
+
+from advanced_3d_algorithms import (Advanced3DPackingEngine, Algorithm3DType, BranchAndBound3D, Carton3D,
+                                    GeneticAlgorithm3D, SimulatedAnnealing3D, SkylineBottomLeft,
+                                    SkylineDecodeCache, TabuSearch3D, Truck3D, _oriented_cartons)
+
+
+def sample_truck():
+    return Truck3D(1, 'T', 600, 240, 240, 20000, 1.0)
+
+
+def sample_cartons():
+    sizes = [((60, 40, 40), 12), ((50, 50, 30), 10), ((80, 60, 40), 6)]
+    return [Carton3D(i, f'c{i}', *dims, weight=5, quantity=quantity)
+            for i, (dims, quantity) in enumerate(sizes)]
+
+
+class TestGeneticAlgorithm:
+    """Test the encoded and process-parallel fitness evaluation"""
+
+    def test_encoded_fitness_round_trip(self):
+        """Genes carry the carton type and orientation of every unit"""
+        cartons = sample_cartons()
+        ga = GeneticAlgorithm3D(sample_truck())
+        random.seed(3)
+        sequence = ga.create_random_sequence(cartons)
+        genes = ga.encode(sequence)
+        assert len(genes) == sum(c.quantity for c in cartons)
+        assert [(ga._carton_table[g // 6][0], g % 6) for g in genes] == \
+            [(carton.id, orientation) for carton, orientation in sequence]
+        assert 0 < ga.evaluate_fitness(sequence) <= 1
+
+    def test_pool_matches_serial_evaluation(self):
+        """The process pool evaluates populations to the same result"""
+        results = []
+        for workers in (1, 2):
+            random.seed(11)
+            ga = GeneticAlgorithm3D(sample_truck(), population_size=8, generations=3, workers=workers)
+            result = ga.pack(sample_cartons())
+            results.append((result['total_packed'], result['volume_utilization']))
+        assert results[0] == results[1]
+        assert Advanced3DPackingEngine(ga_workers=3).ga_workers == 3
+
+    def test_engine_keeps_one_fitness_pool(self):
+        """GA runs of the engine share one pool, even across trucks and loads"""
+        engine = Advanced3DPackingEngine(ga_workers=2)
+        executors = []
+        try:
+            for truck, cartons in ((sample_truck(), sample_cartons()),
+                                   (Truck3D(2, 'U', 400, 240, 240, 20000, 1.0), sample_cartons()[:2])):
+                random.seed(11)
+                pooled = engine.run_genetic(truck, cartons)
+                executors.append(engine._fitness_executor)
+                random.seed(11)
+                serial = GeneticAlgorithm3D(truck).pack(cartons)
+                assert (pooled['total_packed'], pooled['volume_utilization']) == \
+                    (serial['total_packed'], serial['volume_utilization'])
+            assert executors[0] is not None and executors[0] is executors[1]
+        finally:
+            engine.close()
+        assert engine._fitness_executor is None
+
+
+class TestSkylineDecodeCache:
+    """Test that resuming from prefix checkpoints matches a fresh decode"""
+
+    def test_shared_prefixes_are_reused(self):
+        """Children of a sequence only decode the genes after their last shared checkpoint"""
+        cartons = sample_cartons()
+        table = [(c.id, c.name, c.length, c.width, c.height, c.weight) for c in cartons]
+        volumes = [c.volume for c in cartons]
+        cache = SkylineDecodeCache(sample_truck(), _oriented_cartons(table), volumes, interval=4)
+
+        random.seed(5)
+        parent = array('i', [random.randrange(len(cartons) * 6) for _ in range(28)])
+        children = [parent[:i] + array('i', [(g + 7) % 18 for g in parent[i:]]) for i in (5, 12, 20)]
+        for genes in [parent] + children:
+            fresh = SkylineDecodeCache(sample_truck(), _oriented_cartons(table), volumes, interval=4)
+            assert cache.fitness(genes) == fresh.fitness(genes)
+        assert cache.reused_genes == 4 + 12 + 20
+        assert cache.fitness(parent) == cache.fitness(array('i', parent))
+
+
+class TestLocalSearch:
+    """Test simulated annealing and tabu search over the encoded sequence"""
+
+    def test_searches_improve_on_initial_order(self):
+        """Neither search ends worse than the skyline order it starts from, and the trace is monotone"""
+        for algorithm in (SimulatedAnnealing3D(sample_truck(), max_iterations=300, seed=1),
+                          TabuSearch3D(sample_truck(), max_iterations=15, seed=1)):
+            result = algorithm.pack(sample_cartons())
+            trace = result['convergence']
+            best = [point['best_fitness'] for point in trace]
+            assert best == sorted(best)
+            assert result['best_fitness'] == best[-1] >= trace[0]['fitness']
+            assert result['total_packed'] + result['total_unpacked'] == 28
+            assert not result['truncated']
+
+    def test_deadline_truncates_search(self):
+        """A tiny time budget stops the search early and says so"""
+        result = SimulatedAnnealing3D(sample_truck(), max_iterations=10 ** 6, seed=2).pack(
+            sample_cartons(), deadline_seconds=0.2)
+        assert result['truncated']
+        assert result['iterations'] < 10 ** 6
+        assert result['search_seconds'] < 2
+
+
+class TestBranchAndBound:
+    """Test the exact search, its bounds and the reported gap"""
+
+    def test_proves_optimum_of_small_load(self):
+        """One 60 cm cube and seven 40 cm cubes is the best load of a 1 m cube"""
+        truck = Truck3D(1, 'T', 100, 100, 100, 20000, 1.0)
+        cartons = [Carton3D(0, 'big', 60, 60, 60, 5, quantity=2), Carton3D(1, 'small', 40, 40, 40, 5, quantity=8)]
+        result = BranchAndBound3D(truck).pack(cartons)
+        assert result['optimal'] and result['optimality_gap'] == 0
+        assert round(result['volume_utilization'], 6) == 66.4
+        assert result['total_packed'] == 8 and result['total_unpacked'] == 2
+        boxes = result['packed_cartons']
+        for i, a in enumerate(boxes):
+            assert a.x2 <= 100 and a.y2 <= 100 and a.z2 <= 100
+            for b in boxes[:i]:
+                assert not (a.x < b.x2 and b.x < a.x2 and a.y < b.y2 and b.y < a.y2 and a.z < b.z2 and b.z < a.z2)
+
+    def test_node_limit_reports_gap(self):
+        """A stopped search keeps at least the heuristic packing and bounds how far it may be from optimal"""
+        truck = Truck3D(1, 'T', 120, 100, 80, 1000, 1.0)
+        cartons = [Carton3D(0, 'a', 50, 40, 40, 30, quantity=5), Carton3D(1, 'b', 60, 30, 50, 20, quantity=5),
+                   Carton3D(2, 'c', 40, 60, 20, 10, quantity=5)]
+        result = BranchAndBound3D(truck, max_nodes=50).pack(cartons)
+        assert result['truncated'] and not result['optimal']
+        assert result['nodes'] == 50
+        assert result['volume_utilization'] <= result['upper_bound_volume_utilization'] <= 100
+        assert result['optimality_gap'] > 0
+        assert result['volume_utilization'] >= SkylineBottomLeft(truck).pack(cartons)['volume_utilization']
+
+
+class TestAlgorithmRace:
+    """Test racing algorithms, streaming their results and cancelling once a winner is certain"""
+
+    def test_best_cancels_once_unbeatable(self):
+        """Everything fits, so the first complete packing wins and the rest never run"""
+        engine = Advanced3DPackingEngine(race_workers=1)
+        assert engine.efficiency_upper_bound(sample_truck(), sample_cartons()) == 100
+        streamed = list(engine.race_algorithms(sample_truck(), sample_cartons(),
+                                               [Algorithm3DType.EXTREME_POINTS, Algorithm3DType.GENETIC_ALGORITHM],
+                                               stop_score=100))
+        assert streamed[0][0] == 'extreme_points' and streamed[0][1]['efficiency_score'] == 100
+        assert streamed[1][1]['cancelled']
+
+        best_algorithm, best_result = engine.get_best_algorithm(sample_truck(), sample_cartons())
+        assert best_result['efficiency_score'] == 100
+        assert best_algorithm in ('skyline_bl', 'extreme_points')
+
+    def test_process_race_matches_sequential_results(self, monkeypatch):
+        """Racing in worker processes returns the same results, in the requested order"""
+        algorithms = [Algorithm3DType.BRANCH_AND_BOUND, Algorithm3DType.SKYLINE_BL, Algorithm3DType.EXTREME_POINTS]
+        sequential = Advanced3DPackingEngine(race_workers=1).compare_algorithms(
+            sample_truck(), sample_cartons(), algorithms)
+        monkeypatch.setattr(os, 'cpu_count', lambda: 3)
+        engine = Advanced3DPackingEngine(race_workers=3)
+        try:
+            raced = engine.compare_algorithms(sample_truck(), sample_cartons(), algorithms, deadline_seconds=60)
+            # The pool is kept for the next race
+            again = engine.compare_algorithms(sample_truck(), sample_cartons(), algorithms)
+            assert {name: r['volume_utilization'] for name, r in again.items()} == \
+                {name: r['volume_utilization'] for name, r in raced.items()}
+        finally:
+            engine.close()
+        assert list(raced) == [algorithm.value for algorithm in algorithms]
+        for name in raced:
+            assert raced[name]['volume_utilization'] == sequential[name]['volume_utilization']
+            assert not raced[name]['truncated']
@@ -20,7 +20,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from app import create_app, db
 from app.models import TruckType, CartonType, PackingJob, PackingResult
-from app.packer import pack_cartons_optimized, calculate_optimal_truck_combination
+from app.packer import (pack_cartons_optimized, calculate_optimal_truck_combination, CartonGroup,
+                        RemainingInventory, BlockLayerPacker)
+from py3dbp import Bin
+from app.capacity_matrix import get_capacity_matrix
 from app.cost_engine import CostCalculationEngine, FuelPrices, RouteCost
 from app.ml_optimizer import PackingAI
 from app.route_optimizer import RouteOptimizer, Location
@@ -63,6 +66,12 @@ class TestOptimizedPackingAlgorithms:
             db.session.add(self.carton_small)
             db.session.add(self.carton_large)
             db.session.commit()
+
+            # Load the committed rows and detach them, so the tests can use them
+            # from their own app contexts
+            for model in (self.truck, self.carton_small, self.carton_large):
+                db.session.refresh(model)
+            db.session.expunge_all()
     
     def test_optimized_packing_performance(self):
         """Test that optimized algorithm handles large datasets efficiently"""
@@ -75,7 +84,7 @@ class TestOptimizedPackingAlgorithms:
             
             start_time = time.time()
             results = pack_cartons_optimized(
-                truck_quantities, carton_quantities, 'space', use_parallel=True
+                truck_quantities, carton_quantities, 'space', use_parallel=True, engine='extreme_points'
             )
             end_time = time.time()
             
@@ -92,12 +101,13 @@ class TestOptimizedPackingAlgorithms:
             
             # Test with parallel processing enabled
             results_parallel = pack_cartons_optimized(
-                truck_quantities, carton_quantities, 'space', use_parallel=True, max_workers=2
+                truck_quantities, carton_quantities, 'space', use_parallel=True, max_workers=2,
+                use_cache=False
             )
             
             # Test with parallel processing disabled
             results_sequential = pack_cartons_optimized(
-                truck_quantities, carton_quantities, 'space', use_parallel=False
+                truck_quantities, carton_quantities, 'space', use_parallel=False, use_cache=False
             )
             
             # Both should produce valid results
@@ -107,6 +117,305 @@ class TestOptimizedPackingAlgorithms:
             # Results should be similar (may vary due to different algorithms)
             assert abs(len(results_parallel) - len(results_sequential)) <= 1
 
+    def test_process_pool_packing(self):
+        """Test that the process backend packs the same cartons as the thread backend"""
+        with self.app.app_context():
+            truck_quantities = {self.truck: 2}
+            carton_quantities = {self.carton_small: 400, self.carton_large: 150}
+
+            results_thread = pack_cartons_optimized(
+                truck_quantities, carton_quantities, 'space', use_parallel=True, max_workers=2,
+                engine='extreme_points', use_cache=False
+            )
+            results_process = pack_cartons_optimized(
+                truck_quantities, carton_quantities, 'space', use_parallel=True, max_workers=2,
+                parallel_backend='process', engine='extreme_points', use_cache=False
+            )
+
+            assert len(results_process) == len(results_thread)
+            assert (sum(len(r['fitted_items']) for r in results_process) ==
+                    sum(len(r['fitted_items']) for r in results_thread))
+            assert results_process[0]['total_cost'] > 0
+
+    def test_extreme_point_engine(self):
+        """Test that the native engine is selectable and returns the py3dbp result shape"""
+        with self.app.app_context():
+            truck_quantities = {self.truck: 1}
+            carton_quantities = {self.carton_small: 100, self.carton_large: 40}
+
+            results_py3dbp = pack_cartons_optimized(
+                truck_quantities, carton_quantities, 'space', use_parallel=False
+            )
+            results_native = pack_cartons_optimized(
+                truck_quantities, carton_quantities, 'space', use_parallel=False,
+                engine='extreme_points'
+            )
+
+            assert len(results_native) == 1
+            assert set(results_native[0]) == set(results_py3dbp[0])
+            metadata = results_native[0]['calculation_metadata']
+            assert metadata['packing_engine'] == 'extreme_points'
+            assert metadata['dimensional_violations'] == []
+            assert 'packed_serials' not in metadata and 'packed_serials' not in results_native[0]
+            assert sum(metadata['packed_quantities'].values()) == len(results_native[0]['fitted_items'])
+            assert len(results_native[0]['fitted_items']) >= len(results_py3dbp[0]['fitted_items'])
+
+            with pytest.raises(ValueError):
+                pack_cartons_optimized(truck_quantities, carton_quantities, engine='unknown')
+
+    def test_deadline_returns_truncated_best_so_far(self):
+        """Test that an expired deadline stops packing early and flags the partial result"""
+        with self.app.app_context():
+            truck_quantities = {self.truck: 3}
+            carton_quantities = {self.carton_small: 40, self.carton_large: 9}
+
+            complete = pack_cartons_optimized(
+                truck_quantities, carton_quantities, 'space', use_parallel=False,
+                engine='extreme_points', use_cache=False
+            )
+            partial = pack_cartons_optimized(
+                truck_quantities, carton_quantities, 'space', use_parallel=False,
+                engine='extreme_points', use_cache=False, deadline_seconds=0
+            )
+
+            assert not any(result['truncated'] for result in complete)
+            assert len(partial) == 1
+            assert partial[0]['truncated']
+            assert partial[0]['calculation_metadata']['truncated']
+            assert 0 < len(partial[0]['fitted_items']) < len(complete[0]['fitted_items'])
+
+    def test_integer_millimetre_geometry(self):
+        """Test that int_mm geometry reports centimetres and repeats byte for byte"""
+        with self.app.app_context():
+            truck_quantities = {self.truck: 1}
+            carton_quantities = {self.carton_small: 120, self.carton_large: 20}
+
+            runs = [
+                pack_cartons_optimized(
+                    truck_quantities, carton_quantities, 'space', use_parallel=False,
+                    engine='extreme_points', use_cache=False, geometry='int_mm'
+                )
+                for _ in range(2)
+            ]
+
+            assert json.dumps(runs[0], sort_keys=True, default=str) == json.dumps(runs[1], sort_keys=True, default=str)
+            metadata = runs[0][0]['calculation_metadata']
+            assert metadata['truck_total_volume_cm3'] == 600 * 250 * 250
+            assert metadata['dimensional_violations'] == []
+            assert {item['volume'] for item in runs[0][0]['fitted_items']} <= {30 * 20 * 15, 80 * 60 * 40}
+
+            with pytest.raises(ValueError):
+                pack_cartons_optimized(truck_quantities, carton_quantities, geometry='decimal')
+
+    def test_fleet_distribution_shares_preprocessing(self, monkeypatch):
+        """Test that goals share validation and match packing each goal on its own"""
+        from app import packer
+
+        validations = []
+        validate = packer._validate_carton_group
+        monkeypatch.setattr(packer, '_validate_carton_group',
+                            lambda group, truck_bin: validations.append(group.key) or validate(group, truck_bin))
+
+        with self.app.app_context():
+            truck_quantities = {self.truck: 2}
+            carton_quantities = {self.carton_small: 150, self.carton_large: 30}
+            goals = ['cost', 'space', 'weight']
+
+            comparison = packer.optimize_fleet_distribution(carton_quantities, truck_quantities, goals,
+                                                            engine='extreme_points')
+
+            # One truck type: each carton group is validated once across all goals and trucks
+            assert sorted(validations) == [0, 1]
+            for goal in goals:
+                separate = pack_cartons_optimized(truck_quantities, carton_quantities, goal, use_parallel=False,
+                                                  engine='extreme_points', use_cache=False)
+                shared = comparison['results'][goal]['packing_results']
+                assert ([r['calculation_metadata']['packed_quantities'] for r in shared] ==
+                        [r['calculation_metadata']['packed_quantities'] for r in separate])
+                assert [r['fitted_items'] for r in shared] == [r['fitted_items'] for r in separate]
+
+    def test_block_mode_for_homogeneous_loads(self):
+        """Test that the opt-in block engine packs a bulk load as closed-form blocks"""
+        with self.app.app_context():
+            default = pack_cartons_optimized(
+                {self.truck: 1}, {self.carton_small: 60}, 'space', use_parallel=False, use_cache=False
+            )
+            results = pack_cartons_optimized(
+                {self.truck: 1}, {self.carton_small: 600}, 'space', use_parallel=False,
+                engine='block', use_cache=False
+            )
+
+            assert default[0]['calculation_metadata']['packing_mode'] == 'generic'
+            metadata = results[0]['calculation_metadata']
+            assert metadata['packing_mode'] == 'block'
+            assert metadata['dimensional_violations'] == []
+            assert len(results[0]['fitted_items']) == 600
+            assert results[0]['unfitted_items'] == []
+
+    def test_block_mode_respects_stacking_limits(self):
+        """Test that block columns are no taller than the carton's stacking limit"""
+        group = CartonGroup(key=0, name='Crate', length=100, width=100, height=50, weight=1,
+                            quantity=40, stackable=True, max_stack_height=2, can_rotate=False)
+        flat = CartonGroup(key=1, name='Panel', length=100, width=100, height=50, weight=1,
+                           quantity=40, stackable=False, can_rotate=False)
+        for carton_group, layers in ((group, 2), (flat, 1)):
+            truck_bin = Bin('Block Truck', 1000, 200, 400, 10000)
+            packer = BlockLayerPacker()
+            packer.add_bin(truck_bin)
+            for serial in range(carton_group.quantity):
+                packer.add_item(carton_group.make_item(serial))
+            packer.pack()
+
+            heights = {float(item.position[2]) for item in truck_bin.items}
+            assert max(heights) <= (layers - 1) * 50
+
+    def test_truck_count_lower_bound(self):
+        """Test that cartons too wide to sit side by side need one truck each"""
+        from app.packer import _truck_count_lower_bound, _martello_l2
+
+        assert _martello_l2([(51, 10)], 100) == 10
+        assert _martello_l2([(10, 25)], 100) == 3
+
+        mini_truck = TruckType(name="Mini", length=220, width=150, height=120, max_weight=750)
+        fridge = CartonType(name="Fridge", length=90, width=80, height=180, weight=95)
+        wardrobe = CartonType(name="Wardrobe", length=300, width=10, height=10, weight=1)
+
+        # Volume alone would allow three fridges per truck
+        assert _truck_count_lower_bound(mini_truck, {fridge: 10}) == 10
+        assert _truck_count_lower_bound(mini_truck, {wardrobe: 1}) is None
+
+    def test_fleet_mix_uses_small_truck_for_remainder(self):
+        """Test that a small overflow goes to a cheap small truck instead of a second large one"""
+        from app.packer import calculate_optimal_fleet_mix
+
+        with self.app.app_context():
+            small_truck = TruckType(
+                name="Test Mini", length=220, width=150, height=120,
+                max_weight=750, cost_per_km=10.0
+            )
+            db.session.add(small_truck)
+            db.session.commit()
+
+            # The test truck admits 117 large boxes, the rest is overflow
+            mix = calculate_optimal_fleet_mix(
+                {self.carton_large: 120}, [self.truck, small_truck], objective='cost'
+            )
+
+            assert mix['complete']
+            assert mix['truck_mix'] == {"Test Truck 3000": 1, "Test Mini": 1}
+
+            with pytest.raises(ValueError):
+                calculate_optimal_fleet_mix({self.carton_small: 10}, [self.truck], objective='speed')
+
+    def test_truck_combination_keeps_partial_fits(self):
+        """Test that trucks taking only part of the order are ranked and flagged, not dropped"""
+        with self.app.app_context():
+            # The large box fits the mini truck in no orientation
+            mini_truck = TruckType(name="Test Mini", length=70, width=50, height=50, max_weight=750,
+                                   cost_per_km=1.0)
+            combinations = calculate_optimal_truck_combination(
+                {self.carton_small: 10, self.carton_large: 2}, [self.truck, mini_truck], max_trucks=3)
+
+        by_truck = {}
+        for combo in combinations:
+            by_truck.setdefault(combo['truck_type'], []).append(combo)
+        assert [(c['quantity'], c['partial_fit']) for c in by_truck["Test Truck 3000"]] == [(1, False)]
+        assert by_truck["Test Mini"] and all(c['partial_fit'] for c in by_truck["Test Mini"])
+        assert by_truck["Test Mini"][0]['unfit_cartons'] == ["Large Box"]
+
+    def test_fleet_mix_packs_within_time_budget(self, monkeypatch):
+        """Test that every packing gets the search deadline and cut-short packings are reported"""
+        from app import packer
+        deadlines = []
+
+        def pack_cut_short(truck_bin, groups, inventory, engine, deadline=None):
+            deadlines.append(deadline)
+            result = pack_single_truck(truck_bin, groups, inventory, engine, deadline)
+            result['calculation_metadata']['truncated'] = True
+            return result
+
+        pack_single_truck = packer._pack_single_truck
+        monkeypatch.setattr(packer, '_pack_single_truck', pack_cut_short)
+        with self.app.app_context():
+            start = time.time()
+            mix = packer.calculate_optimal_fleet_mix({self.carton_large: 20}, [self.truck], time_budget_seconds=30,
+                                                     engine='extreme_points')
+
+        assert deadlines and all(start + 30 <= deadline <= time.time() + 30 for deadline in deadlines)
+        assert mix['truncated'] and not mix['optimal']
+        assert all(entry['truncated'] for entry in mix['trucks'])
+
+    def test_incremental_load_top_up(self):
+        """Test that late cartons are added to a packed truck without moving loaded ones"""
+        from app.packer import pack_into_existing_load
+
+        with self.app.app_context():
+            result = pack_cartons_optimized(
+                {self.truck: 1}, {self.carton_large: 20}, 'space', use_parallel=False
+            )[0]
+            load_state = {
+                'width': self.truck.length, 'height': self.truck.width, 'depth': self.truck.height,
+                'max_weight': self.truck.max_weight, 'placements': result['fitted_items']
+            }
+
+            delta = pack_into_existing_load(load_state, {self.carton_small: 30, self.carton_large: 5})
+
+            assert len(delta['added_items']) == 35
+            assert delta['items_on_truck'] == len(result['fitted_items']) + 35
+            loaded_names = {item['name'] for item in result['fitted_items']}
+            assert not loaded_names & {item['name'] for item in delta['added_items']}
+            assert delta['utilization'] > result['utilization']
+
+    def test_failed_points_respect_fixed_orientation(self):
+        """Test that a non-rotatable carton that failed does not block a differently oriented one"""
+        from types import SimpleNamespace
+        from app.extreme_point_engine import LoadState
+
+        state = LoadState(30, 10, 10)
+        upright = SimpleNamespace(name='upright', width=10, height=30, depth=10, weight=1, can_rotate=False)
+        flat = SimpleNamespace(name='flat', width=30, height=10, depth=10, weight=1, can_rotate=False)
+
+        assert not state.place(upright)
+        assert state.place(flat)
+        assert flat.position == [0, 0, 0]
+
+    def test_remaining_inventory_tracking(self):
+        """Test that packed units are removed and skipped units are offered again"""
+        group = CartonGroup(key=0, name="Box", length=10, width=10, height=10, weight=1, quantity=5)
+        inventory = RemainingInventory([group])
+
+        assert inventory.serials(0, 3) == [0, 1, 2]
+        inventory.consume(0, [0, 2])
+
+        assert inventory.count(0) == 3
+        assert inventory.serials(0, 10) == [1, 3, 4]
+        inventory.consume(0, [1, 3, 4])
+
+        assert inventory.count(0) == 0
+        assert not inventory
+
+    def test_capacity_matrix(self):
+        """Test that matrix entries match per-truck validation and are dropped on edits"""
+        from py3dbp import Bin
+        from app.packer import _build_carton_groups, _validate_carton_group
+
+        with self.app.app_context():
+            truck = TruckType.query.filter_by(name="Test Truck 3000").first()
+            carton = CartonType.query.filter_by(name="Large Box").first()
+            matrix = get_capacity_matrix()
+
+            group = _build_carton_groups({carton: 10})[0]
+            truck_bin = Bin("check", truck.length, truck.width, truck.height, truck.max_weight)
+            assert matrix.lookup(truck, carton) == _validate_carton_group(group, truck_bin)
+
+            truck.height = 30
+            db.session.commit()
+            assert get_capacity_matrix(build=False) is None
+
+            matrix = get_capacity_matrix()
+            assert matrix.lookup(truck, carton)['can_fit_physically'] is False
+            assert not matrix.may_hold_all(truck, {carton: 10})
+
 
 class TestCostCalculationEngine:
     """Test enhanced cost calculation features"""
@@ -433,7 +742,21 @@ class TestAPIEndpoints:
             data = json.loads(response.data)
             assert 'optimization_results' in data
             assert 'fleet_costs' in data
-    
+
+    def test_fleet_optimization_api_rejects_unknown_engine(self):
+        """Unknown packing engines are a client error"""
+        with self.app.app_context():
+            response = self.client.post('/api/fleet-cost-optimization',
+                json={
+                    'trucks': [{'id': self.truck_id, 'quantity': 1}],
+                    'cartons': [{'id': self.carton_id, 'quantity': 5}],
+                    'engine': 'no_such_engine'
+                },
+                content_type='application/json'
+            )
+
+            assert response.status_code == 400
+
     def test_route_optimization_api(self):
         """Test route optimization API"""
         response = self.client.post('/api/optimize-route',
@@ -450,8 +773,12 @@ class TestAPIEndpoints:
         assert 'optimized_route' in data
         assert 'time_windows' in data
     
-    def test_truck_recommendation_ai_api(self):
+    def test_truck_recommendation_ai_api(self, monkeypatch):
         """Test AI truck recommendation API"""
+        # Answered in the request whatever the number of trucks in the database
+        from app import routes
+        monkeypatch.setattr(routes, '_estimate_packing', lambda *args, **kwargs: {
+            'seconds': 1.0, 'p90_seconds': 2.0, 'source': 'prior', 'samples': 0})
         with self.app.app_context():
             response = self.client.post('/api/truck-recommendation-ai',
                 json={
@@ -466,6 +793,29 @@ class TestAPIEndpoints:
             assert 'recommendations' in data
             assert 'total_cartons' in data
     
+    def test_truck_recommendation_ai_runs_long_loads_in_background(self, monkeypatch):
+        """Loads predicted to miss the request budget are polled from the shared run store"""
+        from app import routes
+        monkeypatch.setattr(routes, '_estimate_packing', lambda *args, **kwargs: {
+            'seconds': 20.0, 'p90_seconds': 40.0, 'source': 'prior', 'samples': 0})
+        with self.app.app_context():
+            response = self.client.post('/api/truck-recommendation-ai',
+                json={'cartons': [{'id': self.carton_id, 'quantity': 20}], 'max_trucks': 2},
+                content_type='application/json'
+            )
+            assert response.status_code == 202
+            status_url = json.loads(response.data)['status_url']
+
+            deadline = time.time() + 60
+            while True:
+                run = json.loads(self.client.get(status_url).data)
+                if run['status'] != 'running' or time.time() > deadline:
+                    break
+                time.sleep(0.1)
+            assert run['status'] == 'completed', run['error']
+            assert run['kind'] == 'truck-recommendation'
+            assert run['result']['total_cartons'] == 20
+
     def test_performance_metrics_api(self):
         """Test performance metrics API"""
         response = self.client.get('/api/performance-metrics')
@@ -0,0 +1,65 @@
+"""
+Tests for truck pruning and early cancellation in the enterprise recommendation
+"""
+
+import sys
+import os
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import advanced_3d_packer_v2
+from app.advanced_3d_packer_v2 import create_enterprise_packing_recommendation
+
+
+def truck(name, length, width, height, max_weight=10000):
+    return {'name': name, 'length': length, 'width': width, 'height': height,
+            'max_weight': max_weight, 'cost_per_km': 1.0}
+
+
+CARTONS = [{'name': f'c{i}', 'length': 100, 'width': 100, 'height': 100, 'weight': 10}
+           for i in range(16)]
+
+
+class TestEnterpriseRecommendation:
+    """Test bound-based truck pruning and cancellation of trucks that cannot reach the top"""
+
+    def test_infeasible_trucks_are_skipped(self):
+        """Trucks too small, too weak or too low for a carton are never packed"""
+        trucks = [truck('small', 200, 200, 200), truck('weak', 800, 400, 400, max_weight=100),
+                  truck('low', 800, 400, 90), truck('ok', 800, 400, 400)]
+        result = create_enterprise_packing_recommendation(trucks, CARTONS, max_workers=1)
+        assert [r['truck_name'] for r in result['recommendations']] == ['ok']
+        assert {s['truck_name'] for s in result['skipped_trucks']} == {'small', 'weak', 'low'}
+
+        # With no feasible truck every truck is still ranked on its partial packing
+        result = create_enterprise_packing_recommendation(trucks[:1], CARTONS, max_workers=1)
+        assert result['skipped_trucks'] == []
+        assert result['recommendations'][0]['unpacked_count'] > 0
+
+    def test_target_cancels_trucks_that_cannot_reach_the_top(self, monkeypatch):
+        """Only trucks whose score bound is below the target-th score are cancelled"""
+        trucks = [truck(f'T{size}', size, 400, 400) for size in (1600, 800, 1200, 2000)]
+        full = create_enterprise_packing_recommendation(trucks, CARTONS)
+        assert len(full['recommendations']) == len(trucks)
+        assert full['cancelled_trucks'] == 0
+
+        # Real bounds are above every reachable score, so the top result never changes
+        result = create_enterprise_packing_recommendation(trucks, CARTONS, target_recommendations=1)
+        ranking = [(r['truck_name'], r['recommendation_score']) for r in result['recommendations']]
+        assert ranking == [(r['truck_name'], r['recommendation_score'])
+                           for r in full['recommendations']]
+        assert result['cancelled_trucks'] == 0
+
+        # Only the tightest truck can reach the top: the rest are cancelled once it is in
+        monkeypatch.setattr(advanced_3d_packer_v2, '_recommendation_score_bound',
+                            lambda truck_type, load_volume:
+                            100.0 if truck_type['name'] == 'T800' else 0.0)
+        for backend, workers in (('process', 1), ('thread', 2)):
+            result = create_enterprise_packing_recommendation(
+                trucks, CARTONS, max_workers=workers, parallel_backend=backend,
+                target_recommendations=1, min_recommendation_score=0.0)
+            names = [r['truck_name'] for r in result['recommendations']]
+            assert names[0] == 'T800'
+            assert result['cancelled_trucks'] == len(trucks) - len(names)
+            assert not result['truncated']
@@ -0,0 +1,78 @@
+"""
+Tests for the incremental extreme-point set of the V2 packer
+"""
+
+import sys
+import os
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.advanced_3d_packer_v2 import Advanced3DPackerV2, ExtremePointSet
+from app.spatial_index import SpatialIndex
+
+
+class TestExtremePointSet:
+    """Test point updates, free extents and pruning"""
+
+    def setup_method(self):
+        self.index = SpatialIndex(cell_size=50)
+        self.points = ExtremePointSet(200, 100, 300, self.index)
+
+    def place(self, key, x, y, z, w, h, d):
+        self.index.insert(key, x, y, z, x + w, y + h, z + d)
+        self.points.add_box(x, y, z, w, h, d)
+
+    def test_points_follow_placements(self):
+        """The origin is replaced by the projected corners of the first box"""
+        assert [c[:3] for c in self.points.candidates()] == [(0.0, 0.0, 0.0)]
+        self.place(0, 0, 0, 0, 50, 40, 30)
+        assert set(self.points.points) == {(50, 0, 0), (0, 40, 0), (0, 0, 30)}
+        assert self.points.points[(50, 0, 0)] == [150, 100, 300]
+        assert self.points.points[(0, 0, 30)] == [200, 100, 270]
+
+    def test_free_extent_shrinks_and_corners_project(self):
+        """A box in front of a point shortens its free extent; raised corners drop to the floor"""
+        self.place(0, 0, 0, 0, 50, 40, 30)
+        self.place(1, 120, 0, 0, 40, 40, 30)
+        assert self.points.points[(50, 0, 0)][0] == 70
+        self.place(2, 0, 0, 30, 50, 40, 30)
+        assert (50, 0, 0) in self.points.points
+        assert (0, 0, 60) in self.points.points
+        assert all(not self.index.contains_point(*point) for point in self.points.points)
+
+    def test_points_without_room_are_dropped(self):
+        """Points with less free space than min_extent are never candidates"""
+        points = ExtremePointSet(200, 100, 300, SpatialIndex(cell_size=50), min_extent=30)
+        points.occupied.insert(0, 0, 0, 0, 180, 100, 30)
+        points.add_box(0, 0, 0, 180, 100, 30)
+        assert (180, 0, 0) not in points.points
+        assert (0, 0, 30) in points.points
+
+    def test_packer_fills_truck_without_overlaps(self):
+        """Uniform cartons fill the floor and stack on the extreme points"""
+        truck = {'name': 'T', 'length': 600, 'width': 200, 'height': 200, 'max_weight': 10000}
+        cartons = [{'name': f'c{i}', 'length': 100, 'width': 100, 'height': 100, 'weight': 1}
+                   for i in range(24)]
+        result = Advanced3DPackerV2().pack_cartons_advanced(truck, cartons)
+        assert len(result.packed_cartons) == 24
+        boxes = result.packed_cartons
+        for i, a in enumerate(boxes):
+            for b in boxes[:i]:
+                assert not (a.x < b.x + b.width and b.x < a.x + a.width and
+                            a.y < b.y + b.height and b.y < a.y + a.height and
+                            a.z < b.z + b.depth and b.z < a.z + a.depth)
+
+    def test_vectorized_scoring_matches_loop(self):
+        """The NumPy batch picks the same positions as the candidate loop"""
+        truck = {'name': 'T', 'length': 1200, 'width': 500, 'height': 400, 'max_weight': 10000}
+        sizes = [(200, 150, 100), (300, 200, 150), (120, 100, 90), (250, 250, 80)]
+        cartons = [{'name': f'c{i}', 'length': l, 'width': w, 'height': h, 'weight': 1 + i % 7,
+                    'fragility_level': 1 + i % 5}
+                   for i, (l, w, h) in enumerate(sizes * 12)]
+        results = [Advanced3DPackerV2(vectorized=vectorized).pack_cartons_advanced(truck, cartons)
+                   for vectorized in (True, False)]
+        placements = [[(p.x, p.y, p.z, p.rotation, p.supported_by) for p in result.packed_cartons]
+                      for result in results]
+        assert placements[0] == placements[1]
+        assert len(placements[0]) > 0
@@ -0,0 +1,63 @@
+"""
+Tests for the summed-volume occupancy grid behind LAFFPacker
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.advanced_packer import Carton, LAFFPacker, OccupancyGrid, Truck, occupancy_resolution
+
+
+class TestOccupancyGrid:
+    """Test the grid resolution, emptiness queries and first-fit search"""
+
+    def test_resolution_is_gcd_of_carton_sides(self):
+        """Cells match the common divisor, coarsened only for huge grids"""
+        assert occupancy_resolution((975, 244, 259), [60, 40, 40, 120, 80, 60]) == 20
+        assert occupancy_resolution((975, 244, 259), [37, 23, 41]) > 1
+        assert occupancy_resolution((100, 100, 100), [37, 23, 41]) == 1
+
+    def test_first_fit_matches_voxel_scan(self):
+        """Box sums from the table agree with a boolean voxel grid"""
+        grid = OccupancyGrid(8, 6, 5)
+        voxels = np.zeros((8, 6, 5), dtype=bool)
+        for box in [(0, 0, 0, 3, 2, 5), (3, 0, 0, 2, 6, 1), (0, 2, 0, 2, 3, 3)]:
+            x, y, z, l, w, h = box
+            grid.occupy(x, y, z, l, w, h)
+            voxels[x:x + l, y:y + w, z:z + h] = True
+
+        for l, w, h in [(1, 1, 1), (2, 2, 2), (3, 4, 4), (5, 6, 5)]:
+            expected = None
+            for x in range(8 - l + 1):
+                for y in range(6 - w + 1):
+                    for z in range(5 - h + 1):
+                        if expected is None and not voxels[x:x + l, y:y + w, z:z + h].any():
+                            expected = (x, y, z)
+            assert grid.first_fit(l, w, h) == expected
+            if expected is not None:
+                assert grid.is_empty(*expected, l, w, h)
+        assert not grid.is_empty(0, 0, 0, 1, 1, 1)
+        assert not grid.is_empty(7, 5, 4, 2, 1, 1)
+
+
+class TestLAFFPacker:
+    """Test packing on a full-size truck"""
+
+    def test_uniform_cartons_fill_the_truck(self):
+        """A truck that is an exact multiple of the carton is filled without overlaps"""
+        truck = Truck('T', length=1200, width=240, height=240, max_weight=100000)
+        cartons = [Carton(f'c{i}', 60, 40, 40, weight=5) for i in range(20 * 6 * 6 + 10)]
+        packer = LAFFPacker(truck)
+        packed = packer.optimize_placement(cartons)
+        assert packer.grid.unit == 20
+        assert len(packed) == 20 * 6 * 6
+        assert packer.calculate_utilization()['volume_utilization'] == 1.0
+        boxes = [(p['position'], p['dimensions']) for p in packed]
+        for i, (a, da) in enumerate(boxes):
+            for b, db in boxes[:i]:
+                assert not all(a[k] < b[k] + db[k] and b[k] < a[k] + da[k] for k in range(3))
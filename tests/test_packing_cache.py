@@ -0,0 +1,101 @@
+"""
+Tests for the persistent content-addressed packing cache
+"""
+
+import sys
+import os
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.packing_cache import PackingCache, packing_cache_key
+
+
+class Record:
+    """Stand-in for a TruckType/CartonType row (hashable, like model instances)"""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def make_truck(name="32 ft", length=960):
+    return Record(name=name, length=length, width=240, height=240, max_weight=25000,
+                  cost_per_km=40, fuel_efficiency=0, driver_cost_per_day=0,
+                  maintenance_cost_per_km=0)
+
+
+def make_carton(name, length):
+    return Record(name=name, length=length, width=40, height=40, weight=5, can_rotate=True,
+                  fragile=False, stackable=True, max_stack_height=5, value=0, priority=1)
+
+
+class TestPackingCache:
+    """Test key canonicalization and persistence across cache instances"""
+
+    def setup_method(self):
+        self.truck = make_truck()
+        self.carton_a = make_carton("A", 60)
+        self.carton_b = make_carton("B", 50)
+
+    def key(self, trucks, cartons, goal='space', engine='py3dbp'):
+        return packing_cache_key(trucks, cartons, goal, engine, '1')
+
+    def test_key_follows_input_order(self):
+        """Group keys in a result follow the input order, so reordered cartons get their own entry"""
+        first = self.key({self.truck: 1}, {self.carton_a: 10, self.carton_b: 5})
+        second = self.key({self.truck: 1}, {self.carton_b: 5, self.carton_a: 10})
+        assert first != second
+        assert self.key({self.truck: 1}, {self.carton_a: 10, self.carton_b: 5}) == first
+
+    def test_key_covers_problem_inputs(self):
+        """Quantities, truck dimensions, goal and engine all change the key"""
+        base = self.key({self.truck: 1}, {self.carton_a: 10})
+        assert self.key({self.truck: 2}, {self.carton_a: 10}) != base
+        assert self.key({self.truck: 1}, {self.carton_a: 11}) != base
+        assert self.key({make_truck(length=600): 1}, {self.carton_a: 10}) != base
+        assert self.key({self.truck: 1}, {self.carton_a: 10}, goal='cost') != base
+        assert self.key({self.truck: 1}, {self.carton_a: 10}, engine='extreme_points') != base
+        # Parallel batches may fill trucks differently from the sequential pass
+        parallel = packing_cache_key({self.truck: 1}, {self.carton_a: 10}, 'space', 'py3dbp', '1',
+                                     execution='parallel:thread:4')
+        assert parallel != base
+        assert packing_cache_key({self.truck: 1}, {self.carton_a: 10}, 'space', 'py3dbp', '1',
+                                 execution='sequential') == base
+
+    def test_results_persist_and_are_counted(self, tmp_path):
+        """A second cache on the same file sees earlier results and shared statistics"""
+        path = str(tmp_path / 'cache.db')
+        key = self.key({self.truck: 1}, {self.carton_a: 10})
+        results = [{'bin_name': '32 ft_0', 'utilization': 0.5, 'fitted_items': [{'position': [0, 0, 0]}]}]
+
+        cache = PackingCache(path)
+        assert cache.get(key) is None
+        cache.put(key, results)
+
+        reopened = PackingCache(path)
+        assert reopened.get(key) == results
+        stats = reopened.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+        assert stats['process_hits'] == 1 and stats['process_misses'] == 0
+        assert stats['entries'] == 1
+
+    def test_lookups_do_not_write(self, tmp_path):
+        """Hit counters reach the shared file in one batch, not on every lookup"""
+        path = str(tmp_path / 'cache.db')
+        cache = PackingCache(path)
+        cache.put('a', ['a'])
+        for _ in range(3):
+            assert cache.get('a') == ['a']
+
+        other = PackingCache(path)
+        assert other.stats()['hits'] == 0
+        cache.flush()
+        assert other.stats()['hits'] == 3
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        """Only max_entries results are kept"""
+        cache = PackingCache(str(tmp_path / 'cache.db'), max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.put(key, [key])
+        assert cache.stats()['entries'] == 2
+        assert cache.get('c') == ['c']
@@ -0,0 +1,80 @@
+"""
+Tests for the telemetry-fitted packing cost model
+"""
+
+import math
+import sys
+import os
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.packing_cost_model import (MIN_SAMPLES, PackingCostModel, REFIT_INTERVAL, fit_log_linear,
+                                    plan_packing_execution, prior_estimate)
+
+
+def synthetic_seconds(cartons, types, trucks):
+    return 0.002 * cartons ** 1.3 * types ** 0.4 * trucks ** 0.8
+
+
+def synthetic_runs():
+    return [(n, k, t, synthetic_seconds(n, k, t))
+            for n in (10, 50, 200, 800) for k in (1, 3, 8) for t in (1, 2, 5)]
+
+
+class TestPackingCostModel:
+    """Test the fit, the fallback to the prior and automatic refits"""
+
+    def test_fit_recovers_exponents(self):
+        """A noiseless power law is recovered exactly"""
+        fit = fit_log_linear(synthetic_runs())
+        intercept, cartons, types, trucks = fit['coefficients']
+        assert math.isclose(math.exp(intercept), 0.002, rel_tol=1e-3)
+        assert math.isclose(cartons, 1.3, abs_tol=1e-3)
+        assert math.isclose(types, 0.4, abs_tol=1e-3)
+        assert math.isclose(trucks, 0.8, abs_tol=1e-3)
+        assert fit['residual_std'] < 1e-3
+
+    def test_prior_is_used_without_telemetry(self, tmp_path):
+        """An empty store falls back to the rule of thumb"""
+        model = PackingCostModel(str(tmp_path / 'telemetry.db'))
+        estimate = model.estimate(400, 3, 2, 'py3dbp')
+        assert estimate['source'] == 'prior'
+        assert estimate['seconds'] == prior_estimate(400, 2)
+
+    def test_model_refits_as_measurements_arrive(self, tmp_path):
+        """Recorded runs replace the prior and are shared with other processes via the file"""
+        path = str(tmp_path / 'telemetry.db')
+        model = PackingCostModel(path)
+        assert model.estimate(100, 2, 1, 'py3dbp')['source'] == 'prior'
+
+        runs = synthetic_runs()
+        for n, k, t, seconds in runs[:MIN_SAMPLES]:
+            model.record(n, k, t, 'py3dbp', seconds)
+        assert model.estimate(100, 2, 1, 'py3dbp')['samples'] == MIN_SAMPLES
+
+        # The next refit happens after REFIT_INTERVAL further measurements
+        runs = runs[:MIN_SAMPLES + REFIT_INTERVAL]
+        for n, k, t, seconds in runs[MIN_SAMPLES:-1]:
+            model.record(n, k, t, 'py3dbp', seconds)
+        assert model.estimate(100, 2, 1, 'py3dbp')['samples'] == MIN_SAMPLES
+        model.record(*runs[-1][:3], 'py3dbp', runs[-1][3])
+
+        estimate = model.estimate(100, 2, 1, 'py3dbp')
+        assert estimate['source'] == 'fitted'
+        assert estimate['samples'] == len(runs)
+        assert math.isclose(estimate['seconds'], synthetic_seconds(100, 2, 1), rel_tol=0.01)
+
+        # Engines without their own measurements use the pooled fit
+        assert model.estimate(100, 2, 1, 'extreme_point')['source'] == 'fitted'
+        assert PackingCostModel(path).estimate(100, 2, 1, 'py3dbp')['samples'] == len(runs)
+
+    def test_execution_plan(self):
+        """Short runs are synchronous, long ones go to the background, huge ones are rejected"""
+        def estimate(seconds):
+            return {'seconds': seconds, 'p90_seconds': seconds * 1.5}
+
+        assert plan_packing_execution(estimate(2), 8, 600) == 'sync'
+        assert plan_packing_execution(estimate(6), 8, 600) == 'background'
+        assert plan_packing_execution(estimate(6), 8, 600, background_slots_free=False) == 'reject'
+        assert plan_packing_execution(estimate(900), 8, 600) == 'reject'
@@ -0,0 +1,58 @@
+"""
+Tests for the shared background packing run store
+"""
+
+import sys
+import os
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import packing_runs
+from app.packing_runs import PackingRunStore
+
+
+class TestPackingRunStore:
+    """Test sharing, retention and recovery of background runs"""
+
+    def test_runs_are_shared_between_stores(self, tmp_path):
+        """A run started through one store is visible to another on the same file"""
+        path = str(tmp_path / 'runs.db')
+        store, other = PackingRunStore(path), PackingRunStore(path)
+        run_id = store.create('fleet-cost', 12.5)
+        assert other.get(run_id)['status'] == 'running'
+        assert other.running_count() == 1
+
+        store.finish(run_id, {'trucks': ['A', 'B']})
+        run = other.get(run_id)
+        assert run['status'] == 'completed'
+        assert run['result'] == {'trucks': ['A', 'B']}
+        assert other.running_count() == 0
+
+        failed_id = store.create('fleet-cost', 1.0)
+        store.finish(failed_id, error='boom')
+        assert other.get(failed_id)['status'] == 'failed'
+        assert other.get(failed_id)['error'] == 'boom'
+        assert other.get('unknown') is None
+
+    def test_finished_runs_expire(self, tmp_path):
+        """Finished runs are deleted once the retention period has passed"""
+        store = PackingRunStore(str(tmp_path / 'runs.db'), retention_seconds=0)
+        run_id = store.create('fleet-cost', 1.0)
+        store.finish(run_id, {})
+        store.create('fleet-cost', 1.0)
+        assert store.get(run_id) is None
+
+    def test_lost_runs_fail_and_free_their_slot(self, tmp_path, monkeypatch):
+        """Runs of a process that is gone, or past the stale limit, are reported as failed"""
+        store = PackingRunStore(str(tmp_path / 'runs.db'))
+        run_id = store.create('recommendation', 1.0)
+        monkeypatch.setattr(packing_runs.os, 'getpid', lambda: -1)
+        monkeypatch.setattr(packing_runs, '_process_alive', lambda pid: False)
+        assert store.running_count() == 0
+        assert 'restart' in store.get(run_id)['error']
+
+        monkeypatch.setattr(packing_runs, '_process_alive', lambda pid: True)
+        store.stale_seconds = 0
+        run_id = store.create('recommendation', 1.0)
+        assert store.get(run_id)['status'] == 'failed'
@@ -0,0 +1,90 @@
+"""
+Tests for the shared 3D spatial index used by the packers
+"""
+
+import sys
+import os
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.spatial_index import HeightMap, SpatialIndex, build_index, exact_height_map_resolution
+
+
+class TestSpatialIndex:
+    """Test overlap and support queries against a brute-force scan"""
+
+    def setup_method(self):
+        self.boxes = [
+            (0, 0, 0, 50, 40, 30),
+            (50, 0, 0, 100, 40, 30),
+            (0, 0, 30, 60, 40, 60),
+            (200, 100, 0, 230, 150, 20),
+        ]
+        self.index = build_index(self.boxes, cell_size=25)
+
+    def test_overlaps_matches_linear_scan(self):
+        """Touching faces are not collisions, shared volume is"""
+        assert not self.index.overlaps(100, 0, 0, 150, 40, 30)
+        assert not self.index.overlaps(0, 40, 0, 50, 80, 30)
+        assert self.index.overlaps(90, 10, 10, 120, 20, 20)
+        assert self.index.overlapping(40, 0, 0, 60, 40, 40) == [0, 1, 2]
+
+    def test_tolerance_ignores_small_overlaps(self):
+        """A 0.5 overlap is ignored with a 1.0 tolerance"""
+        assert self.index.overlaps(99.5, 0, 0, 120, 40, 30)
+        assert not self.index.overlaps(99.5, 0, 0, 120, 40, 30, tolerance=1.0)
+
+    def test_below_reports_supporting_boxes(self):
+        """Boxes whose top face meets the base are reported with their overlap area"""
+        support = self.index.below(40, 0, 70, 40, 30)
+        assert support == [(0, 10 * 40), (1, 20 * 40)]
+        assert self.index.below(0, 0, 10, 10, 60) == [(2, 100)]
+        assert self.index.below(0, 0, 10, 10, 45) == []
+
+    def test_remove_and_contains_point(self):
+        """Removed boxes no longer collide"""
+        assert self.index.contains_point(210, 120, 10)
+        self.index.remove(3)
+        assert not self.index.contains_point(210, 120, 10)
+        assert len(self.index) == 3
+
+    def test_cell_size_does_not_change_results(self):
+        """Queries give the same answer for any grid resolution"""
+        coarse = SpatialIndex(cell_size=1000)
+        for i, box in enumerate(self.boxes):
+            coarse.insert(i, *box)
+        for query in [(40, 0, 0, 60, 40, 40), (45, 5, 25, 55, 35, 35), (300, 300, 0, 310, 310, 10)]:
+            assert coarse.overlapping(*query) == self.index.overlapping(*query)
+
+
+class TestHeightMap:
+    """Test support and resting-height queries on the top-surface grid"""
+
+    def setup_method(self):
+        self.height_map = HeightMap(200, 100, exact_height_map_resolution(200, 100, [50, 40, 30, 10]))
+        self.height_map.place(0, 0, 0, 50, 40, 30, bottom=0)
+        self.height_map.place(1, 50, 0, 100, 40, 30, bottom=0)
+
+    def test_support_matches_spatial_index(self):
+        """Supporting boxes and areas agree with SpatialIndex.below"""
+        index = build_index([(0, 0, 0, 50, 40, 30), (50, 0, 0, 100, 40, 30)], cell_size=25)
+        assert self.height_map.resolution == 10
+        assert self.height_map.below(40, 0, 70, 40, 30) == index.below(40, 0, 70, 40, 30)
+        assert self.height_map.supported_area(40, 0, 70, 60, 30) == 30 * 40
+        assert self.height_map.resting_height(90, 30, 120, 50) == 30
+
+    def test_hidden_faces_are_reported(self):
+        """A top face under an overhang makes queries at its level inexact"""
+        self.height_map.place(2, 0, 0, 60, 40, 90, bottom=60)
+        assert self.height_map.below(0, 0, 40, 40, 30) is None
+        assert self.height_map.below(60, 0, 100, 40, 30) == [(1, 40 * 40)]
+        assert self.height_map.below(0, 0, 40, 40, 90) == [(2, 40 * 40)]
+
+    def test_resting_heights_for_every_position(self):
+        """Sliding-window maxima give the resting height at each grid origin"""
+        heights = self.height_map.resting_heights(6, 2)
+        assert heights.shape == (15, 9)
+        assert heights[0, 0] == 30
+        assert heights[10, 0] == 0
+        assert heights[0, 4] == 0